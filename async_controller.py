@@ -0,0 +1,170 @@
+import asyncio
+import contextlib
+from controller import ProxmonController, ALL_SERVERS
+from inventory import vm_key
+from settings_controller import settings_menu
+from view import display_help, prompt_command, display_tasks, display_node_table, display_bulk_summary, display_cache_stats, display_events, console
+from util import clear_screen
+
+ACTIONS = ("start", "shutdown", "stop", "reset", "restart", "hardreset", "delete")
+
+
+class AsyncProxmonController(ProxmonController):
+    """Controller for "backend": "async".
+
+    Input is read in a worker thread while fetches and task waits run in
+    the event loop, so the prompt stays usable while actions are running;
+    finished actions report back on their own.
+    """
+
+    def _connect(self):
+        if self.selected_server is ALL_SERVERS:
+            return super()._connect()
+        from async_model import AsyncProxmoxManager
+
+        return AsyncProxmoxManager({**self.config, "servers": [self.selected_server]})
+
+    def run(self):
+        if self.selected_server is ALL_SERVERS:
+            print("The async backend supports a single server; using the threaded backend.")
+            return super().run()
+        self._show_snapshot()
+        self.pm = self._connect()
+        asyncio.run(self._run())
+
+    async def _run(self):
+        async with contextlib.AsyncExitStack() as stack:
+            self.jobs = set()
+            # Login und erster Fetch hinter dem Spinner, die alte Tabelle bleibt stehen
+            with console.status("Connecting..."):
+                await stack.enter_async_context(self.pm)
+                vms = await self._fetch()
+            self._show_refresh(vms)
+            print("Type :? for help.")
+
+            while True:
+                cmd = await asyncio.to_thread(prompt_command)
+
+                if cmd in (":q", "q"):
+                    break
+                elif cmd in (":r", "r"):
+                    await self._refresh()
+                elif cmd == ":?":
+                    clear_screen()
+                    display_help()
+                elif cmd == ":settings":
+                    clear_screen()
+                    await asyncio.to_thread(settings_menu, self.config)
+                elif self._page_command(cmd):
+                    clear_screen()
+                    self._display()
+                elif (change := self._query_command(cmd)) is not None:
+                    if change == "refetch":
+                        await self._refresh()
+                    elif change == "redraw":
+                        clear_screen()
+                        self._display()
+                elif cmd == ":events":
+                    display_events(self.events.recent)
+                elif cmd == ":cache":
+                    display_cache_stats(self.pm.cache.stats())
+                elif cmd == ":stats" or cmd.startswith(":stats "):
+                    self._stats_command(cmd.split()[1:])
+                elif cmd == ":nodes":
+                    clear_screen()
+                    try:
+                        nodes = await self.pm.fetch_nodes()
+                    except Exception as e:
+                        print(f"Fehler beim Laden der Nodes: {e}")
+                        continue
+                    self.nodes = nodes
+                    # eingeschränkte Fetches sind kein vollständiges Inventar
+                    if not self.query.narrow():
+                        self._save_snapshot()
+                    display_node_table(nodes, use_color=self.config.get("use_color", False),
+                                       metrics=self.metrics, config=self.config)
+                elif cmd.startswith(":tasks") and len(cmd.split()) == 2 and cmd.split()[1] != "--follow":
+                    clear_screen()
+                    display_tasks(await self.pm.list_tasks(cmd.split()[1], self.config.get("task_limit", 15)))
+                elif cmd.startswith(":node-restart "):
+                    await self.pm.restart_node(cmd.split(maxsplit=1)[1])
+                elif cmd.startswith(":dns "):
+                    node = cmd.split()[1]
+                    dns1 = await self._ask("Primary DNS (required): ")
+                    dns2 = await self._ask("Secondary DNS (optional): ")
+                    dns3 = await self._ask("Tertiary DNS (optional): ")
+                    if not dns1:
+                        print("Primary DNS is required.")
+                        continue
+                    try:
+                        await self.pm.set_dns(node, dns1, dns2 or None, dns3 or None)
+                        print(f"DNS updated for {node}")
+                    except Exception as e:
+                        print(f"Failed to update DNS: {e}")
+                elif cmd.startswith(":") and len(cmd.split()) > 1 and cmd.split()[0][1:] in ACTIONS:
+                    action, arg = cmd.split(maxsplit=1)
+                    await self._start_action(action[1:], arg)
+                # :ru evakuiert Nodes vor dem Reboot, das kann nur die Rolling-Engine
+                elif cmd in (":watch", ":trend", ":storage", ":storage all") or cmd.startswith(
+                        (":trend ", ":tasks --follow", ":info ", ":find ", ":snapshot ", ":backup ", ":ru ")):
+                    print("Only available with the threaded backend (\"backend\": \"threads\").")
+                else:
+                    print("Unknown command. Use :? for help.")
+
+            if self.jobs:
+                print(f"Waiting for {len(self.jobs)} running action(s)...")
+                await asyncio.gather(*self.jobs, return_exceptions=True)
+
+    async def _refresh(self):
+        self._show_refresh(await self._fetch())
+
+    async def _fetch(self):
+        try:
+            return await self.pm.fetch_vms(**self.query.narrow())
+        except Exception as e:
+            print(f"Refresh failed: {e}")
+            return None
+
+    def _show_refresh(self, vms):
+        if vms is None:
+            return
+        events = self._set_inventory(vms)
+        clear_screen()
+        self._display()
+        if events:
+            display_events(events)
+
+    async def _ask(self, prompt):
+        # Eingaben im Thread lesen, laufende Aktionen warten nicht darauf
+        return (await asyncio.to_thread(input, prompt)).strip()
+
+    async def _start_action(self, action, arg):
+        targets = self._resolve_targets(arg)
+        if not targets:
+            return
+        if action == "delete" and len(targets) > 1:
+            if (await self._ask(f"Delete {len(targets)} guests? [y/N]: ")).lower() != "y":
+                print("Delete canceled.")
+                return
+        # läuft im Hintergrund weiter, der Prompt ist sofort wieder frei
+        job = asyncio.create_task(self._run_action(action, targets))
+        self.jobs.add(job)
+        job.add_done_callback(self.jobs.discard)
+        print(f"{action.capitalize()} of {len(targets)} guest(s) started.")
+
+    async def _run_action(self, action, targets):
+        limit = asyncio.Semaphore(self.config.get("bulk_parallelism", 4))
+
+        async def one(vm):
+            async with limit:
+                try:
+                    return await self.pm.perform(vm, action)
+                except Exception as e:
+                    return e
+
+        results = await asyncio.gather(*(one(vm) for vm in targets))
+        display_bulk_summary(action, {vm_key(vm): res for vm, res in zip(targets, results)})
+        try:
+            self._set_inventory(await self.pm.fetch_vms(**self.query.narrow()))
+        except Exception as e:
+            print(f"Refresh failed: {e}")
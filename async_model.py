@@ -0,0 +1,275 @@
+import asyncio
+import json
+import time
+import aiohttp
+from cache import ResponseCache
+from concurrency import FetchTimeout
+from inventory import VMInventory
+from model import ProxmoxManager
+from session import TicketCache, TICKET_RENEW_AGE, api_url
+from tasks import TaskFailed, upid_node
+from tracing import TRACER
+
+
+class APIError(Exception):
+    def __init__(self, status, reason, path):
+        super().__init__(f"{status} {reason}: {path}")
+        self.status = status
+
+
+def _params(params):
+    # aiohttp nimmt nur Strings; None weglassen, bool als 0/1
+    return {k: str(int(v)) if isinstance(v, bool) else str(v) for k, v in params.items() if v is not None}
+
+
+class AsyncProxmoxManager:
+    """ProxmoxManager on aiohttp: the same operations as coroutines, one
+    connection pool per server. Use `async with` (or open()/close())."""
+
+    def __init__(self, config, cache=None):
+        self.server = config["servers"][0]
+        self.scope = self.base_url = api_url(self.server)
+        self.cache = cache or ResponseCache(config.get("cache_ttl"))
+        self.max_workers = config.get("max_workers", 8)
+        self.fetch_timeout = config.get("fetch_timeout", 15)
+        self.task_timeout = config.get("task_timeout", 150)
+        self.connect_timeout = config.get("connect_timeout", 3.05)
+        self.request_timeout = config.get("request_timeout", 5)
+        self.tickets = TicketCache()
+        self.key = f"{self.server['username']}@{self.base_url}"
+        self.session = None
+        self.ticket = None
+        self.csrf = None
+        self.created = 0
+        self._login_lock = None
+        self.trace_name = self.server.get("name", self.base_url)
+
+    async def open(self):
+        verify_ssl = self.server.get("verify_ssl", False)
+        headers = {}
+        if self.server.get("token_name"):
+            headers["Authorization"] = "PVEAPIToken={}!{}={}".format(
+                self.server["username"], self.server["token_name"], self.server["token_value"])
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=max(4, self.max_workers), ssl=None if verify_ssl else False),
+            timeout=aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.request_timeout),
+            headers=headers,
+        )
+        self._login_lock = asyncio.Lock()
+        if not self.server.get("token_name"):
+            try:
+                entry = self.tickets.get(self.key) or await self._login(self.server["password"])
+            except Exception:
+                await self.close()
+                raise
+            self._use(entry)
+        return self
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _login(self, password):
+        async with self.session.post(self.base_url + "/access/ticket",
+                                     data={"username": self.server["username"], "password": password}) as resp:
+            data = (await resp.json()).get("data") if resp.status == 200 else None
+        if not data or "ticket" not in data:
+            raise APIError(401, "Couldn't authenticate user", self.key)
+        entry = {"ticket": data["ticket"], "csrf": data["CSRFPreventionToken"], "created": time.time()}
+        self.tickets.put(self.key, entry)
+        return entry
+
+    def _use(self, entry):
+        self.ticket = entry["ticket"]
+        self.csrf = entry["csrf"]
+        self.created = entry["created"]
+
+    async def _request(self, method, path, params=None, relogged=False):
+        if self.ticket and time.time() - self.created >= TICKET_RENEW_AGE:
+            async with self._login_lock:
+                if time.time() - self.created >= TICKET_RENEW_AGE:
+                    self._use(await self._login(self.ticket))
+
+        headers = {}
+        if self.ticket:
+            headers["Cookie"] = f"PVEAuthCookie={self.ticket}"
+            if method != "GET":
+                headers["CSRFPreventionToken"] = self.csrf
+        params = _params(params or {})
+        kwargs = {"params": params} if method in ("GET", "DELETE") else {"data": params}
+
+        start = time.perf_counter()
+        try:
+            async with self.session.request(method, f"{self.base_url}/{path}", headers=headers, **kwargs) as resp:
+                raw = await resp.read()
+        except Exception as e:
+            TRACER.record(self.trace_name, method, path, start, error=type(e).__name__)
+            raise
+        TRACER.record(self.trace_name, method, path, start, resp.status, len(raw), relogged)
+        if resp.status == 401 and self.ticket and not relogged:
+            # Ticket aus dem Cache verworfen: einmal neu anmelden
+            self.tickets.drop(self.key)
+            async with self._login_lock:
+                self._use(await self._login(self.server["password"]))
+            return await self._request(method, path, params, relogged=True)
+        if resp.status >= 400:
+            raise APIError(resp.status, resp.reason, path)
+        return json.loads(raw).get("data")
+
+    def _get(self, path, **params):
+        return self._request("GET", path, params)
+
+    def _post(self, path, **params):
+        return self._request("POST", path, params)
+
+    def _cached(self, endpoint, node, loader):
+        return self.cache.aget((self.scope, endpoint, node), loader)
+
+    def _invalidate(self, endpoint, node=None):
+        self.cache.invalidate(self.scope, endpoint, node)
+
+    async def fetch_vms(self, node=None, vm_type=None):
+        if node is None:
+            vms = await self._cached("resources", None, lambda: self._get("cluster/resources", type="vm"))
+            return [vm for vm in vms if vm["type"] == vm_type] if vm_type else vms
+        return await self._cached("resources", (node, vm_type), lambda: self._node_guests(node, vm_type))
+
+    async def _node_guests(self, node, vm_type=None):
+        kinds = (vm_type,) if vm_type else ("qemu", "lxc")
+        lists = await asyncio.gather(*(self._get(f"nodes/{node}/{kind}") for kind in kinds))
+        vms = []
+        for kind, rows in zip(kinds, lists):
+            for vm in rows:
+                vm.update(node=node, type=kind, vmid=int(vm["vmid"]))
+                vms.append(vm)
+        return vms
+
+    def find_vm(self, vmid, vms):
+        if not isinstance(vms, VMInventory):
+            vms = VMInventory(vms)
+        return vms.get(vmid)
+
+    async def _timed(self, coro):
+        try:
+            return await asyncio.wait_for(coro, self.fetch_timeout)
+        except asyncio.TimeoutError:
+            return FetchTimeout(f"no response within {self.fetch_timeout}s")
+        except Exception as e:
+            return e
+
+    async def fetch_nodes(self, on_row=None):
+        nodes = await self._cached("nodes", None, lambda: self._get("nodes"))
+
+        async def node_row(node):
+            name = node["node"]
+            if node.get("status", "unknown") == "offline":
+                row = ProxmoxManager._node_row(node, {})
+            else:
+                # alle Sub-Requests gleichzeitig, Fehler landen in der Zeile
+                version, updates, dns = await asyncio.gather(
+                    self._timed(self._cached("version", name, lambda: self._get(f"nodes/{name}/version"))),
+                    self._timed(self._cached("apt", name, lambda: self._get(f"nodes/{name}/apt/update"))),
+                    self._timed(self._cached("dns", name, lambda: self._get(f"nodes/{name}/dns"))),
+                )
+                row = ProxmoxManager._node_row(node, {"version": version, "updates": updates, "dns": dns})
+            if on_row:
+                on_row(row)
+            return row
+
+        return list(await asyncio.gather(*(node_row(node) for node in nodes)))
+
+    async def wait_task(self, upid, timeout=None, first_delay=0.2, max_delay=5.0, factor=1.6, max_errors=5):
+        """Poll nodes/{node}/tasks/{upid}/status with backoff; returns the exitstatus."""
+        if not upid:
+            return None
+        path = f"nodes/{upid_node(upid)}/tasks/{upid}/status"
+        deadline = time.monotonic() + (timeout or self.task_timeout)
+        delay = first_delay
+        errors = 0
+        while True:
+            await asyncio.sleep(min(delay, max(0, deadline - time.monotonic())))
+            try:
+                status = await self._get(path)
+            except Exception:
+                errors += 1
+                if errors >= max_errors:
+                    raise
+                status = {}
+            if status.get("status") == "stopped":
+                exitstatus = status.get("exitstatus", "")
+                if exitstatus != "OK" and not exitstatus.startswith("WARNINGS"):
+                    raise TaskFailed(f"{status.get('type', 'task')} failed: {exitstatus}")
+                return exitstatus
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Task {upid} still running after {timeout or self.task_timeout}s")
+            delay = min(delay * factor, max_delay)
+
+    def _guest_path(self, vm):
+        return f"nodes/{vm['node']}/{vm['type']}/{vm['vmid']}"
+
+    async def perform(self, vm, action):
+        # wie ProxmoxManager.perform: still, wirft Fehler, wartet auf den Task
+        path = self._guest_path(vm)
+        try:
+            if action == "delete":
+                return await self.wait_task(await self._request("DELETE", path))
+            if action in ("restart", "hardreset"):
+                await self.wait_task(await self._post(f"{path}/status/stop"))
+                action = "start"
+            return await self.wait_task(await self._post(f"{path}/status/{action}"))
+        finally:
+            self._invalidate("resources")
+
+    async def _vm_action(self, vmid, vms, action, done):
+        vm = self.find_vm(vmid, vms)
+        if not vm:
+            print(f"VM/CT with ID {vmid} not found.")
+            return
+        try:
+            await self.perform(vm, action)
+            print(f"{done} {vm['type'].upper()} {vm['vmid']} on {vm['node']}")
+        except Exception as e:
+            print(f"{action.capitalize()} failed: {e}")
+
+    def start_vm(self, vmid, vms): return self._vm_action(vmid, vms, "start", "Started")
+    def shutdown_vm(self, vmid, vms): return self._vm_action(vmid, vms, "shutdown", "Shut down")
+    def stop_vm(self, vmid, vms): return self._vm_action(vmid, vms, "stop", "Stopped")
+    def reset_vm(self, vmid, vms): return self._vm_action(vmid, vms, "reset", "Reset")
+    def restart_vm(self, vmid, vms): return self._vm_action(vmid, vms, "restart", "Restarted")
+    def delete_vm(self, vmid, vms): return self._vm_action(vmid, vms, "delete", "Deleted")
+
+    async def restart_node(self, node):
+        try:
+            await self._post(f"nodes/{node}/status", command="reboot")
+            self._invalidate("nodes")
+            self._invalidate("resources")
+            print(f"Node {node} reboot triggered.")
+        except Exception as e:
+            print(f"Node reboot failed: {e}")
+
+    async def update_node(self, node):
+        try:
+            await self.wait_task(await self._post(f"nodes/{node}/apt/update"))
+        finally:
+            self._invalidate("apt", node)
+            self._invalidate("version", node)
+        await self._post(f"nodes/{node}/status", command="reboot")
+        self._invalidate("nodes")
+
+    async def set_dns(self, node, dns1, dns2=None, dns3=None):
+        await self._post(f"nodes/{node}/dns", dns1=dns1, dns2=dns2 or None, dns3=dns3 or None)
+        self._invalidate("dns", node)
+
+    async def list_tasks(self, node, limit=15):
+        try:
+            return await self._get(f"nodes/{node}/tasks", limit=limit)
+        except Exception as e:
+            print(f"Failed to load tasks for node '{node}': {e}")
+            return []
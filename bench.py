@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Budgets in ms (Wandzeit inkl. Interpreter-Start)
+BUDGETS_MS = {
+    "startup.cli_help": 300,
+    "startup.first_table_1k": 2500,
+    "startup.json_1k": 500,
+    "api.refresh_1k": 250,
+    "api.nodes": 250,
+    "render.build_per_1k": 100,
+    "render.table_per_1k": 2000,
+}
+# alles andere in ms; bei Durchsatz ist mehr besser
+UNITS = {"bulk.throughput": "ops/s", "memory.peak_10k": "MB"}
+HIGHER_IS_BETTER = {"bulk.throughput"}
+REGRESSION = 0.2
+
+HISTORY_PATH = os.path.join(HERE, "bench_history.jsonl")
+API_GUESTS = 1000
+API_NODES = 8
+API_LATENCY = 0.005
+
+
+def synthetic_vms(count, nodes=8):
+    return [{
+        "vmid": 100 + i,
+        "name": f"guest-{i:05d}",
+        "type": "lxc" if i % 3 == 0 else "qemu",
+        "node": f"pve{i % nodes + 1}",
+        "status": "running" if i % 7 else "stopped",
+        "cpu": (i % 100) / 100,
+        "mem": (i % 16 + 1) * 1024 ** 3,
+        "maxmem": 16 * 1024 ** 3,
+        "disk": (i % 50) * 1024 ** 3,
+        "maxdisk": 64 * 1024 ** 3,
+        "uptime": i * 37 if i % 7 else 0,
+        "tags": "web;prod" if i % 2 else "db",
+    } for i in range(count)]
+
+
+def _wall_ms(cmd, runs, env=None):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=HERE, check=True, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def _home(fake):
+    # eigenes HOME für Config, Ticket-Cache und Snapshot
+    home = tempfile.mkdtemp(prefix="proxmon-bench-")
+    os.makedirs(os.path.join(home, ".config", "proxmon"))
+    with open(os.path.join(home, ".config", "proxmon", "config.json"), "w") as f:
+        json.dump({"servers": [fake.server_config()], "language": "en"}, f)
+    return {**os.environ, "HOME": home, "COLUMNS": "160", "LINES": "50"}
+
+
+def _first_table_ms(fake, runs):
+    # Start bis zur letzten Zeile der ersten VM-Tabelle; frisches HOME, also kein Snapshot
+    times = []
+    for _ in range(runs):
+        env = _home(fake)
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, "prox.py"], cwd=HERE, env=env, text=True,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        proc.stdin.write("1\n")
+        proc.stdin.flush()
+        for line in proc.stdout:
+            if line.startswith("└"):
+                break
+        times.append((time.perf_counter() - start) * 1000)
+        proc.communicate(":q\n")
+        shutil.rmtree(env["HOME"], ignore_errors=True)
+    return statistics.median(times)
+
+
+def bench_startup(runs=5):
+    # die echten Einstiegspunkte gegen den Fake-Server
+    from fakeprox import FakeCluster, FakeProxmox
+
+    py = sys.executable
+    results = {"startup.cli_help": _wall_ms([py, "prox.py", "--help"], runs)}
+    with FakeProxmox(FakeCluster(API_NODES, API_GUESTS)) as fake:
+        env = _home(fake)
+        results["startup.json_1k"] = _wall_ms([py, "prox.py", "vms", "--format", "json"], runs, env)
+        shutil.rmtree(env["HOME"], ignore_errors=True)
+        results["startup.first_table_1k"] = _first_table_ms(fake, runs)
+    return results
+
+
+def _median_ms(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def bench_api(runs=5):
+    # gegen den Fake-Server, Cache aus, damit jeder Lauf wirklich fragt
+    from cache import DEFAULT_TTLS
+    from concurrency import fan_out
+    from fakeprox import FakeCluster, FakeProxmox
+    from inventory import vm_key
+    from model import ProxmoxManager
+
+    results = {}
+    with FakeProxmox(FakeCluster(API_NODES, API_GUESTS, task_duration=0.3), latency=API_LATENCY) as fake:
+        pm = ProxmoxManager({"servers": [fake.server_config()], "cache_ttl": {k: 0 for k in DEFAULT_TTLS}})
+        results["api.refresh_1k"] = _median_ms(pm.fetch_vms, runs)
+        results["api.nodes"] = _median_ms(pm.fetch_nodes, runs)
+
+        targets = [vm for vm in pm.fetch_vms() if vm["status"] == "running"][:40]
+        start = time.perf_counter()
+        fan_out({vm_key(vm): (lambda vm=vm: pm.perform(vm, "reset")) for vm in targets}, 8)
+        results["bulk.throughput"] = len(targets) / (time.perf_counter() - start)
+    return results
+
+
+def bench_render(runs=5):
+    import tracemalloc
+    from rich.console import Console
+    import view
+    from inventory import VMInventory
+
+    vms = synthetic_vms(10000)
+    console = Console(file=open(os.devnull, "w"), width=160)
+
+    def build():
+        view._row_cache.clear()
+        return view.build_vm_table(vms, True, {})
+
+    def render():
+        console.print(build())
+
+    # build: unser Teil (Zeilen, Cache); table: inkl. Layout und Ausgabe durch rich
+    results = {"render.build_per_1k": _median_ms(build, runs) / 10,
+               "render.table_per_1k": _median_ms(render, runs) / 10}
+
+    # Arbeitsspeicher für Inventar + Tabelle bei 10k Gästen
+    view._row_cache.clear()
+    tracemalloc.start()
+    VMInventory(synthetic_vms(10000))
+    view.build_vm_table(vms, True, {})
+    results["memory.peak_10k"] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    tracemalloc.stop()
+    return results
+
+
+def load_history(path=HISTORY_PATH):
+    try:
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+
+
+def save_history(results, path=HISTORY_PATH):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    entry = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "python": sys.version.split()[0],
+             "results": {k: round(v, 3) for k, v in results.items()}}
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def _regressed(name, value, previous):
+    if not previous:
+        return False
+    if name in HIGHER_IS_BETTER:
+        return value < previous * (1 - REGRESSION)
+    return value > previous * (1 + REGRESSION)
+
+
+def report(results, previous=None):
+    # previous: Ergebnisse des letzten gespeicherten Laufs
+    previous = previous or {}
+    failed = []
+    print(f"{'benchmark':<32} {'value':>10} {'unit':>6} {'budget':>10} {'previous':>10}")
+    for name, value in results.items():
+        budget = BUDGETS_MS.get(name)
+        mark = ""
+        if budget is not None and value > budget:
+            failed.append(name)
+            mark = "  OVER BUDGET"
+        elif _regressed(name, value, previous.get(name)):
+            mark = "  REGRESSION"
+        prev = previous.get(name)
+        print(f"{name:<32} {value:>10.1f} {UNITS.get(name, 'ms'):>6} {budget if budget is not None else '-':>10} "
+              f"{f'{prev:.1f}' if prev is not None else '-':>10}{mark}")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Proxmon benchmarks")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--suite", choices=("startup", "api", "render", "all"), default="all")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON lines file with earlier results")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for suite, run in (("startup", bench_startup), ("api", bench_api), ("render", bench_render)):
+        if args.suite in (suite, "all"):
+            results.update(run(args.runs))
+
+    history = load_history(args.history)
+    failed = report(results, history[-1]["results"] if history else None)
+    if not args.no_save:
+        save_history(results, args.history)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+from concurrency import fan_out
+from inventory import vm_key
+
+
+def run_bulk(pm, vms, action, parallelism=4, show_progress=True):
+    """Run `action` on all guests concurrently with one progress row each.
+
+    Returns {key: result or exception}.
+    """
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        TextColumn("{task.fields[state]}"),
+        TimeElapsedColumn(),
+        disable=not show_progress
+    ) as progress:
+        rows = {}
+        for vm in vms:
+            key = vm_key(vm)
+            label = f"{action.capitalize()} {vm['type'].upper()} {key} ({vm.get('name', '-')})"
+            rows[key] = progress.add_task(label, total=1, state="queued")
+
+        def job(vm):
+            row = rows[vm_key(vm)]
+            progress.update(row, state="running")
+            try:
+                res = pm.perform(vm, action)
+            except Exception:
+                progress.update(row, state="[red]failed", completed=1)
+                raise
+            progress.update(row, state="[green]done", completed=1)
+            return res
+
+        return fan_out({vm_key(vm): (lambda vm=vm: job(vm)) for vm in vms}, parallelism)
@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import Counter
+
+# Sekunden pro Endpoint; per "cache_ttl" in der Config überschreibbar
+DEFAULT_TTLS = {
+    "resources": 2,
+    "nodes": 2,
+    "version": 3600,
+    "dns": 3600,
+    "apt": 600,
+    "storage": 10,
+}
+
+
+class ResponseCache:
+    """TTL cache for read endpoints, keyed by (server, endpoint, node).
+
+    Mutating calls invalidate only the keys they affect; hit/miss counters
+    per endpoint are kept for :cache.
+    """
+
+    def __init__(self, ttls=None):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.hits = Counter()
+        self.misses = Counter()
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        endpoint = key[1]
+        ttl = self.ttls.get(endpoint, 0)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < ttl:
+                self.hits[endpoint] += 1
+                return True, entry[1]
+            self.misses[endpoint] += 1
+        return False, None
+
+    def _store(self, key, value):
+        if self.ttls.get(key[1], 0) > 0:
+            with self._lock:
+                self._entries[key] = (time.monotonic(), value)
+
+    def get(self, key, loader):
+        hit, value = self._lookup(key)
+        if not hit:
+            value = loader()
+            self._store(key, value)
+        return value
+
+    async def aget(self, key, loader):
+        # wie get(), Loader ist eine Coroutine-Funktion (AsyncProxmoxManager)
+        hit, value = self._lookup(key)
+        if not hit:
+            value = await loader()
+            self._store(key, value)
+        return value
+
+    def invalidate(self, server, endpoint, node=None):
+        with self._lock:
+            if node is not None:
+                self._entries.pop((server, endpoint, node), None)
+                return
+            for key in [k for k in self._entries if k[0] == server and k[1] == endpoint]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        endpoints = sorted(set(self.hits) | set(self.misses))
+        return [(e, self.hits[e], self.misses[e], self.ttls.get(e, 0)) for e in endpoints]
@@ -0,0 +1,230 @@
+import argparse
+import csv
+import json
+import sys
+from contextlib import redirect_stdout
+
+# Exit-Codes für Skripte/Monitoring
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_CONFIG = 3
+EXIT_NOT_FOUND = 4
+
+VM_FIELDS = ["cluster", "vmid", "name", "type", "node", "status", "cpu", "mem", "maxmem",
+             "disk", "maxdisk", "uptime", "tags"]
+NODE_FIELDS = ["cluster", "node", "status", "pveversion", "hostname", "dns_ips", "upgradable", "error"]
+TASK_FIELDS = ["upid", "node", "type", "id", "user", "status", "starttime", "endtime"]
+ACTION_FIELDS = ["target", "action", "ok", "result"]
+ACTIONS = ("start", "stop", "shutdown", "reset", "restart", "hardreset", "delete")
+
+
+class RowWriter:
+    """Writes rows as soon as they arrive: json (streamed array), ndjson or csv."""
+
+    def __init__(self, fmt, fields, out):
+        self.fmt = fmt
+        self.fields = fields
+        self.out = out
+        self.count = 0
+        if fmt == "csv":
+            self.csv = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+            self.csv.writeheader()
+        elif fmt == "json":
+            out.write("[")
+
+    def write(self, row):
+        if self.fmt == "csv":
+            self.csv.writerow(row)
+        elif self.fmt == "ndjson":
+            self.out.write(json.dumps(row, separators=(",", ":")) + "\n")
+        else:
+            self.out.write(("," if self.count else "") + "\n" + json.dumps(row, separators=(",", ":")))
+        self.count += 1
+        self.out.flush()
+
+    def close(self):
+        if self.fmt == "json":
+            self.out.write("\n]\n" if self.count else "]\n")
+        self.out.flush()
+
+
+def _common_options(defaults=True):
+    # vor und nach dem Unterbefehl erlaubt; beim Unterbefehl ohne Defaults,
+    # sonst überschreiben sie Angaben vor ihm
+    default = (lambda value: value) if defaults else (lambda value: argparse.SUPPRESS)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--server", default=default(None), help="server name from the config (default: first)")
+    common.add_argument("--all", action="store_true", default=default(False), help="query all configured servers")
+    common.add_argument("--format", choices=("json", "ndjson", "csv"), default=default("json"))
+    common.add_argument("--trace", metavar="FILE", default=default(None),
+                        help="write the API calls as a Chrome trace to FILE")
+    return common
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="prox.py", description="Proxmon – Proxmox CLI", parents=[_common_options()])
+    sub = parser.add_subparsers(dest="command", required=True)
+    common = _common_options(defaults=False)
+
+    sub.add_parser("vms", help="list guests", parents=[common])
+    sub.add_parser("nodes", help="node overview", parents=[common])
+    tasks = sub.add_parser("tasks", help="recent tasks of a node", parents=[common])
+    tasks.add_argument("node")
+    tasks.add_argument("--limit", type=int)
+    metrics = sub.add_parser("serve-metrics", help="OpenMetrics/Prometheus endpoint", parents=[common])
+    metrics.add_argument("--listen", default="127.0.0.1")
+    metrics.add_argument("--port", type=int, default=9221)
+    metrics.add_argument("--interval", type=float, help="collect interval (default: update_interval)")
+    for action in ACTIONS:
+        p = sub.add_parser(action, help=f"{action} guests (IDs, ranges, names, selectors)", parents=[common])
+        p.add_argument("targets", nargs="+")
+        if action == "delete":
+            p.add_argument("--yes", action="store_true", help="required to actually delete")
+    return parser
+
+
+def _manager(config, args):
+    from model import ProxmoxManager, MultiProxmoxManager
+
+    servers = config.get("servers", [])
+    if not servers:
+        raise LookupError("No servers configured.")
+    if args.all:
+        return MultiProxmoxManager(config)
+    if args.server:
+        servers = [s for s in servers if s["name"] == args.server]
+        if not servers:
+            raise LookupError(f"Unknown server '{args.server}'.")
+    return ProxmoxManager({**config, "servers": servers[:1]})
+
+
+def _vm_row(vm):
+    return {k: vm.get(k) for k in VM_FIELDS}
+
+
+def _node_row(node):
+    row = {k: node.get(k) for k in NODE_FIELDS}
+    row["upgradable"] = node.get("updates", {}).get("upgradable", 0)
+    return row
+
+
+def run_vms(pm, config, args):
+    writer = RowWriter(args.format, VM_FIELDS, args.out)
+    for vm in pm.fetch_vms():
+        writer.write(_vm_row(vm))
+    writer.close()
+    return EXIT_OK
+
+
+def run_nodes(pm, config, args):
+    writer = RowWriter(args.format, NODE_FIELDS, args.out)
+    errors = []
+
+    def emit(node):
+        if node.get("error"):
+            errors.append(node["node"])
+        writer.write(_node_row(node))
+
+    pm.fetch_nodes(on_row=emit)
+    writer.close()
+    return EXIT_ERROR if errors else EXIT_OK
+
+
+def run_tasks(pm, config, args):
+    # API-Fehler gehen an main() (EXIT_ERROR), nur unbekannte Nodes hier
+    try:
+        tasks = pm.fetch_tasks(args.node, args.limit or config.get("task_limit", 15))
+    except LookupError as e:
+        print(e, file=sys.stderr)
+        return EXIT_NOT_FOUND
+    writer = RowWriter(args.format, TASK_FIELDS, args.out)
+    for task in tasks:
+        writer.write({k: task.get(k) for k in TASK_FIELDS})
+    writer.close()
+    return EXIT_OK
+
+
+def run_action(pm, config, args):
+    from concurrency import fan_out
+    from inventory import VMInventory, vm_key
+
+    if args.command == "delete" and not args.yes:
+        print("Refusing to delete without --yes.", file=sys.stderr)
+        return EXIT_USAGE
+
+    from query import QueryError
+
+    inventory = VMInventory(pm.fetch_vms())
+    try:
+        targets, misses = inventory.select(" ".join(args.targets))
+    except QueryError as e:
+        print(f"Invalid selector: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    for token in misses:
+        print(f"VM/CT {token} not found.", file=sys.stderr)
+    if not targets:
+        return EXIT_NOT_FOUND
+
+    writer = RowWriter(args.format, ACTION_FIELDS, args.out)
+
+    def emit(key, res):
+        failed = isinstance(res, Exception)
+        writer.write({"target": key, "action": args.command, "ok": not failed, "result": str(res)})
+
+    results = fan_out(
+        {vm_key(vm): (lambda vm=vm: pm.perform(vm, args.command)) for vm in targets},
+        config.get("bulk_parallelism", 4), on_result=emit
+    )
+    writer.close()
+    if any(isinstance(r, Exception) for r in results.values()):
+        return EXIT_ERROR
+    return EXIT_NOT_FOUND if misses else EXIT_OK
+
+
+def run_serve_metrics(pm, config, args):
+    from exporter import serve
+
+    serve(pm, args.interval or config.get("update_interval", 10), args.listen, args.port)
+    return EXIT_OK
+
+
+COMMANDS = {"vms": run_vms, "nodes": run_nodes, "tasks": run_tasks, "serve-metrics": run_serve_metrics}
+
+
+def main(argv=None):
+    from model import ConfigManager
+
+    args = build_parser().parse_args(argv)
+    config = ConfigManager().load()
+    try:
+        with redirect_stdout(sys.stderr):
+            pm = _manager(config, args)
+    except LookupError as e:
+        print(e, file=sys.stderr)
+        return EXIT_CONFIG
+    except Exception as e:
+        print(f"Connection failed: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    handler = COMMANDS.get(args.command, run_action)
+    args.out = sys.stdout
+    try:
+        # Meldungen der Manager gehören nicht in die Datenausgabe
+        with redirect_stdout(sys.stderr):
+            return handler(pm, config, args)
+    except Exception as e:
+        print(f"{args.command} failed: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        if args.trace:
+            _write_trace(args.trace)
+
+
+def _write_trace(path):
+    from tracing import TRACER
+
+    try:
+        TRACER.export(path, "chrome")
+    except OSError as e:
+        print(f"Could not write trace: {e}", file=sys.stderr)
@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class FetchTimeout(Exception):
+    pass
+
+
+def fan_out(jobs, max_workers=8, timeout=None, on_result=None):
+    """Run a dict of {key: callable} on a bounded thread pool.
+
+    Returns {key: result}; a failed call maps to its exception and a call still
+    running when `timeout` expires maps to FetchTimeout, so callers always get
+    partial results instead of one slow call stalling everything.
+    """
+    results = {}
+    if not jobs:
+        return results
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))))
+    futures = {pool.submit(fn): key for key, fn in jobs.items()}
+    deadline = None if timeout is None else time.monotonic() + timeout
+    pending = set(futures)
+
+    try:
+        while pending:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for fut in done:
+                key = futures[fut]
+                try:
+                    res = fut.result()
+                except Exception as e:
+                    res = e
+                results[key] = res
+                if on_result:
+                    on_result(key, res)
+
+        for fut in pending:
+            key = futures[fut]
+            results[key] = FetchTimeout(f"no response within {timeout}s")
+            if on_result:
+                on_result(key, results[key])
+    finally:
+        # nicht auf hängende Requests warten
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return results
@@ -1,9 +1,22 @@
-from model import ConfigManager, ProxmoxManager
+from model import ConfigManager, ProxmoxManager, MultiProxmoxManager
+from inventory import VMInventory, vm_key
+from metrics import MetricsStore
+from events import DiffEngine, EventLog
+from query import Query, QueryError
+from guestconfig import ConfigStore
+from jobs import Job, JobRunner, SNAPSHOT_PREFIX, disk_storages, parse_age
+from concurrency import fan_out
 from settings_controller import settings_menu
-from view import display_help, display_vm_table, prompt_command, display_tasks, display_node_table
+from view import display_help, display_vm_table, build_vm_table, prompt_command, display_tasks, display_node_table, display_bulk_summary, display_cache_stats, display_api_stats, display_storage, display_guest_info, display_find_results, build_job_table, display_job_report, display_rolling_report, print_task_line, build_event_panel, display_events, console, VM_COLUMNS, DEFAULT_VM_COLUMNS
 from util import ensure_config_dir, clear_screen
-from settings_controller import settings_menu
-from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+from tracing import TRACER
+import snapshot
+import threading
+import time
+
+ALL_SERVERS = object()
+# Snapshot höchstens alle 30 s schreiben (:watch pollt deutlich öfter)
+SNAPSHOT_INTERVAL = 30
 
 class ProxmonController:
     def __init__(self):
@@ -14,11 +27,32 @@ class ProxmonController:
             exit()
 
         self.selected_server = self._choose_server(self.config["servers"])
-        self.pm = ProxmoxManager({"servers": [self.selected_server]})
-        self.current_vms = []
+        self.snapshot_name = "all" if self.selected_server is ALL_SERVERS else self.selected_server["name"]
+        self.pm = None
+        self.nodes = None
+        self._snapshot_saved = 0
+        self.inventory = VMInventory()
+        self.query = Query()
+        self.page = 0
+        self.metrics = None
+        self.differ = DiffEngine(self.config.get("cpu_load_red", 90),
+                                 self.config.get("event_disk_growth_mb", 1024) * 1024 ** 2)
+        self.events = EventLog(self.config.get("event_log") or None)
+        TRACER.enabled = self.config.get("tracing", True)
+        self.configs = ConfigStore(self.config.get("config_max_age", 3600))
+
+    def _connect(self):
+        if self.selected_server is ALL_SERVERS:
+            return MultiProxmoxManager(self.config)
+        return ProxmoxManager({**self.config, "servers": [self.selected_server]})
 
     def run(self):
-        self._clear_and_refresh()
+        self._show_snapshot()
+        # Login und erster Fetch hinter dem Spinner, die alte Tabelle bleibt stehen
+        with console.status("Connecting..."):
+            self.pm = self._connect()
+            vms = self.pm.fetch_vms(**self.query.narrow())
+        self.refresh(clear=True, vms=vms)
         print("Type :? for help.")
 
         while True:
@@ -42,6 +76,55 @@ class ProxmonController:
                 clear_screen()
                 settings_menu(self.config)
 
+            # Live-Ansicht
+            elif cmd == ":watch":
+                self._watch()
+
+            # Blättern in der VM-Tabelle (ohne neuen Fetch)
+            elif self._page_command(cmd):
+                clear_screen()
+                self._display()
+
+            # Filter/Sortierung/Spalten; neuer Fetch nur, wenn sich die API-Einschränkung ändert
+            elif (change := self._query_command(cmd)) is not None:
+                if change == "refetch":
+                    self._clear_and_refresh()
+                elif change == "redraw":
+                    clear_screen()
+                    self._display()
+
+            # RRD-Historie laden (Trend-Spalten)
+            elif cmd == ":trend" or cmd.startswith(":trend "):
+                parts = cmd.split()
+                self._load_trends(parts[1] if len(parts) > 1 else "hour")
+
+            # Zustandsänderungen seit Start
+            elif cmd == ":events":
+                display_events(self.events.recent)
+
+            # Cache-Statistik
+            elif cmd == ":cache":
+                display_cache_stats(self.pm.cache.stats())
+
+            # Config eines Gasts bzw. Suche über alle Configs
+            elif cmd.startswith(":info "):
+                self._show_info(cmd.split(maxsplit=1)[1])
+            elif cmd.startswith(":find "):
+                self._find(cmd.split(maxsplit=1)[1])
+
+            # Snapshots/Backups vieler Gäste
+            elif cmd.startswith((":snapshot ", ":backup ")):
+                kind, *args = cmd.split()
+                self._jobs_command(kind[1:], args)
+
+            # Storage-Belegung und Backup-Alter
+            elif cmd in (":storage", ":storage all"):
+                self._show_storage(cmd.endswith(" all"))
+
+            # Latenz/Fehler pro API-Endpoint
+            elif cmd == ":stats" or cmd.startswith(":stats "):
+                self._stats_command(cmd.split()[1:])
+
             # Nodes anzeigen
             elif cmd == ":nodes":
                 clear_screen()
@@ -50,10 +133,12 @@ class ProxmonController:
             # Tasks anzeigen – zuerst prüfen, bevor andere :<command> <arg> greifen
             elif cmd.startswith(":tasks"):
                 parts = cmd.split()
-                if len(parts) == 2:
+                if len(parts) >= 2 and parts[1] == "--follow":
+                    self._follow_tasks(parts[2:])
+                elif len(parts) == 2:
                     self._show_tasks(parts[1])
                 else:
-                    print("Usage: :tasks <nodename>")
+                    print("Usage: :tasks <nodename> | :tasks --follow [NODE] [UPID]")
 
             # Node-Reboot separat behandeln, da es kein VM-Befehl ist
             elif cmd.startswith(":node-restart "):
@@ -61,16 +146,7 @@ class ProxmonController:
                 self._handle_vm_command(":node-restart", arg)
                 
             elif cmd.startswith(":ru "):
-                node = cmd.split()[1]
-                confirm = input(f"Update Node '{node}' and reboot after? [y/N]: ").strip().lower()
-                if confirm == "y":
-                    try:
-                        self.pm.update_node(node)
-                        return f"Update triggered for {node}"
-                    except Exception as e:
-                        return f"Update failed: {e}"
-                else:
-                    return "Update canceled."
+                self._rolling_update(cmd.split()[1:])
             
             elif cmd.startswith(":dns "):
                 node = cmd.split()[1]
@@ -79,13 +155,14 @@ class ProxmonController:
                 dns3 = input("Tertiary DNS (optional): ").strip()
 
                 if not dns1:
-                    return "Primary DNS is required."
+                    print("Primary DNS is required.")
+                    continue
 
                 try:
                     self.pm.set_dns(node, dns1, dns2 or None, dns3 or None)
-                    return f"DNS updated for {node}"
+                    print(f"DNS updated for {node}")
                 except Exception as e:
-                    return f"Failed to update DNS: {e}"
+                    print(f"Failed to update DNS: {e}")
                         
             # Generische VM-Kommandos mit Argument
             elif cmd.startswith(":") and len(cmd.split()) > 1:
@@ -97,7 +174,7 @@ class ProxmonController:
                 print("Unknown command. Use :? for help.")
 
 
-    def _handle_vm_command(self, action, arg):
+    def _handle_vm_command(self, action, arg, refresh=True):
         commands = {
             ":restart": self.pm.restart_vm,
             ":start": self.pm.start_vm,
@@ -107,18 +184,353 @@ class ProxmonController:
             ":delete": self.pm.delete_vm,
         }
 
-        if action in commands:
-            commands[action](arg, self.current_vms)
-            self._clear_and_refresh()
-        elif action == ":hardreset":
-            self.pm.stop_vm(arg, self.current_vms)
-            self.pm.start_vm(arg, self.current_vms)
-            self._clear_and_refresh()
+        summary = None
+        if action in commands or action == ":hardreset":
+            targets = self._resolve_targets(arg)
+            if not targets:
+                return
+            if action == ":delete" and len(targets) > 1:
+                confirm = input(f"Delete {len(targets)} guests? [y/N]: ").strip().lower()
+                if confirm != "y":
+                    print("Delete canceled.")
+                    return
+
+            if len(targets) == 1 and refresh:
+                key = vm_key(targets[0])
+                if action == ":hardreset":
+                    self.pm.stop_vm(key, self.inventory)
+                    self.pm.start_vm(key, self.inventory)
+                else:
+                    commands[action](key, self.inventory)
+            else:
+                # mehrere Ziele parallel, eine Fortschrittsanzeige, ein Refresh am Ende
+                from bulk import run_bulk
+                results = run_bulk(self.pm, targets, action[1:],
+                                   self.config.get("bulk_parallelism", 4), show_progress=refresh)
+                summary = (action[1:], results)
         elif action == ":node-restart":
             self.pm.restart_node(arg)
-            self._clear_and_refresh()
         else:
             print("Unknown command. Use :? for help.")
+            return
+
+        if refresh:
+            self._clear_and_refresh()
+        if summary:
+            display_bulk_summary(*summary)
+
+    def _resolve_targets(self, arg):
+        # über den Index auflösen: IDs, Bereiche, <cluster>/<ID>, Namen, Globs, tag:, Bedingungen
+        try:
+            targets, misses = self.inventory.select(arg)
+        except QueryError as e:
+            print(f"Invalid selector: {e}")
+            return []
+        for token in misses:
+            print(f"VM/CT {token} not found.")
+        return targets
+
+    def _page_command(self, cmd):
+        parts = cmd.split()
+        if cmd == ":next":
+            self.page += 1
+        elif cmd == ":prev":
+            self.page = max(0, self.page - 1)
+        elif len(parts) == 2 and parts[0] == ":page" and parts[1].isdigit():
+            self.page = max(0, int(parts[1]) - 1)
+        else:
+            return False
+        return True
+
+    def _watch(self):
+        from rich.console import Group
+        from rich.live import Live
+
+        interval = self.config.get("update_interval", 10)
+        use_color = self.config.get("use_color", False)
+        stop = threading.Event()
+        wake = threading.Event()
+
+        def render():
+            # virtuelles Scrollen: nur so viele Zeilen wie ins Terminal passen
+            pane = self.config.get("event_pane_lines", 8)
+            page_size = self.config.get("page_size", 0) or max(5, console.size.height - 10 - (pane + 2 if pane else 0))
+            table = build_vm_table(self.query.apply(self.inventory.vms), use_color, self.config, self.page,
+                                   page_size, self.metrics, caption=self._caption())
+            if not pane:
+                return table
+            return Group(table, build_event_panel(self.events.recent, pane))
+
+        def poll(live):
+            # Hintergrund-Thread: cluster/resources alle `interval` Sekunden
+            while not stop.is_set():
+                try:
+                    self._set_inventory(self.pm.fetch_vms(**self.query.narrow()))
+                    live.update(render(), refresh=True)
+                except Exception as e:
+                    live.console.print(f"Refresh failed: {e}")
+                wake.wait(interval)
+                wake.clear()
+
+        clear_screen()
+        with Live(render(), console=console, auto_refresh=False) as live:
+            poller = threading.Thread(target=poll, args=(live,), daemon=True)
+            poller.start()
+            live.console.print(f"Watching (every {interval}s). :q leaves, :r refreshes now.")
+
+            while True:
+                cmd = prompt_command()
+                if cmd in (":q", "q", ":watch"):
+                    break
+                elif cmd in (":r", "r"):
+                    wake.set()
+                elif self._page_command(cmd):
+                    live.update(render(), refresh=True)
+                elif (change := self._query_command(cmd)) is not None:
+                    if change == "refetch":
+                        wake.set()
+                    live.update(render(), refresh=True)
+                elif cmd.startswith(":") and len(cmd.split()) > 1:
+                    action, arg = cmd.split(maxsplit=1)
+                    self._handle_vm_command(action, arg, refresh=False)
+                    wake.set()
+                else:
+                    live.console.print("Watch mode: :q, :r, :next/:prev or :<action> <ID>")
+
+            stop.set()
+            wake.set()
+            poller.join(timeout=1)
+
+    def _rolling_update(self, args):
+        parallel = self.config.get("rolling_parallel", 1)
+        if "-n" in args:
+            i = args.index("-n")
+            if i + 1 >= len(args) or not args[i + 1].isdigit():
+                print("Usage: :ru <NODE>...|all [-n N]")
+                return
+            parallel = int(args[i + 1])
+            del args[i:i + 2]
+        nodes = args
+        if nodes == ["all"]:
+            nodes = [f"{n['cluster']}/{n['node']}" if n.get("cluster") else n["node"] for n in self.pm.fetch_nodes()]
+        if not nodes:
+            print("Usage: :ru <NODE>...|all [-n N]")
+            return
+
+        confirm = input(f"Rolling reboot of {', '.join(nodes)} ({parallel} at a time): migrate guests away, "
+                        f"refresh package lists (installs nothing), reboot? [y/N]: ").strip().lower()
+        if confirm != "y":
+            print("Rolling reboot canceled.")
+            return
+
+        def progress(node, phase, detail):
+            print(f"{time.strftime('%H:%M:%S')}  {node:<12} {phase:<9} {detail}")
+
+        reports = self.pm.rolling_update(
+            nodes, parallel=parallel,
+            migrate_parallelism=self.config.get("bulk_parallelism", 4),
+            migrate_back=self.config.get("rolling_migrate_back", True),
+            online_timeout=self.config.get("node_online_timeout", 900),
+            on_progress=progress,
+        )
+        if reports:
+            display_rolling_report(reports)
+
+    def _sync_configs(self, vms=None):
+        # nur neue Gäste und solche mit geändertem Fingerprint/Lock lesen
+        from rich.progress import Progress, BarColumn, MofNCompleteColumn, TextColumn
+
+        full = vms is None
+        if full:
+            vms = self.pm.fetch_vms()
+        stale = self.configs.stale(vms)
+        if stale:
+            by_key = {vm_key(vm): vm for vm in stale}
+            with Progress(TextColumn("Reading guest configs"), BarColumn(), MofNCompleteColumn(),
+                          transient=True) as progress:
+                bar = progress.add_task("", total=len(stale))
+                results = self.pm.fetch_guest_configs(stale, on_result=lambda key, res: progress.advance(bar))
+            failed = 0
+            for key, res in results.items():
+                if isinstance(res, Exception):
+                    failed += 1
+                else:
+                    self.configs.put(by_key[key], res)
+            if failed:
+                print(f"{failed} of {len(stale)} config(s) could not be read.")
+        if full:
+            self.configs.prune(vms)
+        return vms
+
+    def _show_info(self, arg):
+        targets = self._resolve_targets(arg)
+        if len(targets) > 1:
+            print(f"'{arg}' matches {len(targets)} guests, use the ID.")
+            return
+        if not targets:
+            return
+        vm = targets[0]
+        try:
+            config = self.pm.fetch_guest_config(vm)
+        except Exception as e:
+            print(f"Failed to load config of {vm_key(vm)}: {e}")
+            return
+        self.configs.put(vm, config)
+        display_guest_info(vm, config)
+
+    def _find(self, text):
+        try:
+            vms = self._sync_configs()
+            keys = self.configs.find(text)
+        except QueryError as e:
+            print(f"Invalid search: {e}")
+            return
+        except Exception as e:
+            print(f"Search failed: {e}")
+            return
+        display_find_results([vm for vm in vms if vm_key(vm) in keys], text, self.configs)
+
+    def _jobs_command(self, kind, args):
+        usage = ("Usage: :snapshot <SEL>... [--name NAME] [--vmstate] | :snapshot prune <AGE> <SEL>... [--all]"
+                 if kind == "snapshot" else "Usage: :backup <SEL>... [--storage ID] [--mode snapshot|suspend|stop]")
+        takes_value = {"--name": True, "--storage": True, "--mode": True, "--vmstate": False, "--all": False}
+        opts, words = {}, []
+        args = iter(args)
+        for word in args:
+            if word in takes_value:
+                opts[word] = next(args, None) if takes_value[word] else True
+                if opts[word] is None:
+                    print(usage)
+                    return
+            else:
+                words.append(word)
+
+        if kind == "snapshot" and words[:1] == ["prune"]:
+            self._prune_snapshots(words[1:], opts.get("--all", False), usage)
+            return
+        targets = self._resolve_targets(" ".join(words)) if words else []
+        if not targets:
+            if not words:
+                print(usage)
+            return
+
+        storage = None
+        if kind == "snapshot":
+            name = opts.get("--name") or SNAPSHOT_PREFIX + time.strftime("%Y%m%d_%H%M%S")
+            params = {"snapname": name, "description": "proxmon"}
+            # RAM-Inhalt gibt es nur bei VMs
+            with_state = {**params, "vmstate": 1} if opts.get("--vmstate") else params
+            shared, storages = self._job_storages(targets)
+            jobs = [Job(vm, "snapshot", with_state if vm["type"] == "qemu" else params, storages(vm), shared)
+                    for vm in targets]
+            title = f"Snapshot {name}"
+        else:
+            storage = opts.get("--storage") or self.config.get("backup_storage")
+            if not storage:
+                print("No backup storage, use --storage ID or set backup_storage in the config.")
+                return
+            params = {"storage": storage, "mode": opts.get("--mode") or self.config.get("backup_mode", "snapshot")}
+            shared, storages = self._job_storages(targets, storage)
+            jobs = [Job(vm, "backup", params, storages(vm), shared) for vm in targets]
+            title = f"Backup to {storage}"
+
+        if len(jobs) > 1 and input(f"{title} for {len(jobs)} guests? [y/N]: ").strip().lower() != "y":
+            print("Canceled.")
+            return
+        self._run_jobs(title, jobs, storage)
+
+    def _job_storages(self, vms, storage=None):
+        # Limit pro Storage: Ziel-Storage beim Backup, sonst die Disk-Storages aus der Config
+        try:
+            shared = self.pm.shared_storages()
+        except Exception:
+            shared = set()
+        if storage:
+            return shared, lambda vm: (storage,)
+        self._sync_configs(vms)
+        return shared, lambda vm: disk_storages(self.configs.get(vm_key(vm)) or {})
+
+    def _prune_snapshots(self, words, include_all, usage):
+        if len(words) < 2:
+            print(usage)
+            return
+        try:
+            cutoff = time.time() - parse_age(words[0])
+        except ValueError as e:
+            print(e)
+            return
+        targets = self._resolve_targets(" ".join(words[1:]))
+        if not targets:
+            return
+        with console.status(f"Listing snapshots of {len(targets)} guest(s)..."):
+            lists = fan_out({vm_key(vm): (lambda vm=vm: self.pm.list_snapshots(vm)) for vm in targets},
+                            self.config.get("max_workers", 8))
+
+        old = {}
+        for vm in targets:
+            snaps = lists[vm_key(vm)]
+            if isinstance(snaps, Exception):
+                print(f"{vm_key(vm)}: {snaps}")
+                continue
+            for snap in snaps:
+                if snap.get("snaptime", cutoff) < cutoff and (include_all or snap["name"].startswith(SNAPSHOT_PREFIX)):
+                    old.setdefault(vm_key(vm), (vm, []))[1].append(snap["name"])
+        if not old:
+            print("No snapshots to prune.")
+            return
+
+        count = sum(len(names) for _, names in old.values())
+        if input(f"Delete {count} snapshot(s) of {len(old)} guest(s)? [y/N]: ").strip().lower() != "y":
+            print("Canceled.")
+            return
+        shared, storages = self._job_storages([vm for vm, _ in old.values()])
+        jobs = [Job(vm, "delsnapshot", {"snapname": name}, storages(vm), shared)
+                for vm, names in old.values() for name in names]
+        self._run_jobs(f"Prune snapshots older than {words[0]}", jobs)
+
+    def _run_jobs(self, title, jobs, backup_storage=None):
+        from rich.live import Live
+
+        runner = JobRunner(self.pm, self.config.get("job_parallelism", 8), self.config.get("job_node_limit", 2),
+                           self.config.get("job_storage_limit", 2), self.config.get("job_timeout", 3600))
+        since = int(time.time())
+        limit = max(5, console.size.height - 8)
+        with Live(get_renderable=lambda: build_job_table(jobs, title, limit), console=console, refresh_per_second=4):
+            runner.run(jobs)
+
+        size = None
+        done = [job.vm for job in jobs if job.state == "done"]
+        if backup_storage and done:
+            try:
+                size = self.pm.backup_size(done, backup_storage, since)
+            except Exception as e:
+                print(f"Could not read backup sizes: {e}")
+        display_job_report(title, jobs, runner.finished - runner.started, size)
+
+    def _show_storage(self, show_all=False):
+        try:
+            with console.status("Loading storage and backups..."):
+                report = self.pm.fetch_storage()
+        except Exception as e:
+            print(f"Failed to load storage: {e}")
+            return
+        clear_screen()
+        display_storage(report, self.inventory.vms, self.config, show_all)
+
+    def _stats_command(self, args):
+        if not args:
+            display_api_stats(TRACER.rows(), TRACER.started)
+        elif args == ["reset"]:
+            TRACER.reset()
+            print("API stats cleared.")
+        elif len(args) == 2 and args[0] in ("json", "chrome"):
+            try:
+                TRACER.export(args[1], args[0])
+                print(f"Wrote {args[0]} stats to {args[1]}")
+            except OSError as e:
+                print(f"Export failed: {e}")
+        else:
+            print("Usage: :stats | :stats reset | :stats json|chrome <FILE>")
 
     def _show_tasks(self, node):
         clear_screen()
@@ -126,23 +538,176 @@ class ProxmonController:
         tasks = self.pm.list_tasks(node, limit)
         display_tasks(tasks)
 
+    def _follow_tasks(self, args):
+        upid = next((a for a in args if a.startswith("UPID:") or "/UPID:" in a), None)
+        node = next((a for a in args if a != upid), None)
+        interval = self.config.get("follow_interval", 2)
+
+        if upid:
+            tail = self.pm.tail_task_log(upid)
+            if tail is None:
+                return
+            print(f"Following log of {upid} (Ctrl-C to stop)")
+        else:
+            follower = self.pm.follow_tasks(node, self.config.get("task_limit", 15))
+            if follower is None:
+                return
+            print(f"Following tasks on {node or 'the cluster'} (Ctrl-C to stop)")
+
+        try:
+            while True:
+                if upid:
+                    for line in tail.poll():
+                        print(line)
+                    if tail.finished():
+                        # Rest nach Task-Ende noch mitnehmen
+                        for line in tail.poll():
+                            print(line)
+                        print("Task finished.")
+                        return
+                else:
+                    for task in follower.poll():
+                        print_task_line(task)
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print()
+        except Exception as e:
+            print(f"Follow failed: {e}")
+
     def _clear_and_refresh(self):
+        self.refresh(clear=True)
+
+    def refresh(self, clear=False, vms=None):
+        if vms is None:
+            vms = self.pm.fetch_vms(**self.query.narrow())
+        events = self._set_inventory(vms)
+        # erst nach dem Fetch leeren, bis dahin bleibt die alte Tabelle stehen
+        if clear:
+            clear_screen()
+        self._display()
+        if events:
+            display_events(events)
+
+    def _set_inventory(self, vms):
+        self.inventory = VMInventory(vms)
+        if self.metrics is not None:
+            # Momentwerte an die Historie anhängen
+            for vm in self.inventory:
+                self.metrics.add_sample(vm)
+            self.metrics.prune(self.inventory)
+        events = self.differ.diff(self.inventory.vms)
+        try:
+            self.events.record(events)
+        except OSError as e:
+            print(f"Event log not writable: {e}")
+        # eingeschränkte Fetches sind kein vollständiges Inventar
+        if not self.query.narrow() and time.monotonic() - self._snapshot_saved >= SNAPSHOT_INTERVAL:
+            self._save_snapshot()
+        return events
+
+    def _display(self, stale=None):
+        display_vm_table(self.query.apply(self.inventory.vms), self.config.get("use_color", False),
+                         config=self.config, page=self.page, metrics=self.metrics, stale=stale,
+                         caption=self._caption())
+
+    def _caption(self):
+        if not self.query.active:
+            return None
+        return f"{self.query.describe()} – {len(self.query.apply(self.inventory.vms))} of {len(self.inventory)} guests"
+
+    def _query_command(self, cmd):
+        # None: kein Query-Befehl; sonst "refetch", "redraw" oder "" (nur Meldung)
+        name, _, arg = cmd.partition(" ")
+        arg = arg.strip()
+        if name not in (":filter", ":sort", ":top", ":columns"):
+            return None
+        narrowed = self.query.narrow()
+        try:
+            if name == ":filter":
+                self.query.set_filter(arg)
+            elif name == ":sort":
+                self.query.set_sort(arg)
+            elif name == ":top":
+                n, _, field = arg.partition(" ")
+                if arg and not n.isdigit():
+                    print("Usage: :top <N> [FIELD]")
+                    return ""
+                self.query.set_top(int(n) if arg else 0, field.strip())
+            else:
+                return self._columns_command(arg)
+        except QueryError as e:
+            print(f"Invalid query: {e}")
+            return ""
+        self.page = 0
+        if self.query.narrow() != narrowed:
+            # anderer Ausschnitt: Events nicht gegen den alten vergleichen
+            self.differ.prev = None
+            return "refetch"
+        return "redraw"
+
+    def _columns_command(self, arg):
+        current = self.config.get("vm_columns") or DEFAULT_VM_COLUMNS
+        if not arg:
+            print(f"Columns: {', '.join(current)}")
+            print(f"Available: {', '.join(VM_COLUMNS)}")
+            return ""
+        columns = DEFAULT_VM_COLUMNS if arg == "default" else [c for c in arg.replace(",", " ").split()]
+        unknown = [c for c in columns if c not in VM_COLUMNS]
+        if unknown:
+            print(f"Unknown column(s): {', '.join(unknown)}. Available: {', '.join(VM_COLUMNS)}")
+            return ""
+        self.config["vm_columns"] = list(columns)
+        ConfigManager().save(self.config)
+        return "redraw"
+
+    def _show_snapshot(self):
+        # letzten Stand sofort zeigen, bevor Login und Fetch durch sind
+        snap = snapshot.load(self.snapshot_name)
+        if snap is None:
+            return
+        self.nodes = snap.nodes
+        self.inventory = VMInventory(snap.vms)
+        # Basis für die Events: Änderungen seit dem letzten Lauf
+        self.differ.diff(snap.vms)
         clear_screen()
-        self.refresh()
+        self._display(stale=snap.saved)
+        if snap.nodes:
+            offline = sum(1 for n in snap.nodes if n.get("status") == "offline")
+            print(f"Nodes: {len(snap.nodes) - offline} online, {offline} offline")
 
-    def refresh(self):
-        self.current_vms = self.pm.fetch_vms()
-        display_vm_table(self.current_vms, self.config.get("use_color", False), config=self.config)
+    def _save_snapshot(self):
+        try:
+            snapshot.save(self.snapshot_name, self.inventory.vms, self.nodes)
+            self._snapshot_saved = time.monotonic()
+        except OSError as e:
+            print(f"Snapshot not writable: {e}")
 
-    def update_node(self, node):
-        self.proxmox.nodes(node).apt.update.post()
-        self.proxmox.nodes(node).status().reboot.post()
+    def _load_trends(self, timeframe):
+        from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
 
-    def set_dns(self, node, dns1, dns2=None, dns3=None):
-        dns_config = {"dns1": dns1}
-        if dns2: dns_config["dns2"] = dns2
-        if dns3: dns_config["dns3"] = dns3
-        self.proxmox.nodes(node).dns.post(**dns_config)
+        if timeframe not in ("hour", "day"):
+            print("Usage: :trend [hour|day]")
+            return
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            TimeElapsedColumn(),
+            transient=True
+        ) as progress:
+            progress.add_task(description=f"Lade RRD-Daten ({timeframe})...", total=None)
+            try:
+                nodes = self.pm.fetch_nodes()
+                rrd = self.pm.fetch_rrd(self.inventory.vms, nodes, timeframe)
+            except Exception as e:
+                progress.stop()
+                print(f"Fehler beim Laden der RRD-Daten: {e}")
+                return
+
+        self.metrics = MetricsStore(self.config.get("metrics_samples", 70))
+        for key, rows in rrd.items():
+            self.metrics.load_rrd(key, rows)
+        clear_screen()
+        self._display()
 
     def _choose_server(self, servers):
         while True:
@@ -150,8 +715,13 @@ class ProxmonController:
             print("[0] Server hinzufügen")
             for i, s in enumerate(servers, start=1):
                 print(f"[{i}] {s['name']} ({s['host']})")
+            if len(servers) > 1:
+                print("[a] Alle Server (aggregierte Ansicht)")
             try:
-                idx = int(input("Auswahl: "))
+                choice = input("Auswahl: ").strip()
+                if choice.lower() == "a" and len(servers) > 1:
+                    return ALL_SERVERS
+                idx = int(choice)
                 if idx == 0:
                     clear_screen()
                     settings_menu(self.config)
@@ -170,6 +740,8 @@ class ProxmonController:
                 print("Bitte eine Zahl eingeben.")
             
     def _show_nodes(self):
+        from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+
         clear_screen()
         with Progress(
             SpinnerColumn(),
@@ -186,4 +758,9 @@ class ProxmonController:
                 print(f"Fehler beim Laden der Nodes: {e}")
                 return
 
-        display_node_table(results, use_color=self.config.get("use_color", False))
+        self.nodes = results
+        # eingeschränkte Fetches sind kein vollständiges Inventar
+        if not self.query.narrow():
+            self._save_snapshot()
+        display_node_table(results, use_color=self.config.get("use_color", False),
+                           metrics=self.metrics, config=self.config)
@@ -0,0 +1,88 @@
+import json
+import time
+from collections import deque
+
+
+class Event:
+    __slots__ = ("time", "kind", "key", "name", "detail")
+
+    def __init__(self, kind, key, name, detail="", when=None):
+        self.time = when or time.time()
+        self.kind = kind
+        self.key = key
+        self.name = name
+        self.detail = detail
+
+    def as_dict(self):
+        cluster, vmid = self.key
+        return {"time": round(self.time, 3), "kind": self.kind, "cluster": cluster, "vmid": vmid,
+                "name": self.name, "detail": self.detail}
+
+
+class DiffEngine:
+    """Compares consecutive cluster/resources snapshots keyed by (cluster, vmid).
+
+    Only a small state tuple per guest is kept between refreshes; unchanged
+    guests cost one tuple comparison.
+    """
+
+    def __init__(self, cpu_threshold=90, disk_growth=1024 ** 3):
+        self.cpu_threshold = cpu_threshold / 100
+        self.disk_growth = disk_growth
+        self.prev = None
+
+    def diff(self, vms):
+        prev = self.prev
+        cur = {}
+        events = []
+        matched = 0
+        now = time.time()
+
+        for vm in vms:
+            key = (vm.get("cluster"), vm["vmid"])
+            state = (vm.get("status"), vm.get("node"), vm.get("cpu", 0) or 0, vm.get("disk", 0) or 0, vm.get("name", "-"))
+            cur[key] = state
+            if prev is None:
+                continue
+            old = prev.get(key)
+            if old is None:
+                events.append(Event("added", key, state[4], f"on {state[1]}", now))
+                continue
+            matched += 1
+            if old == state:
+                continue
+
+            status, node, cpu, disk, name = state
+            if status != old[0]:
+                kind = "started" if status == "running" else "stopped" if status == "stopped" else "status"
+                events.append(Event(kind, key, name, f"{old[0]} → {status}", now))
+            if node != old[1]:
+                events.append(Event("migrated", key, name, f"{old[1]} → {node}", now))
+            if (old[2] < self.cpu_threshold) != (cpu < self.cpu_threshold):
+                kind = "cpu_high" if cpu >= self.cpu_threshold else "cpu_normal"
+                events.append(Event(kind, key, name, f"{old[2] * 100:.0f}% → {cpu * 100:.0f}%", now))
+            if disk - old[3] >= self.disk_growth:
+                events.append(Event("disk_grew", key, name, f"+{(disk - old[3]) / 1024 ** 3:.1f} GB", now))
+
+        if prev is not None and matched != len(prev):
+            for key in prev.keys() - cur.keys():
+                events.append(Event("removed", key, prev[key][4], "", now))
+
+        self.prev = cur
+        return events
+
+
+class EventLog:
+    """Recent events for the event pane, optionally appended to an NDJSON file."""
+
+    def __init__(self, path=None, keep=200):
+        self.recent = deque(maxlen=keep)
+        self.path = path
+
+    def record(self, events):
+        if not events:
+            return
+        self.recent.extend(events)
+        if self.path:
+            with open(self.path, "a") as f:
+                f.writelines(json.dumps(e.as_dict(), ensure_ascii=False) + "\n" for e in events)
@@ -0,0 +1,167 @@
+import gzip
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+TEXT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+GUEST_GAUGES = [
+    ("proxmon_guest_up", "1 if the guest is running", lambda vm: 1 if vm.get("status") == "running" else 0),
+    ("proxmon_guest_cpu_ratio", "CPU usage (1.0 = all assigned cores)", lambda vm: vm.get("cpu", 0) or 0),
+    ("proxmon_guest_memory_bytes", "Used memory", lambda vm: vm.get("mem", 0) or 0),
+    ("proxmon_guest_memory_max_bytes", "Assigned memory", lambda vm: vm.get("maxmem", 0) or 0),
+    ("proxmon_guest_disk_bytes", "Used disk", lambda vm: vm.get("disk", 0) or 0),
+    ("proxmon_guest_disk_max_bytes", "Disk size", lambda vm: vm.get("maxdisk", 0) or 0),
+    ("proxmon_guest_uptime_seconds", "Uptime", lambda vm: vm.get("uptime", 0) or 0),
+]
+
+NODE_GAUGES = [
+    ("proxmon_node_up", "1 if the node is online", lambda n: 1 if n.get("status") == "online" else 0),
+    ("proxmon_node_updates_pending", "Upgradable packages", lambda n: n.get("updates", {}).get("upgradable", 0)),
+    ("proxmon_node_fetch_partial", "1 if some node sub-requests failed", lambda n: 1 if n.get("error") else 0),
+]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(pairs):
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in pairs if v is not None)
+
+
+def render_metrics(vms, nodes, stats):
+    """Render one snapshot as OpenMetrics text (gauges only)."""
+    lines = []
+    # Label-Strings einmal pro Gast/Node bauen, für alle Familien wiederverwenden
+    guest_labels = [(vm, _labels((("cluster", vm.get("cluster")), ("vmid", vm["vmid"]), ("name", vm.get("name")),
+                                  ("node", vm.get("node")), ("type", vm.get("type"))))) for vm in vms]
+    node_labels = [(n, _labels((("cluster", n.get("cluster")), ("node", n["node"])))) for n in nodes]
+
+    for families, items in ((GUEST_GAUGES, guest_labels), (NODE_GAUGES, node_labels)):
+        for name, help_text, value in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(f"{name}{{{labels}}} {value(item)}" for item, labels in items)
+
+    lines.append("# HELP proxmon_node_info Node version")
+    lines.append("# TYPE proxmon_node_info gauge")
+    lines.extend(
+        f'proxmon_node_info{{{labels},version="{_escape(n.get("pveversion", "-"))}"}} 1' for n, labels in node_labels
+    )
+
+    for name, help_text, value in stats:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+class Snapshot:
+    __slots__ = ("text", "openmetrics", "gzip_text", "gzip_openmetrics")
+
+    def __init__(self, body):
+        self.text = body.encode()
+        self.openmetrics = (body + "# EOF\n").encode()
+        # einmal pro Snapshot komprimieren, nicht pro Scrape
+        self.gzip_text = gzip.compress(self.text, 5)
+        self.gzip_openmetrics = gzip.compress(self.openmetrics, 5)
+
+
+class MetricsCollector:
+    """Fetches VMs and nodes every `interval` seconds in the background and
+    keeps the rendered result; scrapes only ever read the latest snapshot."""
+
+    def __init__(self, pm, interval):
+        self.pm = pm
+        self.interval = interval
+        self.snapshot = None
+        self.collects = 0
+        self.failures = 0
+        self._last = ([], [], 0)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.collect()
+            self._stop.wait(self.interval)
+
+    def collect(self):
+        start = time.monotonic()
+        try:
+            vms = self.pm.fetch_vms()
+            nodes = self.pm.fetch_nodes()
+            self._last = (vms, nodes, round(time.time(), 3))
+            ok = 1
+        except Exception as e:
+            print(f"Collect failed: {e}")
+            self.failures += 1
+            ok = 0
+        # bei Fehlern die letzten guten Werte, aber mit success 0 und neuem Fehlerzähler
+        vms, nodes, stamp = self._last
+        self.collects += 1
+        stats = [
+            ("proxmon_collect_success", "1 if the last collection succeeded", ok),
+            ("proxmon_collect_duration_seconds", "Duration of the last collection", round(time.monotonic() - start, 4)),
+            ("proxmon_collect_timestamp_seconds", "Unix time of the last successful collection", stamp),
+            ("proxmon_collect_failures", "Failed collections since start", self.failures),
+        ]
+        # Referenz-Tausch ist atomar, Scrapes sehen alt oder neu
+        self.snapshot = Snapshot(render_metrics(vms, nodes, stats))
+
+
+def _handler(collector):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self._send(404, "text/plain", b"see /metrics\n")
+                return
+            snap = collector.snapshot
+            if snap is None:
+                self._send(503, "text/plain", b"no data collected yet\n")
+                return
+            openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+            gz = "gzip" in self.headers.get("Accept-Encoding", "")
+            if openmetrics:
+                body = snap.gzip_openmetrics if gz else snap.openmetrics
+            else:
+                body = snap.gzip_text if gz else snap.text
+            self._send(200, OPENMETRICS_TYPE if openmetrics else TEXT_TYPE, body, "gzip" if gz else None)
+
+        def _send(self, code, ctype, body, encoding=None):
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return MetricsHandler
+
+
+def serve(pm, interval, host="127.0.0.1", port=9221):
+    collector = MetricsCollector(pm, interval)
+    collector.start()
+    server = ThreadingHTTPServer((host, port), _handler(collector))
+    server.daemon_threads = True
+    print(f"Serving metrics on http://{host}:{server.server_port}/metrics (every {interval}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.stop()
+        server.server_close()
@@ -0,0 +1,456 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+API = "/api2/json/"
+MISSING = object()
+
+
+class FakeCluster:
+    """Synthetic Proxmox cluster state: nodes, guests, storages, backups, tasks
+    and RRD data.
+
+    Actions change guest state right away and return a UPID whose task
+    reports "stopped" after `task_duration` seconds.
+    """
+
+    def __init__(self, nodes=4, guests=1000, tasks_per_node=20, task_duration=0.5, seed=1):
+        rnd = random.Random(seed)
+        self.task_duration = task_duration
+        self.lock = threading.Lock()
+        self.nodes = [f"pve{i + 1}" for i in range(nodes)]
+        self.offline = set()
+        # als online gelistet, aber pveproxy antwortet nicht (595)
+        self.unreachable = set()
+        self.booted = {n: time.time() - 86400 for n in self.nodes}
+        self.dns = {n: {"search": "lan", "dns1": "10.0.0.1", "dns2": "10.0.0.2"} for n in self.nodes}
+        self.guests = {}
+        for i in range(guests):
+            vmid = 100 + i
+            running = rnd.random() < 0.8
+            self.guests[vmid] = {
+                "vmid": vmid,
+                "id": f"{'lxc' if i % 3 == 0 else 'qemu'}/{vmid}",
+                "name": f"guest-{i:05d}",
+                "type": "lxc" if i % 3 == 0 else "qemu",
+                "node": self.nodes[i % nodes],
+                "status": "running" if running else "stopped",
+                "cpu": round(rnd.random(), 4) if running else 0,
+                "maxcpu": rnd.choice((1, 2, 4, 8)),
+                "mem": rnd.randint(256, 8192) * 1024 ** 2 if running else 0,
+                "maxmem": 8192 * 1024 ** 2,
+                "disk": rnd.randint(1, 60) * 1024 ** 3,
+                "maxdisk": 64 * 1024 ** 3,
+                "uptime": rnd.randint(60, 10 ** 6) if running else 0,
+                "tags": rnd.choice(("web;prod", "db;prod", "dev", "")),
+                "template": 0,
+            }
+        # pro Node local/local-lvm, dazu ein geteilter Backup-Storage
+        self.storages = {"local": ("dir", "iso,vztmpl,backup", 0, 100 * 1024 ** 3),
+                         "local-lvm": ("lvmthin", "images,rootdir", 0, 2 * 1024 ** 4),
+                         "pbs": ("pbs", "backup", 1, 20 * 1024 ** 4)}
+        self.snapshots = {}
+        self.new_backups = []
+        self.tasks = {}
+        start = int(time.time()) - 3600
+        for node in self.nodes:
+            for j in range(tasks_per_node):
+                self._task(node, "vzdump", str(100 + j), start + j * 60, done=True)
+
+    def _task(self, node, kind, ident, starttime=None, done=False):
+        starttime = starttime or int(time.time())
+        upid = f"UPID:{node}:{len(self.tasks):08X}:00000000:{starttime:08X}:{kind}:{ident}:root@pam:"
+        self.tasks[upid] = {
+            "upid": upid, "node": node, "type": kind, "id": ident, "user": "root@pam",
+            "starttime": starttime, "ends": 0 if done else time.monotonic() + self.task_duration,
+        }
+        return upid
+
+    def task_row(self, task):
+        row = {k: v for k, v in task.items() if k != "ends"}
+        if time.monotonic() >= task["ends"]:
+            row.update(status="OK", endtime=task["starttime"] + 1)
+        return row
+
+    def resources(self, kind=None):
+        with self.lock:
+            rows = [dict(g) for g in self.guests.values()] if kind in (None, "vm") else []
+        if kind in (None, "node"):
+            rows += [{"id": f"node/{n}", "type": "node", "node": n, "status": self.node_status(n)} for n in self.nodes]
+        return rows
+
+    def backups(self, storage, node=None):
+        # pbs: bis zu vier nächtliche Backups pro Gast, local: eins für jeden zehnten
+        now = int(time.time())
+        with self.lock:
+            guests = [g for g in self.guests.values() if storage == "pbs" or g["node"] == node]
+        for g in guests:
+            vmid = g["vmid"]
+            count = vmid % 5 if storage == "pbs" else int(vmid % 10 == 0)
+            for j in range(count):
+                ctime = now - j * 86400 - vmid * 37 % 86400
+                kind = "vm" if g["type"] == "qemu" else "ct"
+                yield {"volid": f"{storage}:backup/{kind}/{vmid}/{time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ctime))}",
+                       "content": "backup", "ctime": ctime, "size": g["disk"] // 3, "vmid": vmid,
+                       "format": "pbs-vm" if storage == "pbs" else "tar.zst", "subtype": g["type"]}
+        for b in list(self.new_backups):
+            if b["storage"] == storage and (storage == "pbs" or b["node"] == node):
+                yield {k: v for k, v in b.items() if k not in ("node", "storage")}
+
+    def snapshot(self, node, kind, vmid, method, name=None, params=None):
+        with self.lock:
+            guest = self.guests.get(vmid)
+            if guest is None or guest["node"] != node or guest["type"] != kind:
+                return MISSING
+            snaps = self.snapshots.setdefault(vmid, [])
+            prefix = "qm" if kind == "qemu" else "vz"
+            if method == "GET" and name is None:
+                return snaps + [{"name": "current", "description": "You are here!", "running": int(guest["status"] == "running")}]
+            if method == "POST" and name is None:
+                snaps.append({"name": params["snapname"], "snaptime": int(time.time()),
+                              "description": params.get("description", ""), "vmstate": int(params.get("vmstate", 0))})
+                return self._task(node, f"{prefix}snapshot", str(vmid))
+            if method != "DELETE" or not any(s["name"] == name for s in snaps):
+                return MISSING
+            self.snapshots[vmid] = [s for s in snaps if s["name"] != name]
+            return self._task(node, f"{prefix}delsnapshot", str(vmid))
+
+    def vzdump(self, node, params):
+        vmid = int(params.get("vmid", 0))
+        storage = params.get("storage", "local")
+        with self.lock:
+            guest = self.guests.get(vmid)
+            if guest is None or guest["node"] != node or storage not in self.storages:
+                return MISSING
+            kind = "vm" if guest["type"] == "qemu" else "ct"
+            now = int(time.time())
+            self.new_backups.append({
+                "volid": f"{storage}:backup/{kind}/{vmid}/{time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now))}",
+                "content": "backup", "ctime": now, "size": guest["disk"] // 3, "vmid": vmid, "node": node,
+                "storage": storage, "format": "pbs-vm" if storage == "pbs" else "tar.zst", "subtype": guest["type"]})
+            return self._task(node, "vzdump", str(vmid))
+
+    def storage_used(self, storage, node):
+        if storage == "local-lvm":
+            return sum(g["disk"] for g in self.guests.values() if g["node"] == node)
+        if storage == "pbs":
+            return sum(g["vmid"] % 5 * (g["disk"] // 3) for g in self.guests.values())
+        return sum(g["disk"] // 3 for g in self.guests.values() if g["node"] == node and g["vmid"] % 10 == 0)
+
+    def storage_resources(self):
+        rows = []
+        for node in self.nodes:
+            for name, (plugin, content, shared, total) in self.storages.items():
+                rows.append({"id": f"storage/{node}/{name}", "type": "storage", "storage": name, "node": node,
+                             "plugintype": plugin, "content": content, "shared": shared, "maxdisk": total,
+                             "disk": self.storage_used(name, node),
+                             "status": "unknown" if node in self.offline else "available"})
+        return rows
+
+    def storage_rrd(self, storage, node, points=70):
+        # gleichmäßiges Wachstum von 1% der Belegung pro Tag
+        now = int(time.time())
+        used = self.storage_used(storage, node)
+        total = self.storages[storage][3]
+        return [{"time": now - (points - i) * 3600, "used": used - used * 0.01 * (points - i) / 24, "total": total}
+                for i in range(points)]
+
+    def node_status(self, node):
+        return "offline" if node in self.offline else "online"
+
+    def node_list(self):
+        rows = []
+        for n in self.nodes:
+            guests = [g for g in self.guests.values() if g["node"] == n]
+            rows.append({"node": n, "status": self.node_status(n), "cpu": round(random.random() / 2, 4),
+                         "maxcpu": 64, "mem": sum(g["mem"] for g in guests), "maxmem": 512 * 1024 ** 3,
+                         "uptime": int(time.time() - self.booted[n])})
+        return rows
+
+    def guest_action(self, node, kind, vmid, action, params=None):
+        params = params or {}
+        with self.lock:
+            guest = self.guests.get(vmid)
+            if guest is None or guest["node"] != node or guest["type"] != kind:
+                return MISSING
+            if action == "delete":
+                del self.guests[vmid]
+            elif action in ("start", "reset", "resume"):
+                guest.update(status="running", uptime=1)
+            elif action in ("stop", "shutdown"):
+                guest.update(status="stopped", uptime=0, cpu=0, mem=0)
+            elif action == "migrate":
+                target = params.get("target")
+                if target not in self.nodes or target in self.offline or target == node:
+                    return MISSING
+                guest["node"] = target
+            return self._task(node, f"{'qm' if kind == 'qemu' else 'vz'}{action}", str(vmid))
+
+    def guest_config(self, guest):
+        vmid = guest["vmid"]
+        mac = "BC:24:11:{:02X}:{:02X}:{:02X}".format(vmid >> 16 & 255, vmid >> 8 & 255, vmid & 255)
+        bridge = f"vmbr{vmid % 3}"
+        disk = f"local-lvm:vm-{vmid}-disk-0,size={guest['maxdisk'] // 1024 ** 3}G"
+        if guest["type"] == "qemu":
+            config = {"name": guest["name"], "cores": guest["maxcpu"], "sockets": 1 + vmid % 2,
+                      "memory": guest["maxmem"] // 1024 ** 2, "ostype": "l26", "boot": "order=scsi0",
+                      "scsi0": disk, "net0": f"virtio={mac},bridge={bridge},firewall=1"}
+            if vmid % 7 == 0:
+                config["net1"] = f"virtio={mac[:-2]}FF,bridge=vmbr2,tag={vmid % 50}"
+        else:
+            config = {"hostname": guest["name"], "cores": guest["maxcpu"], "memory": guest["maxmem"] // 1024 ** 2,
+                      "swap": 512, "ostype": "debian", "rootfs": disk,
+                      "net0": f"name=eth0,bridge={bridge},hwaddr={mac},ip=dhcp,type=veth"}
+        if guest["tags"]:
+            config["tags"] = guest["tags"]
+        config["digest"] = f"{hash(tuple(config.items())) & 0xFFFFFFFF:040x}"
+        return config
+
+    def reboot(self, node):
+        with self.lock:
+            self.offline.add(node)
+            upid = self._task(node, "srvreboot", "")
+        # Node ist für die Dauer des Reboots offline
+        threading.Timer(self.task_duration * 4, self._boot, (node,)).start()
+        return upid
+
+    def _boot(self, node):
+        self.booted[node] = time.time()
+        self.offline.discard(node)
+
+    def rrd(self, points=70):
+        now = int(time.time())
+        return [{"time": now - (points - i) * 60, "cpu": random.random(), "mem": random.random() * 4 * 1024 ** 3,
+                 "maxmem": 8 * 1024 ** 3} for i in range(points)]
+
+
+class FakeProxmox:
+    """HTTP server for a FakeCluster, plain http on 127.0.0.1.
+
+    `latency` seconds are added to every request (plus up to `jitter`),
+    `error_rate` of the requests fail with 500. Requests carrying a ticket
+    from `revoked` get a 401, as with an expired or foreign ticket.
+    """
+
+    def __init__(self, cluster=None, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0):
+        self.cluster = cluster or FakeCluster()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.logins = 0
+        self.revoked = set()
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def server_config(self, name="fake", password=None):
+        # ohne Passwort Token-Auth: kein Login, kein Eintrag im Ticket-Cache
+        if password is not None:
+            return {"name": name, "host": self.url, "username": "root@pam", "password": password}
+        return {"name": name, "host": self.url, "username": "root@pam", "token_name": "bench", "token_value": "-"}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle(self, method, path, params):
+        cluster = self.cluster
+        parts = path.strip("/").split("/")
+
+        if method == "POST" and path == "access/ticket":
+            self.logins += 1
+            return {"ticket": f"PVE:root@pam:FAKE{self.logins}", "CSRFPreventionToken": "FAKE", "username": params.get("username")}
+        if path == "version":
+            return {"version": "8.2.4", "release": "8.2"}
+        if path == "cluster/resources":
+            if params.get("type") == "storage":
+                return cluster.storage_resources()
+            return cluster.resources(params.get("type"))
+        if path == "cluster/tasks":
+            return [cluster.task_row(t) for t in list(cluster.tasks.values())][-200:]
+        if path == "nodes":
+            return cluster.node_list()
+        if parts[0] != "nodes" or len(parts) < 3:
+            return MISSING
+
+        node, rest = parts[1], parts[2:]
+        if node not in cluster.nodes:
+            return MISSING
+        if node in cluster.offline and rest[0] != "tasks" or node in cluster.unreachable:
+            raise ConnectionError(f"node {node} is offline")
+
+        if rest == ["version"]:
+            return {"version": "8.2.4", "release": "8.2", "repoid": "faa83925", "hostname": node}
+        if rest == ["apt", "update"]:
+            if method == "POST":
+                return cluster._task(node, "aptupdate", "")
+            return [{"Package": f"pkg{i}"} for i in range(int(node[3:]) % 7)]
+        if rest == ["dns"]:
+            if method != "GET":
+                cluster.dns[node].update({k: v for k, v in params.items() if k.startswith("dns")})
+                return None
+            return cluster.dns[node]
+        if rest in (["status", "reboot"], ["status"]) and method == "POST":
+            return cluster.reboot(node)
+        if rest == ["rrddata"]:
+            return cluster.rrd()
+        if rest == ["vzdump"] and method == "POST":
+            return cluster.vzdump(node, params)
+        if len(rest) == 3 and rest[0] == "storage" and rest[1] in cluster.storages:
+            if rest[2] == "content":
+                if params.get("content", "backup") != "backup" or "backup" not in cluster.storages[rest[1]][1]:
+                    return []
+                return list(cluster.backups(rest[1], node))
+            if rest[2] == "rrddata":
+                return cluster.storage_rrd(rest[1], node)
+        if rest in (["qemu"], ["lxc"]):
+            # wie die echte API: ohne node/type
+            with cluster.lock:
+                return [{k: v for k, v in g.items() if k not in ("node", "type", "id")}
+                        for g in cluster.guests.values() if g["node"] == node and g["type"] == rest[0]]
+        if rest == ["tasks"]:
+            since = int(params.get("since", 0))
+            rows = [cluster.task_row(t) for t in list(cluster.tasks.values()) if t["node"] == node and t["starttime"] >= since]
+            rows.sort(key=lambda t: -t["starttime"])
+            return rows[:int(params.get("limit", 50))]
+        if len(rest) >= 3 and rest[0] == "tasks":
+            task = cluster.tasks.get(rest[1])
+            if task is None:
+                return MISSING
+            row = cluster.task_row(task)
+            if rest[2] == "status":
+                row["status"] = "stopped" if "endtime" in row else "running"
+                row["exitstatus"] = "OK"
+                return row
+            lines = ["starting", f"{task['type']} {task['id']}"] + (["TASK OK"] if "endtime" in row else [])
+            start = int(params.get("start", 0))
+            return [{"n": i + 1, "t": t} for i, t in enumerate(lines)][start:start + int(params.get("limit", 50))]
+
+        if len(rest) >= 2 and rest[0] in ("qemu", "lxc") and rest[1].isdigit():
+            kind, vmid = rest[0], int(rest[1])
+            if method == "DELETE" and len(rest) == 2:
+                return cluster.guest_action(node, kind, vmid, "delete")
+            if len(rest) == 4 and rest[2] == "status" and method == "POST":
+                return cluster.guest_action(node, kind, vmid, rest[3])
+            if len(rest) in (3, 4) and rest[2] == "snapshot":
+                return cluster.snapshot(node, kind, vmid, method, rest[3] if len(rest) == 4 else None, params)
+            if rest[2:] == ["migrate"] and method == "POST":
+                return cluster.guest_action(node, kind, vmid, "migrate", params)
+            if rest[2:] == ["rrddata"]:
+                return cluster.rrd()
+            if rest[2:] == ["config"]:
+                guest = cluster.guests.get(vmid)
+                if guest is None:
+                    return MISSING
+                return cluster.guest_config(guest)
+        return MISSING
+
+
+def _handler(server):
+    class FakeHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _dispatch(self, method):
+            server.requests += 1
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                body = self.rfile.read(length).decode()
+                params.update({k: v[-1] for k, v in parse_qs(body).items()})
+
+            if server.latency or server.jitter:
+                time.sleep(server.latency + random.random() * server.jitter)
+            if not url.path.startswith(API):
+                return self._send(404, None, "Not Found")
+            path = url.path[len(API):]
+            ticket = SimpleCookie(self.headers.get("Cookie", "")).get("PVEAuthCookie")
+            if ticket is not None and ticket.value in server.revoked and path != "access/ticket":
+                return self._send(401, None, "invalid PVE ticket")
+            if server.error_rate and path != "access/ticket" and random.random() < server.error_rate:
+                return self._send(500, None, "Injected error")
+            try:
+                data = server.handle(method, path, params)
+            except ConnectionError as e:
+                return self._send(595, None, str(e))
+            if data is MISSING:
+                return self._send(501, None, "Method not implemented")
+            self._send(200, data)
+
+        def _send(self, code, data, reason=None):
+            body = json.dumps({"data": data}).encode()
+            self.send_response(code, reason)
+            self.send_header("Content-Type", "application/json;charset=UTF-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_PUT(self):
+            self._dispatch("PUT")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+    return FakeHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Proxmox API for development and benchmarks")
+    parser.add_argument("--port", type=int, default=8006)
+    parser.add_argument("--nodes", type=int, default=4)
+    parser.add_argument("--guests", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 500")
+    parser.add_argument("--task-duration", type=float, default=2.0)
+    parser.add_argument("--unreachable", nargs="*", default=[], metavar="NODE",
+                        help="nodes that are listed online but answer every request with 595")
+    args = parser.parse_args(argv)
+
+    cluster = FakeCluster(args.nodes, args.guests, task_duration=args.task_duration)
+    cluster.unreachable.update(args.unreachable)
+    fake = FakeProxmox(cluster, port=args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    print(f"Fake Proxmox with {args.nodes} nodes / {args.guests} guests on {fake.url}")
+    print("Server entry for the config:", json.dumps(fake.server_config()))
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import re
+import threading
+import time
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from inventory import vm_key
+from query import OPERATORS, QueryError
+
+# cluster/resources kennt keinen Config-Digest; diese Felder folgen der Config
+FINGERPRINT_FIELDS = ("node", "type", "name", "maxcpu", "maxmem", "maxdisk", "tags", "template", "lock")
+ALIASES = {"bridge": "net.bridge", "vlan": "net.tag", "mac": "net.hwaddr"}
+SIZE_UNITS = {"K": 1 / 1024 ** 2, "M": 1 / 1024, "G": 1, "T": 1024}
+
+_CONDITION = re.compile(r"^([\w.-]+)(>=|<=|!=|=|>|<)(.*)$")
+_FAMILY = re.compile(r"^([a-z]+)\d+$")
+_SIZE = re.compile(r"^(\d+(?:\.\d+)?)([KMGT])$")
+_MAC = re.compile(r"^[0-9A-Fa-f]{2}(:[0-9A-Fa-f]{2}){5}$")
+
+
+def fingerprint(vm):
+    return vm.get("digest") or tuple(vm.get(f) for f in FINGERPRINT_FIELDS)
+
+
+def number(value):
+    """Plain numbers as they are, sizes like 32G in GB, else None."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    m = _SIZE.match(str(value))
+    return float(m.group(1)) * SIZE_UNITS[m.group(2)] if m else None
+
+
+def flatten(config):
+    """Config -> [(field, value)]: every key as is, plus its comma-separated
+    sub-options (net0.bridge) and the same under the family name (net.bridge)."""
+    pairs = []
+    for key, value in config.items():
+        if key in ("digest", "description"):
+            continue
+        value = str(value)
+        pairs.append((key, value))
+        if "=" not in value and "," not in value:
+            continue
+        m = _FAMILY.match(key)
+        names = (key, m.group(1)) if m else (key,)
+        for i, part in enumerate(value.split(",")):
+            sub, eq, val = part.partition("=")
+            if not eq:
+                sub, val = "volume", part  # scsi0: local-lvm:vm-100-disk-0,size=32G
+            elif i == 0 and _MAC.match(val):
+                # net0: virtio=BC:24:11:..,bridge=vmbr0
+                pairs.extend((f"{name}.model", sub) for name in names)
+                sub = "hwaddr"
+            pairs.extend((f"{name}.{sub}", val) for name in names)
+    return pairs
+
+
+def parse_find(text):
+    """`bridge=vmbr2 cores>16` -> [(field, op, value)]."""
+    conditions = []
+    for token in text.replace(",", " ").split():
+        m = _CONDITION.match(token)
+        if not m:
+            raise QueryError(f"not a condition: '{token}'")
+        field, op, value = m.groups()
+        conditions.append((ALIASES.get(field, field), op, value))
+    if not conditions:
+        raise QueryError("nothing to search for")
+    return conditions
+
+
+class ConfigStore:
+    """Guest configs keyed like the inventory, with an inverted index
+    {field: {value: {key}}} that :find answers from.
+
+    `stale(vms)` names the guests whose resource fingerprint (or lock)
+    changed since their config was read, or whose entry is older than
+    `max_age`; only those need to be crawled again.
+    """
+
+    def __init__(self, max_age=3600):
+        self.max_age = max_age
+        self.entries = {}
+        self.index = defaultdict(lambda: defaultdict(set))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        return entry[2] if entry else None
+
+    def values(self, key):
+        """{field: [values]} of one guest, as indexed."""
+        out = {}
+        for field, value in self.entries[key][3]:
+            out.setdefault(field, []).append(value)
+        return out
+
+    def stale(self, vms):
+        now = time.monotonic()
+        out = []
+        for vm in vms:
+            entry = self.entries.get(vm_key(vm))
+            if entry is None or entry[0] != fingerprint(vm) or now - entry[1] > self.max_age:
+                out.append(vm)
+        return out
+
+    def put(self, vm, config):
+        key = vm_key(vm)
+        pairs = flatten(config) + [("node", vm.get("node", "")), ("type", vm.get("type", ""))]
+        with self._lock:
+            self._unindex(key)
+            self.entries[key] = (fingerprint(vm), time.monotonic(), config, pairs)
+            for field, value in pairs:
+                self.index[field][value].add(key)
+
+    def prune(self, vms):
+        # Gäste, die es nicht mehr gibt
+        live = {vm_key(vm) for vm in vms}
+        with self._lock:
+            for key in [k for k in self.entries if k not in live]:
+                self._unindex(key)
+                del self.entries[key]
+
+    def _unindex(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        for field, value in entry[3]:
+            keys = self.index[field][value]
+            keys.discard(key)
+            if not keys:
+                del self.index[field][value]
+
+    def _match(self, field, op, value):
+        if op == "!=":
+            # kein Wert des Felds passt, also auch Gäste ohne das Feld
+            return self.entries.keys() - self._match(field, "=", value)
+        postings = self.index.get(field)
+        if not postings:
+            return set()
+        if op == "=":
+            if not any(c in value for c in "*?["):
+                return set(postings.get(value, ()))
+            return set().union(*(keys for actual, keys in postings.items() if fnmatchcase(actual, value)))
+
+        wanted = number(value)
+        if wanted is None:
+            raise QueryError(f"{field}{op} needs a number, got '{value}'")
+        test = OPERATORS[op]
+        hits = set()
+        for actual, keys in postings.items():
+            got = number(actual)
+            if got is not None and test(got, wanted):
+                hits |= keys
+        return hits
+
+    def find(self, text):
+        """Keys of the guests matching all conditions of `text`."""
+        result = None
+        with self._lock:
+            for field, op, value in parse_find(text):
+                hits = self._match(field, op, value)
+                result = hits if result is None else result & hits
+                if not result:
+                    break
+        return result or set()
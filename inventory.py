@@ -0,0 +1,142 @@
+import re
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from query import parse_condition, compile_condition
+
+
+def split_target(spec):
+    # "<cluster>/<id>" oder nur "<id>"
+    spec = str(spec).strip()
+    if "/" in spec:
+        cluster, _, ident = spec.partition("/")
+        return cluster, ident
+    return None, spec
+
+
+def vm_key(vm):
+    if vm.get("cluster"):
+        return f"{vm['cluster']}/{vm['vmid']}"
+    return str(vm["vmid"])
+
+
+def _is_glob(text):
+    return any(c in text for c in "*?[")
+
+
+class VMInventory:
+    """Indexed snapshot of cluster/resources, rebuilt on every refresh.
+
+    Primary index is (cluster, vmid); secondary indexes by vmid, node, name,
+    status, type and tag make lookups and selectors dictionary hits instead
+    of scans over the whole guest list.
+    """
+
+    def __init__(self, vms=()):
+        self.vms = list(vms)
+        self.by_key = {}
+        self.by_id = defaultdict(list)
+        self.by_node = defaultdict(list)
+        self.by_name = defaultdict(list)
+        self.by_status = defaultdict(list)
+        self.by_type = defaultdict(list)
+        self.by_tag = defaultdict(list)
+
+        for vm in self.vms:
+            vmid = str(vm["vmid"])
+            self.by_key[(vm.get("cluster"), vmid)] = vm
+            self.by_id[vmid].append(vm)
+            self.by_node[vm.get("node")].append(vm)
+            self.by_name[vm.get("name", "-")].append(vm)
+            self.by_status[vm.get("status")].append(vm)
+            self.by_type[vm.get("type")].append(vm)
+            for tag in filter(None, vm.get("tags", "").split(";")):
+                self.by_tag[tag].append(vm)
+
+    def __iter__(self):
+        return iter(self.vms)
+
+    def __len__(self):
+        return len(self.vms)
+
+    def matches(self, spec):
+        cluster, vmid = split_target(spec)
+        if cluster is not None:
+            vm = self.by_key.get((cluster, vmid))
+            return [vm] if vm else []
+        return list(self.by_id.get(vmid, ()))
+
+    def get(self, spec):
+        found = self.matches(spec)
+        return found[0] if len(found) == 1 else None
+
+    def _glob(self, index, pattern):
+        if not _is_glob(pattern):
+            return list(index.get(pattern, ()))
+        hits = []
+        for key in index:
+            if key is not None and fnmatchcase(key, pattern):
+                hits.extend(index[key])
+        return hits
+
+    def lookup(self, token):
+        # ID, <cluster>/<ID>, Name, Name-Glob (web-*) oder tag:<tag>
+        token = token.strip()
+        if token.startswith("tag:"):
+            return self._glob(self.by_tag, token[4:])
+        found = self.matches(token)
+        if found:
+            return found
+        return self._glob(self.by_name, token)
+
+    def select(self, arg):
+        """Resolve a selector string to a list of guests.
+
+        Whitespace/comma separated tokens: IDs, ID ranges (100-140), names,
+        globs and tag:<tag> are united; conditions of the query language
+        (node=pve3, status=running, cpu>50, tag=web*) narrow the result.
+        Returns (guests, misses); bad conditions raise QueryError.
+        """
+        picked, filters, misses = [], [], []
+        for token in arg.replace(",", " ").split():
+            cond = parse_condition(token)
+            if cond is not None:
+                filters.append((cond, compile_condition(*cond)))
+            elif _RANGE.match(token):
+                lo, hi = sorted(int(x) for x in token.split("-"))
+                picked.extend(self._range(lo, hi))
+            else:
+                found = self.lookup(token)
+                if not found:
+                    misses.append(token)
+                picked.extend(found)
+
+        if filters:
+            if not picked and not misses:
+                # nur Filter: beim kleinsten passenden Index beginnen
+                picked = min((self._by_filter(*cond) for cond, _ in filters), key=len)
+            picked = [vm for vm in picked if all(pred(vm) for _, pred in filters)]
+
+        unique = {}
+        for vm in picked:
+            unique.setdefault((vm.get("cluster"), str(vm["vmid"])), vm)
+        return list(unique.values()), misses
+
+    def _range(self, lo, hi):
+        if hi - lo < len(self.by_id):
+            ids = (str(i) for i in range(lo, hi + 1))
+        else:
+            ids = (i for i in self.by_id if i.isdigit() and lo <= int(i) <= hi)
+        hits = []
+        for vmid in ids:
+            hits.extend(self.by_id.get(vmid, ()))
+        return hits
+
+    def _by_filter(self, field, op, value):
+        index = {"node": self.by_node, "status": self.by_status, "type": self.by_type,
+                 "name": self.by_name, "tags": self.by_tag}.get(field)
+        if index is None or op != "=":
+            return self.vms
+        return self._glob(index, value)
+
+
+_RANGE = re.compile(r"^\d+-\d+$")
@@ -0,0 +1,130 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from inventory import vm_key
+
+SNAPSHOT_PREFIX = "proxmon_"
+_AGE = re.compile(r"^(\d+)([mhdw])$")
+_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+# Disk-Keys in qemu/lxc-Configs, Wert beginnt mit <storage>:
+_DISK_KEY = re.compile(r"^(scsi|virtio|sata|ide|efidisk|tpmstate|mp)\d+$|^rootfs$")
+
+
+def parse_age(text):
+    """`7d`, `12h`, `30m`, `2w` -> seconds."""
+    m = _AGE.match(text)
+    if not m:
+        raise ValueError(f"invalid age '{text}' (e.g. 30m, 12h, 7d, 2w)")
+    return int(m.group(1)) * _UNITS[m.group(2)]
+
+
+def disk_storages(config):
+    """Storages holding the disks of a guest config (no CD-ROMs)."""
+    storages = set()
+    for key, value in config.items():
+        if not _DISK_KEY.match(key) or "media=cdrom" in str(value):
+            continue
+        storage = str(value).split(",", 1)[0].split(":", 1)[0]
+        if storage and storage != "none":
+            storages.add(storage)
+    return storages
+
+
+class Job:
+    __slots__ = ("vm", "key", "action", "params", "node", "storages", "state", "started", "finished",
+                 "result", "error")
+
+    def __init__(self, vm, action, params=None, storages=(), shared=()):
+        cluster = vm.get("cluster")
+        self.vm = vm
+        self.key = vm_key(vm)
+        self.action = action
+        self.params = params or {}
+        self.node = ("node", cluster, vm["node"])
+        # lokaler Storage gleichen Namens ist auf jedem Node ein anderer
+        self.storages = {("storage", cluster, s) if (cluster, s) in shared else ("storage", cluster, vm["node"], s)
+                         for s in storages}
+        self.state = "queued"
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+
+    @property
+    def duration(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+
+class JobRunner:
+    """Runs snapshot, backup and snapshot-delete jobs on many guests.
+
+    At most `parallel` jobs run at once, one per guest, `node_limit` per
+    node and `storage_limit` per storage a job touches; a job that would
+    exceed a limit waits while later jobs for other nodes/storages go ahead.
+    Every job submits its task and waits for the UPID through the manager's
+    TaskWaiter. `on_update(job)` is called on each state change.
+    """
+
+    def __init__(self, pm, parallel=8, node_limit=2, storage_limit=2, timeout=3600, on_update=None):
+        self.pm = pm
+        self.parallel = max(1, parallel)
+        self.node_limit = max(1, node_limit)
+        self.storage_limit = max(1, storage_limit)
+        self.timeout = timeout
+        self.on_update = on_update or (lambda job: None)
+        self.started = None
+        self.finished = None
+        self._cond = threading.Condition()
+        self._busy = {}
+        self._running = 0
+
+    def _fits(self, job):
+        # ein Job pro Gast: Proxmox sperrt den Gast für die Dauer des Tasks
+        return (not self._busy.get(("guest", job.key))
+                and self._busy.get(job.node, 0) < self.node_limit
+                and all(self._busy.get(s, 0) < self.storage_limit for s in job.storages))
+
+    def _claim(self, job, delta):
+        for slot in (("guest", job.key), job.node, *job.storages):
+            self._busy[slot] = self._busy.get(slot, 0) + delta
+
+    def run(self, jobs):
+        pending = list(jobs)
+        self._running = 0
+        self.started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.parallel) as pool:
+            with self._cond:
+                while pending or self._running:
+                    job = None
+                    if self._running < self.parallel:
+                        job = next((j for j in pending if self._fits(j)), None)
+                    if job is None:
+                        self._cond.wait()
+                        continue
+                    pending.remove(job)
+                    self._claim(job, 1)
+                    self._running += 1
+                    pool.submit(self._execute, job)
+        self.finished = time.monotonic()
+        return jobs
+
+    def _execute(self, job):
+        job.state = "running"
+        job.started = time.monotonic()
+        try:
+            self.on_update(job)
+            job.result = self.pm.run_job(job.vm, job.action, job.params, self.timeout)
+            job.state = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.state = "failed"
+        finally:
+            job.finished = time.monotonic()
+            with self._cond:
+                self._claim(job, -1)
+                self._running -= 1
+                self._cond.notify()
+        self.on_update(job)
@@ -0,0 +1,104 @@
+from array import array
+
+SPARK = "▁▂▃▄▅▆▇█"
+
+
+class RingBuffer:
+    """Fixed-size float ring buffer backed by array('f')."""
+
+    __slots__ = ("data", "pos", "count")
+
+    def __init__(self, capacity):
+        self.data = array("f", bytes(4 * capacity))
+        self.pos = 0
+        self.count = 0
+
+    def append(self, value):
+        self.data[self.pos] = value
+        self.pos = (self.pos + 1) % len(self.data)
+        if self.count < len(self.data):
+            self.count += 1
+
+    def values(self):
+        if self.count < len(self.data):
+            return self.data[:self.count].tolist()
+        return (self.data[self.pos:] + self.data[:self.pos]).tolist()
+
+    def mean(self):
+        if not self.count:
+            return 0.0
+        if self.count < len(self.data):
+            return sum(self.data[:self.count]) / self.count
+        return sum(self.data) / self.count
+
+    def peak(self):
+        if not self.count:
+            return 0.0
+        return max(self.data[:self.count]) if self.count < len(self.data) else max(self.data)
+
+
+class Series:
+    __slots__ = ("cpu", "mem", "last_time", "version")
+
+    def __init__(self, capacity):
+        self.cpu = RingBuffer(capacity)
+        self.mem = RingBuffer(capacity)
+        self.last_time = 0
+        self.version = 0
+
+
+def metric_key(item):
+    # Gäste: (cluster, vmid), Nodes: ("node", cluster, node)
+    if "vmid" in item:
+        return (item.get("cluster"), item["vmid"])
+    return ("node", item.get("cluster"), item["node"])
+
+
+class MetricsStore:
+    """Per-guest and per-node CPU/RAM history (fractions 0..1)."""
+
+    def __init__(self, capacity=70):
+        self.capacity = capacity
+        self.series = {}
+
+    def _series(self, key):
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = Series(self.capacity)
+        return series
+
+    def add_sample(self, item):
+        # Momentwert aus cluster/resources bzw. nodes
+        series = self._series(metric_key(item))
+        series.cpu.append(item.get("cpu", 0) or 0)
+        series.mem.append((item.get("mem", 0) or 0) / (item.get("maxmem", 0) or 1))
+        series.version += 1
+
+    def load_rrd(self, key, rows):
+        # nur Samples übernehmen, die neuer als der letzte bekannte sind
+        series = self._series(key)
+        for row in rows:
+            t = row.get("time", 0)
+            if t <= series.last_time or row.get("cpu") is None:
+                continue
+            series.cpu.append(row["cpu"])
+            # Nodes liefern memused/memtotal statt mem/maxmem
+            mem = row.get("mem", row.get("memused")) or 0
+            series.mem.append(mem / (row.get("maxmem", row.get("memtotal")) or 1))
+            series.last_time = t
+        series.version += 1
+
+    def prune(self, guests):
+        # Gäste, die es nicht mehr gibt; Nodes bleiben
+        keys = {metric_key(vm) for vm in guests}
+        for key in [k for k in self.series if k[0] != "node" and k not in keys]:
+            del self.series[key]
+
+    def get(self, item):
+        return self.series.get(metric_key(item))
+
+
+def sparkline(values, width=20):
+    values = values[-width:]
+    top = len(SPARK) - 1
+    return "".join(SPARK[max(0, min(top, int(v * top + 0.5)))] for v in values)
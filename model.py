@@ -1,9 +1,13 @@
 import os
 import json
-from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
-import time
-from proxmoxer import ProxmoxAPI
-from util import CONFIG_PATH, clear_screen
+import threading
+from cache import ResponseCache
+from util import CONFIG_PATH
+from concurrency import fan_out
+from inventory import VMInventory, split_target, vm_key
+from tasks import TaskWaiter, TaskFollower, LogTail, upid_node
+from metrics import metric_key
+from storage import StorageReport, growth_per_day, iter_json_data, pool_row, summarize_backups
 
 class ConfigManager:
     def load(self):
@@ -15,7 +19,43 @@ class ConfigManager:
                 "cpu_load_red": 90,
                 "use_color": False,
                 "language": "en",
-                "task_limit": 15
+                "task_limit": 15,
+                "max_workers": 8,
+                "connect_timeout": 3.05,
+                "request_timeout": 5,
+                "fetch_timeout": 15,
+                "bulk_parallelism": 4,
+                "task_timeout": 150,
+                "page_size": 0,
+                "metrics_samples": 70,
+                "follow_interval": 2,
+                "event_log": "",
+                "event_disk_growth_mb": 1024,
+                "event_pane_lines": 8,
+                "backend": "threads",
+                "tracing": True,
+                "backup_max_age_hours": 36,
+                "config_parallelism": 8,
+                "config_max_age": 3600,
+                "rate_limit": 100,
+                "rate_burst": 200,
+                "node_inflight": 4,
+                "get_retries": 2,
+                "retry_backoff": 0.2,
+                "breaker_threshold": 3,
+                "breaker_cooldown": 30,
+                "job_parallelism": 8,
+                "job_node_limit": 2,
+                "job_storage_limit": 2,
+                "job_timeout": 3600,
+                "backup_storage": "",
+                "backup_mode": "snapshot",
+                "migrate_timeout": 1800,
+                "node_online_timeout": 900,
+                "rolling_parallel": 1,
+                "rolling_migrate_back": True,
+                "vm_columns": ["id", "type", "name", "status", "uptime", "cpu", "ram", "disk", "node"],
+                "cache_ttl": {"resources": 2, "nodes": 2, "version": 3600, "dns": 3600, "apt": 600, "storage": 10}
             }
         with open(CONFIG_PATH) as f:
             return json.load(f)
@@ -24,20 +64,49 @@ class ConfigManager:
         with open(CONFIG_PATH, "w") as f:
             json.dump(config, f, indent=2)
 class ProxmoxManager:
-    def __init__(self, config):
+    def __init__(self, config, cache=None):
+        # proxmoxer/requests erst laden, wenn wirklich verbunden wird
+        from session import connect, api_url
+        from scheduler import RequestScheduler
+
         self.server = config["servers"][0]
-        self.proxmox = ProxmoxAPI(
-            self.server["host"].replace("https://", "").split(":")[0],
-            user=self.server["username"],
-            password=self.server["password"],
-            verify_ssl=False
-        )
+        self.scope = api_url(self.server)
+        self.cache = cache or ResponseCache(config.get("cache_ttl"))
+        self.max_workers = config.get("max_workers", 8)
+        self.fetch_timeout = config.get("fetch_timeout", 15)
+        self.proxmox = connect(self.server, config)
+        self.scheduler = RequestScheduler.for_host(self.scope, config)
+        self.task_timeout = config.get("task_timeout", 150)
+        self.migrate_timeout = config.get("migrate_timeout", 1800)
+        self.config_parallelism = config.get("config_parallelism", 8)
+        self.waiter = TaskWaiter(self.proxmox, self.max_workers)
+
+    def _cached(self, endpoint, node, loader):
+        return self.cache.get((self.scope, endpoint, node), loader)
 
-    def fetch_vms(self):
-        return self.proxmox.cluster.resources.get(type="vm")
+    def _invalidate(self, endpoint, node=None):
+        self.cache.invalidate(self.scope, endpoint, node)
+
+    def fetch_vms(self, node=None, vm_type=None):
+        # eingeschränkt: nur die qemu/lxc-Listen eines Nodes statt aller Gäste
+        if node is None:
+            vms = self._cached("resources", None, lambda: self.proxmox.cluster.resources.get(type="vm"))
+            return [vm for vm in vms if vm["type"] == vm_type] if vm_type else vms
+        return self._cached("resources", (node, vm_type), lambda: self._node_guests(node, vm_type))
+
+    def _node_guests(self, node, vm_type=None):
+        vms = []
+        for kind in (vm_type,) if vm_type else ("qemu", "lxc"):
+            for vm in getattr(self.proxmox.nodes(node), kind).get():
+                # Node-Listen kennen weder node noch type
+                vm.update(node=node, type=kind, vmid=int(vm["vmid"]))
+                vms.append(vm)
+        return vms
 
     def find_vm(self, vmid, vms):
-        return next((v for v in vms if str(v["vmid"]) == str(vmid)), None)
+        if not isinstance(vms, VMInventory):
+            vms = VMInventory(vms)
+        return vms.get(vmid)
 
     def get_node_and_type(self, vm):
         return vm["node"], vm["type"]
@@ -52,6 +121,7 @@ class ProxmoxManager:
         target = obj.qemu if vm_type == "qemu" else obj.lxc
         try:
             getattr(target(vmid).status(), action).post()
+            self._invalidate("resources")
             print(f"{action.capitalize()} {vm_type.upper()} {vmid} on {node}")
         except Exception as e:
             print(f"{action.capitalize()} failed: {e}")
@@ -75,20 +145,19 @@ class ProxmoxManager:
                 TimeElapsedColumn(),
                 transient=True
             ) as progress:
-                progress.add_task(description=f"Stopping LXC {vmid}", total=None)
-                target(vmid).status().stop.post()
-                # Warte auf Stop
-                for _ in range(30):
-                    status = target(vmid).status.current.get()["status"]
-                    if status == "stopped":
-                        break
-                    time.sleep(1)
-                else:
-                    print("Timeout waiting for container to stop.")
+                progress.add_task(description=f"Stopping {vm_type.upper()} {vmid}", total=None)
+                upid = target(vmid).status().stop.post()
+                self._invalidate("resources")
+                # Warte auf den Stop-Task
+                try:
+                    self.waiter.wait(upid, self.task_timeout)
+                except TimeoutError:
+                    print(f"Timeout waiting for {vm_type.upper()} {vmid} to stop.")
                     return
 
-                progress.add_task(description=f"Starting LXC {vmid}", total=None)
-                target(vmid).status().start.post()
+                progress.add_task(description=f"Starting {vm_type.upper()} {vmid}", total=None)
+                upid = target(vmid).status().start.post()
+                self.waiter.wait(upid, self.task_timeout)
 
             print(f"Restarted {vm_type.upper()} {vmid} on {node}")
 
@@ -116,20 +185,20 @@ class ProxmoxManager:
                 TimeElapsedColumn(),
                 transient=True
             ) as progress:
-                progress.add_task(description=f"Stopping LXC {vmid}", total=None)
-                target(vmid).status().stop.post()
-                # Warte auf Stop
-                for _ in range(30):
-                    status = target(vmid).status.current.get()["status"]
-                    if status == "stopped":
-                        break
-                    time.sleep(5)
-                else:
-                    print("Timeout waiting for container to stop.")
+                progress.add_task(description=f"Stopping {vm_type.upper()} {vmid}", total=None)
+                upid = target(vmid).status().stop.post()
+                self._invalidate("resources")
+                # Warte auf den Stop-Task
+                try:
+                    self.waiter.wait(upid, self.task_timeout)
+                except TimeoutError:
+                    print(f"Timeout waiting for {vm_type.upper()} {vmid} to stop.")
                     return
 
+            print(f"Stopped {vm_type.upper()} {vmid} on {node}")
+
         except Exception as e:
-            print(f"Restart failed: {e}")
+            print(f"Stop failed: {e}")
     def reset_vm(self, vmid, vms): self._action(vmid, vms, "reset")
 
     def delete_vm(self, vmid, vms):
@@ -142,52 +211,532 @@ class ProxmoxManager:
         target = obj.qemu if vm_type == "qemu" else obj.lxc
         try:
             target(vmid).delete()
+            self._invalidate("resources")
             print(f"Deleted {vm_type.upper()} {vmid} on {node}")
         except Exception as e:
             print(f"Delete failed: {e}")
 
+    def _guest(self, vm):
+        node, vm_type = self.get_node_and_type(vm)
+        obj = self.proxmox.nodes(node)
+        target = obj.qemu if vm_type == "qemu" else obj.lxc
+        return target(vm["vmid"])
+
+    def perform(self, vm, action):
+        # ohne Ausgabe, Fehler werden geworfen (für Bulk-Aktionen);
+        # kehrt erst zurück, wenn Proxmox den Task als beendet meldet
+        guest = self._guest(vm)
+        try:
+            if action == "delete":
+                return self.waiter.wait(guest.delete(), self.task_timeout)
+            if action in ("restart", "hardreset"):
+                self.waiter.wait(guest.status().stop.post(), self.task_timeout)
+                action = "start"
+            return self.waiter.wait(getattr(guest.status(), action).post(), self.task_timeout)
+        finally:
+            self._invalidate("resources")
+
     def restart_node(self, node):
         try:
-            self.proxmox.nodes(node).status().reboot.post()
+            self.reboot_node(node)
             print(f"Node {node} reboot triggered.")
         except Exception as e:
             print(f"Node reboot failed: {e}")
 
+    def update_node(self, node):
+        self.apt_update(node)
+        self.reboot_node(node)
+
+    def reboot_node(self, node):
+        # POST nodes/{node}/status mit command=reboot
+        try:
+            return self.proxmox.nodes(node).status.post(command="reboot")
+        finally:
+            self._invalidate("nodes")
+            self._invalidate("resources")
+
+    def apt_update(self, node):
+        # nur Paketlisten aktualisieren (installiert nichts) und auf den Task warten
+        try:
+            return self.waiter.wait(self.proxmox.nodes(node).apt.update.post(), self.task_timeout)
+        finally:
+            self._invalidate("apt", node)
+            self._invalidate("version", node)
+
+    def upgradable(self, node):
+        return self._cached("apt", node, self.proxmox.nodes(node).apt.update.get)
+
+    def migrate(self, vm, target):
+        # VMs live, Container per Restart-Migration
+        params = {"target": target, "online": 1} if vm["type"] == "qemu" else {"target": target, "restart": 1}
+        try:
+            return self.waiter.wait(self._guest(vm).migrate.post(**params), self.migrate_timeout)
+        finally:
+            self._invalidate("resources")
+
+    def node_states(self):
+        # ungecacht, für Warteschleifen
+        return {n["node"]: n for n in self.proxmox.nodes.get()}
+
+    def rolling_update(self, nodes, **options):
+        from rolling import RollingUpdate
+        return RollingUpdate(self, nodes, **options).run()
+
+    def set_dns(self, node, dns1, dns2=None, dns3=None):
+        dns_config = {"dns1": dns1}
+        if dns2: dns_config["dns2"] = dns2
+        if dns3: dns_config["dns3"] = dns3
+        self.proxmox.nodes(node).dns.post(**dns_config)
+        self._invalidate("dns", node)
+
+    def fetch_rrd(self, vms, nodes=(), timeframe="hour"):
+        # rrddata aller Gäste und Nodes parallel, {metric_key: rows}
+        jobs = {}
+        for vm in vms:
+            jobs[metric_key(vm)] = lambda guest=self._guest(vm): guest.rrddata.get(timeframe=timeframe, cf="AVERAGE")
+        for node in nodes:
+            if node.get("status") == "offline":
+                continue
+            api = self.proxmox.nodes(node["node"])
+            jobs[metric_key(node)] = lambda api=api: api.rrddata.get(timeframe=timeframe, cf="AVERAGE")
+        results = fan_out(jobs, self.max_workers)
+        return {k: v for k, v in results.items() if not isinstance(v, Exception)}
+
+    def fetch_guest_config(self, vm):
+        return self._guest(vm).config.get()
+
+    def list_snapshots(self, vm):
+        return [snap for snap in self._guest(vm).snapshot.get() if snap.get("name") != "current"]
+
+    def run_job(self, vm, action, params, timeout):
+        # Snapshot, Backup oder Snapshot-Löschen starten und auf den Task warten
+        guest = self._guest(vm)
+        if action == "snapshot":
+            upid = guest.snapshot.post(**params)
+        elif action == "delsnapshot":
+            upid = guest.snapshot(params["snapname"]).delete()
+        elif action == "backup":
+            upid = self.proxmox.nodes(vm["node"]).vzdump.post(vmid=vm["vmid"], **params)
+        else:
+            raise ValueError(f"unknown job '{action}'")
+        try:
+            return self.waiter.wait(upid, timeout)
+        finally:
+            self._invalidate("resources")
+
+    def shared_storages(self):
+        resources = self._cached("storage", None, lambda: self.proxmox.cluster.resources.get(type="storage"))
+        return {(None, res["storage"]) for res in resources if res.get("shared")}
+
+    def backup_size(self, vms, storage, since):
+        # Größe der Backups, die seit `since` für diese Gäste entstanden sind
+        vmids = {int(vm["vmid"]) for vm in vms}
+        nodes = {vm["node"] for vm in vms}
+        seen = {}
+        for node in nodes:
+            for vol in self._stream(f"nodes/{node}/storage/{storage}/content", content="backup"):
+                if vol.get("vmid") in vmids and vol.get("ctime", 0) >= since:
+                    seen[vol["volid"]] = vol.get("size", 0)
+        return sum(seen.values())
+
+    def fetch_guest_configs(self, vms, on_result=None):
+        # {vm_key: config | Exception}, begrenzt parallel
+        jobs = {vm_key(vm): (lambda vm=vm: self.fetch_guest_config(vm)) for vm in vms}
+        return fan_out(jobs, self.config_parallelism, on_result=on_result)
+
+    def _stream(self, path, **params):
+        # große Listen stückweise lesen, statt die ganze Antwort zu parsen
+        store = self.proxmox._store
+        resp = store["session"].request("GET", f"{store['base_url']}/{path}", params=params, stream=True)
+        with resp:
+            resp.raise_for_status()
+            yield from iter_json_data(resp.iter_content(65536))
+
+    def fetch_storage(self, timeframe="week"):
+        resources = self._cached("storage", None, lambda: self.proxmox.cluster.resources.get(type="storage"))
+        # geteilter Storage erscheint einmal pro Node, abgefragt wird er einmal
+        pools = {}
+        for res in resources:
+            key = res["storage"] if res.get("shared") else f"{res['storage']}@{res['node']}"
+            if key not in pools or (res.get("status") == "available" and pools[key].get("status") != "available"):
+                pools[key] = res
+
+        jobs = {}
+        for key, res in pools.items():
+            if res.get("status") != "available":
+                continue
+            api = self.proxmox.nodes(res["node"]).storage(res["storage"])
+            jobs[(key, "rrd")] = lambda api=api: growth_per_day(api.rrddata.get(timeframe=timeframe, cf="AVERAGE"))
+            if "backup" in res.get("content", "").split(","):
+                path = f"nodes/{res['node']}/storage/{res['storage']}/content"
+                jobs[(key, "backups")] = lambda path=path: summarize_backups(self._stream(path, content="backup"))
+
+        results = fan_out(jobs, self.max_workers, self.fetch_timeout)
+        report = StorageReport()
+        for key, res in pools.items():
+            growth = results.get((key, "rrd"))
+            report.pools.append(pool_row(res, None if isinstance(growth, Exception) else growth))
+        for (key, kind), res in results.items():
+            if isinstance(res, Exception):
+                report.errors.append(f"{key} {kind}: {res}")
+            elif kind == "backups":
+                for vmid, stats in res.items():
+                    if vmid in report.backups:
+                        report.backups[vmid].merge(stats)
+                    else:
+                        report.backups[vmid] = stats
+        return report
+
+    def node_names(self):
+        return {node["node"] for node in self._cached("nodes", None, self.proxmox.nodes.get)}
+
+    def fetch_tasks(self, node, limit=15):
+        # wie list_tasks, aber mit Fehlern: LookupError für unbekannte Nodes
+        if node not in self.node_names():
+            raise LookupError(f"Node {node} not found.")
+        return self.proxmox.nodes(node).tasks.get(limit=limit)
+
     def list_tasks(self, node, limit=15):
         try:
-            return self.proxmox.nodes(node).tasks.get(limit=limit)
+            return self.fetch_tasks(node, limit)
         except Exception as e:
             print(f"Failed to load tasks for node '{node}': {e}")
             return []
 
-    def fetch_nodes(self):
-        nodes = self.proxmox.nodes.get()
-        result = []
+    def follow_tasks(self, node=None, limit=50):
+        return TaskFollower(self.proxmox, node, limit)
+
+    def tail_task_log(self, upid):
+        return LogTail(self.proxmox, upid)
+
+    def fetch_nodes(self, on_row=None):
+        nodes = self._cached("nodes", None, self.proxmox.nodes.get)
+        by_name = {node["node"]: node for node in nodes}
 
+        def row(node, parts):
+            row = self._node_row(node, parts)
+            degraded = self.scheduler.degraded()
+            if node["node"] in degraded:
+                row["degraded"] = degraded[node["node"]]
+            return row
+
+        # alle Sub-Requests aller Nodes gleichzeitig absetzen; degradierte Nodes auslassen
+        jobs = {}
+        skip = self.scheduler.degraded()
         for node in nodes:
             name = node["node"]
-            status = node.get("status", "unknown")
+            if node.get("status", "unknown") == "offline" or name in skip:
+                if on_row:
+                    on_row(row(node, {}))
+                continue
+            api = self.proxmox.nodes(name)
+            jobs[(name, "version")] = lambda name=name, api=api: self._cached("version", name, api.version.get)
+            jobs[(name, "updates")] = lambda name=name, api=api: self._cached("apt", name, api.apt.update.get)
+            jobs[(name, "dns")] = lambda name=name, api=api: self._cached("dns", name, api.dns.get)
+
+        parts = {}
+
+        def collect(key, res):
+            name, kind = key
+            got = parts.setdefault(name, {})
+            got[kind] = res
+            # Zeile ausgeben, sobald alle drei Teile eines Nodes da sind
+            if on_row and len(got) == 3:
+                on_row(row(by_name[name], got))
+
+        fan_out(jobs, self.max_workers, self.fetch_timeout, on_result=collect)
+        return [row(node, parts.get(node["node"], {})) for node in nodes]
+
+    @staticmethod
+    def _node_row(node, parts):
+        errors = []
+
+        def part(kind, default):
+            res = parts.get(kind, default)
+            if isinstance(res, Exception):
+                errors.append(f"{kind}: {res}")
+                return default
+            return res
+
+        version = part("version", {})
+        updates = part("updates", [])
+        dns_config = part("dns", {})
+
+        dns_ips = ", ".join(filter(None, [dns_config.get("dns1"), dns_config.get("dns2"), dns_config.get("dns3")]))
+
+        return {
+            "node": node["node"],
+            "status": node.get("status", "unknown"),
+            "pveversion": version.get("version", "-"),
+            "hostname": version.get("hostname", "-"),
+            "dns_ips": dns_ips,
+            "updates": {
+                "upgradable": len(updates)
+            },
+            "error": "; ".join(errors) or None
+        }
+
+
+class MultiProxmoxManager:
+    """One ProxmoxManager per configured server, queried concurrently.
+
+    Guests and nodes are tagged with a "cluster" key (the server name) and
+    commands are routed by (cluster, vmid); `<cluster>/<id>` disambiguates.
+    """
+
+    def __init__(self, config):
+        self.max_workers = config.get("max_workers", 8)
+        self.fetch_timeout = config.get("fetch_timeout", 15)
+        self.node_clusters = {}
+        self.cache = ResponseCache(config.get("cache_ttl"))
+
+        servers = config["servers"]
+        sessions = fan_out(
+            {s["name"]: (lambda s=s: ProxmoxManager({**config, "servers": [s]}, self.cache)) for s in servers},
+            len(servers), self.fetch_timeout
+        )
+        self.managers = {}
+        for s in servers:
+            res = sessions[s["name"]]
+            if isinstance(res, Exception):
+                print(f"Cluster {s['name']} unavailable: {res}")
+            else:
+                self.managers[s["name"]] = res
+        if not self.managers:
+            raise ConnectionError("No cluster reachable.")
+
+    def _gather(self, method, *args, per_cluster=None):
+        # per_cluster(name) liefert optional eigene Argumente je Cluster
+        jobs = {
+            name: (lambda pm=pm, a=(per_cluster(name) if per_cluster else args): getattr(pm, method)(*a))
+            for name, pm in self.managers.items()
+        }
+        results = fan_out(jobs, len(jobs), self.fetch_timeout)
+        merged = []
+        for name in self.managers:
+            res = results[name]
+            if isinstance(res, Exception):
+                print(f"Cluster {name}: {res}")
+                continue
+            for item in res:
+                item["cluster"] = name
+                self.node_clusters.setdefault(item["node"], set()).add(name)
+                merged.append(item)
+        return merged
+
+    def fetch_vms(self, node=None, vm_type=None):
+        if node is None:
+            return self._gather("fetch_vms", None, vm_type)
+        pm, node = self._route_node(node)
+        if pm is None:
+            return []
+        name = next(n for n, m in self.managers.items() if m is pm)
+        vms = pm.fetch_vms(node, vm_type)
+        for vm in vms:
+            vm["cluster"] = name
+        return vms
+
+    def fetch_nodes(self, on_row=None):
+        if on_row is None:
+            return self._gather("fetch_nodes")
+        lock = threading.Lock()
+
+        def emitter(name):
+            def emit(row):
+                row["cluster"] = name
+                with lock:
+                    on_row(row)
+            return (emit,)
+
+        return self._gather("fetch_nodes", per_cluster=emitter)
+
+    def _matches(self, vmid, vms):
+        if not isinstance(vms, VMInventory):
+            vms = VMInventory(vms)
+        return vms.matches(vmid)
+
+    def find_vm(self, vmid, vms):
+        matches = self._matches(vmid, vms)
+        return matches[0] if len(matches) == 1 else None
+
+    def _route_vm(self, method, vmid, vms):
+        matches = self._matches(vmid, vms)
+        if len(matches) > 1:
+            print(f"ID {vmid} exists in several clusters, use <cluster>/{vmid}.")
+            return
+        if not matches:
+            print(f"VM/CT with ID {vmid} not found.")
+            return
+        vm = matches[0]
+        getattr(self.managers[vm["cluster"]], method)(vm["vmid"], [vm])
+
+    def _learn_nodes(self):
+        # Node-Namen aller Cluster, falls noch nichts geladen wurde
+        results = fan_out({name: pm.node_names for name, pm in self.managers.items()},
+                          len(self.managers), self.fetch_timeout)
+        for name, res in results.items():
+            if not isinstance(res, Exception):
+                for node in res:
+                    self.node_clusters.setdefault(node, set()).add(name)
+
+    def _resolve_node(self, node):
+        cluster, node = split_target(node)
+        if cluster is None:
+            if node not in self.node_clusters and len(self.managers) > 1:
+                self._learn_nodes()
+            owners = self.node_clusters.get(node, set())
+            if len(owners) == 1:
+                cluster = next(iter(owners))
+            elif len(self.managers) == 1:
+                cluster = next(iter(self.managers))
+            else:
+                raise LookupError(f"Node {node} is ambiguous or unknown, use <cluster>/{node}.")
+        pm = self.managers.get(cluster)
+        if pm is None:
+            raise LookupError(f"Unknown cluster '{cluster}'.")
+        return pm, node
+
+    def _route_node(self, node):
+        try:
+            return self._resolve_node(node)
+        except LookupError as e:
+            print(e)
+            return None, split_target(node)[1]
+
+    def start_vm(self, vmid, vms): self._route_vm("start_vm", vmid, vms)
+    def shutdown_vm(self, vmid, vms): self._route_vm("shutdown_vm", vmid, vms)
+    def stop_vm(self, vmid, vms): self._route_vm("stop_vm", vmid, vms)
+    def restart_vm(self, vmid, vms): self._route_vm("restart_vm", vmid, vms)
+    def reset_vm(self, vmid, vms): self._route_vm("reset_vm", vmid, vms)
+    def delete_vm(self, vmid, vms): self._route_vm("delete_vm", vmid, vms)
+
+    def perform(self, vm, action):
+        return self.managers[vm["cluster"]].perform(vm, action)
+
+    def restart_node(self, node):
+        pm, node = self._route_node(node)
+        if pm:
+            pm.restart_node(node)
+
+    def fetch_rrd(self, vms, nodes=(), timeframe="hour"):
+        jobs = {}
+        for name, pm in self.managers.items():
+            own_vms = [vm for vm in vms if vm.get("cluster") == name]
+            own_nodes = [n for n in nodes if n.get("cluster") == name]
+            jobs[name] = lambda pm=pm, v=own_vms, n=own_nodes: pm.fetch_rrd(v, n, timeframe)
+        merged = {}
+        for res in fan_out(jobs, len(jobs)).values():
+            if not isinstance(res, Exception):
+                merged.update(res)
+        return merged
+
+    def fetch_storage(self, timeframe="week"):
+        results = fan_out({name: (lambda pm=pm: pm.fetch_storage(timeframe)) for name, pm in self.managers.items()},
+                          len(self.managers))
+        merged = StorageReport()
+        for name, res in results.items():
+            if isinstance(res, Exception):
+                merged.errors.append(f"Cluster {name}: {res}")
+                continue
+            for pool in res.pools:
+                pool["cluster"] = name
+            merged.pools += res.pools
+            merged.errors += [f"{name}/{err}" for err in res.errors]
+            merged.backups.update((f"{name}/{vmid}", stats) for vmid, stats in res.backups.items())
+        return merged
+
+    def fetch_guest_config(self, vm):
+        return self.managers[vm["cluster"]].fetch_guest_config(vm)
+
+    def list_snapshots(self, vm):
+        return self.managers[vm["cluster"]].list_snapshots(vm)
+
+    def run_job(self, vm, action, params, timeout):
+        return self.managers[vm["cluster"]].run_job(vm, action, params, timeout)
+
+    def shared_storages(self):
+        shared = set()
+        for name, pm in self.managers.items():
             try:
-                version = self.proxmox.nodes(name).version.get()
-                updates = self.proxmox.nodes(name).apt.update.get()
-                dns_config = self.proxmox.nodes(name).dns.get()
+                shared |= {(name, storage) for _, storage in pm.shared_storages()}
             except Exception as e:
-                print(f"Error fetching node data for {name}: {e}")
-                version = {}
-                updates = []
-                dns_config = {}
-
-            dns_ips = ", ".join(filter(None, [dns_config.get("dns1"), dns_config.get("dns2"), dns_config.get("dns3")]))
-
-            result.append({
-                "node": name,
-                "status": status,
-                "pveversion": version.get("version", "-"),
-                "hostname": version.get("hostname", "-"),
-                "dns_ips": dns_ips,
-                "updates": {
-                    "upgradable": len(updates)
-                }
-            })
-
-        return result
\ No newline at end of file
+                print(f"Cluster {name}: {e}")
+        return shared
+
+    def backup_size(self, vms, storage, since):
+        return sum(pm.backup_size([vm for vm in vms if vm.get("cluster") == name], storage, since)
+                   for name, pm in self.managers.items() if any(vm.get("cluster") == name for vm in vms))
+
+    def fetch_guest_configs(self, vms, on_result=None):
+        # pro Cluster eigenes Limit, alle Cluster gleichzeitig
+        lock = threading.Lock()
+
+        def locked(key, res):
+            with lock:
+                on_result(key, res)
+
+        jobs = {}
+        for name, pm in self.managers.items():
+            own = [vm for vm in vms if vm.get("cluster") == name]
+            if own:
+                jobs[name] = lambda pm=pm, own=own: pm.fetch_guest_configs(own, on_result and locked)
+        merged = {}
+        for res in fan_out(jobs, len(jobs)).values():
+            if not isinstance(res, Exception):
+                merged.update(res)
+        return merged
+
+    def update_node(self, node):
+        pm, node = self._route_node(node)
+        if pm:
+            pm.update_node(node)
+
+    def rolling_update(self, nodes, **options):
+        # nur innerhalb eines Clusters, Gäste wandern nicht zwischen Clustern
+        routed = [self._route_node(node) for node in nodes]
+        if any(pm is None for pm, _ in routed):
+            return []
+        if len({id(pm) for pm, _ in routed}) > 1:
+            print("A rolling reboot runs within one cluster, use nodes of the same cluster.")
+            return []
+        return routed[0][0].rolling_update([node for _, node in routed], **options)
+
+    def set_dns(self, node, dns1, dns2=None, dns3=None):
+        pm, node = self._route_node(node)
+        if pm:
+            pm.set_dns(node, dns1, dns2, dns3)
+
+    def follow_tasks(self, node=None, limit=50):
+        if node:
+            pm, node = self._route_node(node)
+            return pm.follow_tasks(node, limit) if pm else None
+        return _MergedFollower({name: pm.follow_tasks(None, limit) for name, pm in self.managers.items()})
+
+    def tail_task_log(self, upid):
+        # UPID enthält den Node; Cluster optional als <cluster>/UPID:...
+        cluster, upid = split_target(upid)
+        node = upid_node(upid)
+        pm, _ = self._route_node(f"{cluster}/{node}" if cluster else node)
+        return pm.tail_task_log(upid) if pm else None
+
+    def fetch_tasks(self, node, limit=15):
+        pm, node = self._resolve_node(node)
+        return pm.fetch_tasks(node, limit)
+
+    def list_tasks(self, node, limit=15):
+        pm, node = self._route_node(node)
+        return pm.list_tasks(node, limit) if pm else []
+
+
+class _MergedFollower:
+    def __init__(self, followers):
+        self.followers = followers
+
+    def poll(self):
+        new = []
+        for name, follower in self.followers.items():
+            for task in follower.poll():
+                task["cluster"] = name
+                new.append(task)
+        new.sort(key=lambda t: int(t.get("starttime", 0)))
+        return new
@@ -1,5 +1,19 @@
-from controller import ProxmonController
+import sys
 
 if __name__ == "__main__":
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        import startup
+        startup.install()
+
+    if len(sys.argv) > 1:
+        from cli import main
+        sys.exit(main())
+
+    from model import ConfigManager
+    if ConfigManager().load().get("backend") == "async":
+        from async_controller import AsyncProxmonController as ProxmonController
+    else:
+        from controller import ProxmonController
     controller = ProxmonController()
-    controller.run()
\ No newline at end of file
+    controller.run()
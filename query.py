@@ -0,0 +1,178 @@
+import heapq
+import operator
+import re
+from fnmatch import fnmatchcase
+
+GB = 1024 ** 3
+
+# Werte wie in der Tabelle: CPU in %, Speicher/Disk in GB
+FIELDS = {
+    "vmid": lambda vm: int(vm["vmid"]),
+    "name": lambda vm: vm.get("name", "-"),
+    "node": lambda vm: vm.get("node", ""),
+    "status": lambda vm: vm.get("status", ""),
+    "type": lambda vm: vm.get("type", ""),
+    "cluster": lambda vm: vm.get("cluster") or "",
+    "tags": lambda vm: vm.get("tags", ""),
+    "cpu": lambda vm: (vm.get("cpu") or 0) * 100,
+    "mem": lambda vm: (vm.get("mem") or 0) / GB,
+    "maxmem": lambda vm: (vm.get("maxmem") or 0) / GB,
+    "disk": lambda vm: (vm.get("disk") or 0) / GB,
+    "maxdisk": lambda vm: (vm.get("maxdisk") or 0) / GB,
+    "uptime": lambda vm: vm.get("uptime") or 0,
+}
+ALIASES = {"id": "vmid", "tag": "tags", "ram": "mem"}
+NUMERIC = {"vmid", "cpu", "mem", "maxmem", "disk", "maxdisk", "uptime"}
+OPERATORS = {"=": operator.eq, "!=": operator.ne, ">": operator.gt, "<": operator.lt,
+             ">=": operator.ge, "<=": operator.le}
+
+_CONDITION = re.compile(r"^([a-z]+)(>=|<=|!=|=|>|<)(.*)$")
+
+
+class QueryError(ValueError):
+    pass
+
+
+def field_name(name):
+    name = ALIASES.get(name, name)
+    if name not in FIELDS:
+        raise QueryError(f"unknown field '{name}' (known: {', '.join(FIELDS)})")
+    return name
+
+
+def parse_condition(token):
+    """`field<op>value` -> (field, op, value), or None if it is no condition."""
+    m = _CONDITION.match(token)
+    if not m or ALIASES.get(m.group(1), m.group(1)) not in FIELDS:
+        return None
+    return field_name(m.group(1)), m.group(2), m.group(3)
+
+
+def compile_condition(field, op, value):
+    """Build a predicate for one condition; parsing happens here, once."""
+    get = FIELDS[field]
+    test = OPERATORS[op]
+
+    if field in NUMERIC:
+        try:
+            number = float(value)
+        except ValueError:
+            raise QueryError(f"{field} needs a number, got '{value}'")
+        return lambda vm: test(get(vm), number)
+
+    if field == "tags":
+        if op not in ("=", "!="):
+            raise QueryError("tags only supports = and !=")
+        has = (lambda vm: any(fnmatchcase(t, value) for t in get(vm).split(";") if t))
+        return has if op == "=" else (lambda vm: not has(vm))
+
+    if op in ("=", "!=") and any(c in value for c in "*?["):
+        match = (lambda vm: fnmatchcase(str(get(vm)), value))
+        return match if op == "=" else (lambda vm: not match(vm))
+    return lambda vm: test(str(get(vm)), value)
+
+
+def compile_filter(text):
+    """`node=pve2 status=running cpu>50` -> predicate (all conditions)."""
+    preds = []
+    for token in text.replace(",", " ").split():
+        m = _CONDITION.match(token)
+        if not m:
+            raise QueryError(f"not a condition: '{token}'")
+        cond = (field_name(m.group(1)), m.group(2), m.group(3))
+        preds.append(compile_condition(*cond))
+    if not preds:
+        return None
+    if len(preds) == 1:
+        return preds[0]
+    return lambda vm: all(p(vm) for p in preds)
+
+
+def parse_sort(spec):
+    """`-mem` or `node,-cpu` -> [(getter, descending)]."""
+    keys = []
+    for part in spec.replace(",", " ").split():
+        desc = part.startswith("-")
+        keys.append((FIELDS[field_name(part.lstrip("+-"))], desc))
+    return keys
+
+
+def sort_vms(vms, keys):
+    vms = list(vms)
+    # stabil sortieren, letzte Taste zuerst
+    for get, desc in reversed(keys):
+        vms.sort(key=get, reverse=desc)
+    return vms
+
+
+def top_vms(vms, n, keys):
+    """First n guests in sort order; heap-based unless the keys mix
+    directions, so large lists are not fully sorted."""
+    if not keys:
+        # :sort ohne Argument bei aktivem :top
+        return list(vms)[:n]
+    if len(keys) == 1:
+        get, desc = keys[0]
+        return (heapq.nlargest if desc else heapq.nsmallest)(n, vms, key=get)
+    if all(desc == keys[0][1] for _, desc in keys):
+        key = (lambda vm: tuple(get(vm) for get, _ in keys))
+        return (heapq.nlargest if keys[0][1] else heapq.nsmallest)(n, vms, key=key)
+    return sort_vms(vms, keys)[:n]
+
+
+class Query:
+    """Filter, sort order and top-N limit for the VM table."""
+
+    def __init__(self):
+        self.filter_text = ""
+        self.predicate = None
+        self.sort_text = ""
+        self.sort_keys = []
+        self.limit = 0
+
+    def set_filter(self, text):
+        self.predicate = compile_filter(text)
+        self.filter_text = text.strip()
+
+    def set_sort(self, text):
+        self.sort_keys = parse_sort(text)
+        self.sort_text = text.strip()
+
+    def set_top(self, n, text=None):
+        if text:
+            self.set_sort(text)
+        elif n and not self.sort_keys:
+            self.set_sort("-cpu")
+        self.limit = n
+
+    @property
+    def active(self):
+        return bool(self.predicate or self.sort_keys or self.limit)
+
+    def narrow(self):
+        # was die API selbst einschränken kann: exakter Node, exakter Typ
+        params = {}
+        for token in self.filter_text.replace(",", " ").split():
+            field, op, value = parse_condition(token)
+            if op == "=" and field in ("node", "type") and not any(c in value for c in "*?["):
+                params["vm_type" if field == "type" else "node"] = value
+        return params
+
+    def apply(self, vms):
+        if self.predicate:
+            vms = [vm for vm in vms if self.predicate(vm)]
+        if self.limit:
+            return top_vms(vms, self.limit, self.sort_keys)
+        if self.sort_keys:
+            return sort_vms(vms, self.sort_keys)
+        return vms
+
+    def describe(self):
+        parts = []
+        if self.filter_text:
+            parts.append(f"filter {self.filter_text}")
+        if self.sort_text:
+            parts.append(f"sort {self.sort_text}")
+        if self.limit:
+            parts.append(f"top {self.limit}")
+        return ", ".join(parts)
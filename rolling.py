@@ -0,0 +1,150 @@
+import threading
+import time
+from concurrency import fan_out
+from inventory import vm_key
+
+PHASES = ("evacuate", "refresh", "reboot", "online", "return")
+
+
+class RollingUpdateFailed(Exception):
+    pass
+
+
+class NodeReport:
+    __slots__ = ("node", "phases", "migrated", "failed", "pending", "error", "started", "finished")
+
+    def __init__(self, node):
+        self.node = node
+        self.phases = {}
+        self.migrated = 0
+        self.failed = []
+        self.pending = None
+        self.error = None
+        self.started = time.monotonic()
+        self.finished = None
+
+    @property
+    def total(self):
+        return (self.finished or time.monotonic()) - self.started
+
+
+class RollingUpdate:
+    """Reboots nodes `parallel` at a time: migrate running guests away,
+    refresh the package lists, reboot, wait until the node is back, migrate
+    guests back.
+
+    The Proxmox API has no call that installs upgrades; "refresh" is
+    POST apt/update, which only updates the package indexes. The packages
+    still upgradable after it are counted in `NodeReport.pending`, so
+    upgrades have to be installed on the node before the run.
+
+    Migrations run concurrently (`migrate_parallelism`) and are tracked by
+    their UPIDs. The run stops after the first node that fails, so at most
+    one batch of nodes is ever out of service.
+    """
+
+    def __init__(self, pm, nodes, parallel=1, migrate_parallelism=4, migrate_back=True,
+                 online_timeout=900, poll_interval=5, on_progress=None):
+        self.pm = pm
+        self.nodes = list(nodes)
+        self.parallel = max(1, parallel)
+        self.migrate_parallelism = migrate_parallelism
+        self.migrate_back = migrate_back
+        self.online_timeout = online_timeout
+        self.poll_interval = poll_interval
+        self.on_progress = on_progress or (lambda node, phase, detail: None)
+        self._lock = threading.Lock()
+        self._busy = set()
+
+    def run(self):
+        reports = []
+        for i in range(0, len(self.nodes), self.parallel):
+            batch = self.nodes[i:i + self.parallel]
+            self._busy = set(batch)
+            results = fan_out({node: (lambda node=node: self.update(node)) for node in batch}, len(batch))
+            reports.extend(results[node] for node in batch)
+            if any(r.error for r in reports):
+                break
+        return reports
+
+    def _phase(self, report, phase, fn):
+        self.on_progress(report.node, phase, "started")
+        start = time.monotonic()
+        try:
+            result = fn()
+        finally:
+            report.phases[phase] = time.monotonic() - start
+        self.on_progress(report.node, phase, f"done in {report.phases[phase]:.0f}s")
+        return result
+
+    def update(self, node):
+        report = NodeReport(node)
+        try:
+            states = self.pm.node_states()
+            if states.get(node, {}).get("status") != "online":
+                raise RollingUpdateFailed(f"node {node} is not online")
+            moved = self._phase(report, "evacuate", lambda: self._evacuate(node, states, report))
+            self._phase(report, "refresh", lambda: self.pm.apt_update(node))
+            report.pending = len(self.pm.upgradable(node))
+            if report.pending:
+                self.on_progress(node, "refresh", f"{report.pending} package(s) upgradable, not installed")
+            uptime = states[node].get("uptime", 0)
+            self._phase(report, "reboot", lambda: self.pm.reboot_node(node))
+            self._phase(report, "online", lambda: self._wait_online(node, uptime))
+            if self.migrate_back and moved:
+                self._phase(report, "return", lambda: self._migrate(moved, report))
+        except Exception as e:
+            report.error = str(e)
+            self.on_progress(node, "failed", str(e))
+        report.finished = time.monotonic()
+        return report
+
+    def _targets(self, states):
+        # online und nicht selbst gerade im Update
+        with self._lock:
+            return [n for n, s in states.items() if s.get("status") == "online" and n not in self._busy]
+
+    def _evacuate(self, node, states, report):
+        guests = [vm for vm in self.pm.fetch_vms() if vm["node"] == node and vm.get("status") == "running"]
+        if not guests:
+            return []
+        targets = self._targets(states)
+        if not targets:
+            raise RollingUpdateFailed(f"no online node to take the {len(guests)} running guests of {node}")
+
+        # gleichmäßig verteilen, wenig belegte Nodes zuerst
+        load = {n: states[n].get("mem", 0) / (states[n].get("maxmem") or 1) for n in targets}
+        targets.sort(key=load.get)
+        plan = [(vm, targets[i % len(targets)]) for i, vm in enumerate(guests)]
+        self._migrate(plan, report)
+        return [({**vm, "node": target}, node) for vm, target in plan]
+
+    def _migrate(self, plan, report):
+        # plan: [(vm, target)], alle Migrationen gleichzeitig (begrenzt)
+        results = fan_out({vm_key(vm): (lambda vm=vm, target=target: self.pm.migrate(vm, target))
+                           for vm, target in plan}, self.migrate_parallelism)
+        failed = 0
+        for vm, target in plan:
+            res = results[vm_key(vm)]
+            if isinstance(res, Exception):
+                failed += 1
+                report.failed.append(f"{vm_key(vm)}: {res}")
+            else:
+                report.migrated += 1
+                self.on_progress(report.node, "migrate", f"{vm_key(vm)} → {target}")
+        if failed:
+            # nicht mit laufenden Gästen rebooten
+            raise RollingUpdateFailed(f"{failed} of {len(plan)} migration(s) failed")
+
+    def _wait_online(self, node, uptime_before):
+        # zurück, wenn der Node online ist und seine Uptime neu begonnen hat
+        deadline = time.monotonic() + self.online_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            try:
+                state = self.pm.node_states().get(node, {})
+            except Exception:
+                continue  # API-Host startet evtl. gerade selbst neu
+            if state.get("status") == "online" and state.get("uptime", 0) < uptime_before:
+                return
+        raise RollingUpdateFailed(f"{node} not back online after {self.online_timeout}s")
@@ -0,0 +1,187 @@
+import contextlib
+import random
+import re
+import threading
+import time
+import requests
+
+# Proxy-Fehler von pveproxy: Node nicht erreichbar bzw. Timeout
+UNAVAILABLE = {502, 503, 504, 595, 596}
+IDEMPOTENT = {"GET", "HEAD"}
+
+_NODE = re.compile(r"/api2/json/nodes/([^/?]+)/")
+_lock = threading.Lock()
+_schedulers = {}
+_NO_LIMIT = contextlib.nullcontext()
+
+
+class NodeDegraded(Exception):
+    def __init__(self, node, remaining):
+        when = f"for another {remaining:.0f}s" if remaining >= 1 else "until the probe request answers"
+        super().__init__(f"node {node} is degraded, skipped {when}")
+        self.node = node
+        self.remaining = remaining
+
+
+class TokenBucket:
+    """`rate` requests per second on average, bursts up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; after `cooldown`
+    seconds one probe request may pass, its outcome closes or reopens it."""
+
+    def __init__(self, threshold=3, cooldown=30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        if self.opened is None:
+            return 0
+        return max(0.0, self.opened + self.cooldown - time.monotonic())
+
+    def allow(self):
+        with self._lock:
+            if self.opened is None:
+                return True
+            if self.remaining() > 0 or self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened = None
+            self.probing = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                self.opened = time.monotonic()
+            self.probing = False
+
+
+class RequestScheduler:
+    """Sits between proxmoxer and the HTTP pool of one API host.
+
+    Every request takes a token from the host's bucket and one of
+    `max_inflight` slots (and of `node_inflight` per node, so one slow
+    node cannot hold all of them). Idempotent requests are retried on connection
+    errors, timeouts and pveproxy 5xx with jittered exponential backoff.
+    Requests to nodes/{node}/... go through a circuit breaker per node, so
+    a sick node is skipped (NodeDegraded) instead of being hit again.
+    The response (or the final exception) carries the number of retries.
+    """
+
+    def __init__(self, rate=100, burst=200, max_inflight=8, node_inflight=4, retries=2, backoff=0.2,
+                 breaker_threshold=3, breaker_cooldown=30):
+        self.bucket = TokenBucket(rate, burst)
+        self.slots = threading.BoundedSemaphore(max(1, max_inflight))
+        self.node_inflight = max(1, node_inflight)
+        self.node_slots = {}
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_host(cls, host, config):
+        # eine Instanz pro API-Host, auch wenn mehrere Manager ihn nutzen
+        with _lock:
+            scheduler = _schedulers.get(host)
+            if scheduler is None:
+                scheduler = _schedulers[host] = cls(
+                    config.get("rate_limit", 100), config.get("rate_burst", 200),
+                    config.get("max_workers", 8), config.get("node_inflight", 4), config.get("get_retries", 2),
+                    config.get("retry_backoff", 0.2), config.get("breaker_threshold", 3),
+                    config.get("breaker_cooldown", 30))
+            return scheduler
+
+    def breaker(self, node):
+        with self._lock:
+            breaker = self.breakers.get(node)
+            if breaker is None:
+                breaker = self.breakers[node] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+                self.node_slots[node] = threading.BoundedSemaphore(self.node_inflight)
+            return breaker
+
+    def degraded(self):
+        """{node: seconds until the next probe} for nodes that are skipped
+        right now; after the cool-down a node drops out until its probe fails."""
+        return {node: b.remaining() for node, b in list(self.breakers.items())
+                if b.opened is not None and (b.remaining() > 0 or b.probing)}
+
+    def wrap(self, session):
+        request = session.request
+
+        def scheduled(method, url, *args, **kwargs):
+            m = _NODE.search(url)
+            breaker = self.breaker(m.group(1)) if m else None
+            if breaker and not breaker.allow():
+                raise NodeDegraded(m.group(1), breaker.remaining())
+            node_slots = self.node_slots[m.group(1)] if m else _NO_LIMIT
+            attempts = 1 + (self.retries if method in IDEMPOTENT else 0)
+            for attempt in range(attempts):
+                self.bucket.acquire()
+                error = resp = None
+                with node_slots, self.slots:
+                    try:
+                        resp = request(method, url, *args, **kwargs)
+                    except (requests.ConnectionError, requests.Timeout) as e:
+                        error = e
+                    except Exception:
+                        # kein Zeichen für einen kranken Node
+                        if breaker:
+                            breaker.success()
+                        raise
+                if resp is not None and resp.status_code not in UNAVAILABLE:
+                    if breaker:
+                        breaker.success()
+                    resp.retries = attempt
+                    return resp
+                if attempt + 1 == attempts:
+                    break
+                if resp is not None:
+                    resp.close()
+                # volle Streuung, damit Wiederholungen nicht gleichzeitig kommen
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            if breaker:
+                breaker.failure()
+            # für den Tracer: Wiederholungen zählen nicht als eigene Aufrufe
+            if error is not None:
+                error.retries = attempt
+                raise error
+            resp.retries = attempt
+            return resp
+
+        session.request = scheduled
+        return session
@@ -0,0 +1,210 @@
+import json
+import os
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from requests.cookies import cookiejar_from_dict
+from proxmoxer import ProxmoxAPI
+from proxmoxer.core import AuthenticationError
+from proxmoxer.backends.https import ProxmoxHTTPAuthBase
+from scheduler import RequestScheduler
+from tracing import instrument, traced
+from util import CONFIG_PATH
+
+TICKET_PATH = os.path.join(os.path.dirname(CONFIG_PATH), "tickets.json")
+# PVE-Tickets sind 2h gültig; vorher erneuern
+TICKET_LIFETIME = 7200
+TICKET_RENEW_AGE = 3600
+
+_cache_lock = threading.Lock()
+
+
+def parse_host(host):
+    # "https://pve:8006", "pve:8006", "pve" oder "http://127.0.0.1:8080"
+    scheme = "https"
+    if "://" in host:
+        scheme, host = host.split("://", 1)
+    host = host.rstrip("/")
+    port = 8006
+    if ":" in host:
+        host, port = host.rsplit(":", 1)
+        port = int(port)
+    return scheme, host, port
+
+
+class TicketCache:
+    """Auth tickets on disk, keyed by user and API URL, so a restart within
+    the ticket lifetime needs no login round-trip."""
+
+    def __init__(self, path=TICKET_PATH):
+        self.path = path
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key):
+        with _cache_lock:
+            entry = self._load().get(key)
+        if entry and time.time() - entry["created"] < TICKET_LIFETIME - 300:
+            return entry
+        return None
+
+    def put(self, key, entry):
+        self._update(lambda data: data.__setitem__(key, entry))
+
+    def drop(self, key):
+        self._update(lambda data: data.pop(key, None))
+
+    def _update(self, change):
+        with _cache_lock:
+            data = self._load()
+            change(data)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+
+
+class TicketAuth(ProxmoxHTTPAuthBase):
+    """Ticket auth that logs in over the pooled session, reuses cached
+    tickets and logs in again once if the server rejects a ticket.
+
+    `request` sends the login; it must not wait for a RequestScheduler slot,
+    since renewal and re-login run inside a request that already holds one.
+    """
+
+    def __init__(self, request, base_url, username, password, cache, **kwargs):
+        super().__init__(**kwargs)
+        self.request = request
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.cache = cache
+        self.key = f"{username}@{base_url}"
+        self._lock = threading.Lock()
+
+        entry = cache.get(self.key)
+        if entry is None:
+            entry = self._login(password)
+        self._use(entry)
+
+    def _login(self, password):
+        resp = self.request(
+            "POST", self.base_url + "/access/ticket",
+            data={"username": self.username, "password": password},
+            auth=ProxmoxHTTPAuthBase(),
+            verify=self.verify_ssl,
+            timeout=self.timeout,
+        )
+        data = resp.json().get("data") if resp.ok else None
+        if not data or "ticket" not in data:
+            raise AuthenticationError(f"Couldn't authenticate user: {self.username} to {self.base_url}")
+        entry = {"ticket": data["ticket"], "csrf": data["CSRFPreventionToken"], "created": time.time()}
+        self.cache.put(self.key, entry)
+        return entry
+
+    def _use(self, entry):
+        self.ticket = entry["ticket"]
+        self.csrf = entry["csrf"]
+        self.created = entry["created"]
+
+    def relogin(self):
+        with self._lock:
+            self._use(self._login(self.password))
+
+    def get_cookies(self):
+        return cookiejar_from_dict({self.service + "AuthCookie": self.ticket})
+
+    def get_tokens(self):
+        return self.ticket, self.csrf
+
+    def __call__(self, req):
+        if time.time() - self.created >= TICKET_RENEW_AGE:
+            with self._lock:
+                if time.time() - self.created >= TICKET_RENEW_AGE:
+                    # gültiges Ticket als Passwort erneuert es
+                    self._use(self._login(self.ticket))
+        if req.method != "GET":
+            req.headers["CSRFPreventionToken"] = self.csrf
+        req.register_hook("response", self._retry_unauthorized)
+        return req
+
+    def _retry_unauthorized(self, resp, **kwargs):
+        # abgelaufenes/verworfenes Ticket aus dem Cache: einmal neu anmelden
+        if resp.status_code != 401 or getattr(resp.request, "_relogged", False):
+            return resp
+        self.cache.drop(self.key)
+        self.relogin()
+        retry = resp.request.copy()
+        retry._relogged = True
+        retry.headers["Cookie"] = f"{self.service}AuthCookie={self.ticket}"
+        if retry.method != "GET":
+            retry.headers["CSRFPreventionToken"] = self.csrf
+        resp.content  # Body lesen, damit die Verbindung zurück in den Pool kann
+        resp.close()
+        return resp.connection.send(retry, **kwargs)
+
+
+def api_url(server):
+    return "{}://{}:{}/api2/json".format(*parse_host(server["host"]))
+
+
+def connect(server, config, cache=None):
+    """Build a ProxmoxAPI for one configured server.
+
+    Uses API-token auth when the server has token_name/token_value,
+    otherwise ticket auth with the on-disk ticket cache. Connections are
+    kept alive in a pool sized to max_workers; timeouts are
+    (connect_timeout, request_timeout). Every request passes the per-host
+    RequestScheduler (rate limit, retries, per-node breaker) and is
+    recorded, with its retries, by the tracer (see tracing.py) unless
+    `tracing` is off.
+    """
+    scheme, host, port = parse_host(server["host"])
+    verify_ssl = server.get("verify_ssl", False)
+    timeout = (config.get("connect_timeout", 3.05), config.get("request_timeout", 5))
+    token = server.get("token_name")
+
+    # Token-Auth baut keine Verbindung auf; bei Passwort-Auth wird sie unten ersetzt
+    api = ProxmoxAPI(
+        f"{host}:{port}",
+        user=server["username"],
+        token_name=token or "-",
+        token_value=server.get("token_value", "-"),
+        verify_ssl=verify_ssl,
+        timeout=timeout,
+    )
+    base_url = api_url(server)
+    api._store["base_url"] = base_url
+
+    session = api._store["session"]
+    pool = max(4, config.get("max_workers", 8))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    name = server.get("name", host)
+    # Login am Scheduler vorbei, sonst wartet er auf einen zweiten Slot
+    login_request = traced(session.request, name)
+    RequestScheduler.for_host(base_url, config).wrap(session)
+    instrument(session, name)
+
+    if not token:
+        session.auth = TicketAuth(
+            login_request, base_url, server["username"], server["password"],
+            cache or TicketCache(), verify_ssl=verify_ssl, timeout=timeout,
+        )
+    return api
+
+
+def verify_login(server, config):
+    # Zugangsdaten prüfen; bei Passwort-Auth landet das Ticket gleich im Cache
+    cache = TicketCache()
+    if not server.get("token_name"):
+        cache.drop(f"{server['username']}@{api_url(server)}")
+    connect(server, config, cache).version.get()
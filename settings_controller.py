@@ -1,5 +1,5 @@
 import getpass
-from model import ConfigManager, ProxmoxManager
+from model import ConfigManager
 
 def settings_menu(config):
     cm = ConfigManager()
@@ -13,6 +13,7 @@ def settings_menu(config):
         print(f"[6] Change language (currently: {config['language']})")
         print(f"[7] Toggle color (currently: {config['use_color']})")
         print(f"[8] Set task list limit (currently: {config.get('task_limit', 15)})")
+        print(f"[9] Set update interval for :watch (currently: {config.get('update_interval', 10)}s)")
         print("[0] Save and return")
 
         choice = input("Choice: ").strip()
@@ -23,10 +24,16 @@ def settings_menu(config):
             name = input("Name: ")
             host = input("Host: ")
             username = input("Username: ")
-            password = getpass.getpass("Password: ")
-            test_server = {"host": host, "username": username, "password": password}
+            if input("Use API token? [y/N]: ").strip().lower() == "y":
+                test_server = {"host": host, "username": username,
+                               "token_name": input("Token ID: "),
+                               "token_value": getpass.getpass("Token secret: ")}
+            else:
+                password = getpass.getpass("Password: ")
+                test_server = {"host": host, "username": username, "password": password}
             try:
-                ProxmoxManager({"servers": [test_server]})
+                from session import verify_login
+                verify_login(test_server, config)
                 config["servers"].append({"name": name, **test_server})
                 print("Server added.")
             except:
@@ -38,11 +45,18 @@ def settings_menu(config):
                 srv["name"] = input(f"Name [{srv['name']}]: ") or srv["name"]
                 srv["host"] = input(f"Host [{srv['host']}]: ") or srv["host"]
                 srv["username"] = input(f"Username [{srv['username']}]: ") or srv["username"]
-                pw = getpass.getpass("Password (leave blank to keep): ")
-                if pw:
-                    srv["password"] = pw
+                if srv.get("token_name"):
+                    srv["token_name"] = input(f"Token ID [{srv['token_name']}]: ") or srv["token_name"]
+                    secret = getpass.getpass("Token secret (leave blank to keep): ")
+                    if secret:
+                        srv["token_value"] = secret
+                else:
+                    pw = getpass.getpass("Password (leave blank to keep): ")
+                    if pw:
+                        srv["password"] = pw
                 try:
-                    ProxmoxManager({"servers": [srv]})
+                    from session import verify_login
+                    verify_login(srv, config)
                     print("Updated and verified.")
                 except:
                     print("Update failed.")
@@ -60,6 +74,8 @@ def settings_menu(config):
             config["use_color"] = not config["use_color"]
         elif choice == "8":
             config["task_limit"] = int(input("Number of tasks to show: "))
+        elif choice == "9":
+            config["update_interval"] = int(input("Update interval in seconds: "))
         elif choice == "0":
             cm.save(config)
             print("Saved.")
@@ -0,0 +1,73 @@
+import json
+import os
+import re
+import time
+from util import CONFIG_PATH
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(CONFIG_PATH), "snapshots")
+SNAPSHOT_VERSION = 1
+VM_FIELDS = ["cluster", "vmid", "name", "type", "node", "status", "cpu", "mem", "maxmem",
+             "disk", "maxdisk", "uptime", "tags"]
+NODE_FIELDS = ["cluster", "node", "status", "pveversion", "hostname", "dns_ips", "updates", "error"]
+
+
+def snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, re.sub(r"[^\w.-]", "_", name) + ".json")
+
+
+def _columns(rows, fields):
+    # spaltenweise: Schlüssel nur einmal, leere Spalten fallen weg
+    cols = {}
+    for field in fields:
+        col = [row.get(field) for row in rows]
+        if any(v is not None for v in col):
+            cols[field] = col
+    return cols
+
+
+def _rows(cols, count):
+    if not count:
+        return []
+    names = list(cols)
+    return [dict(zip(names, values)) for values in zip(*(cols[n] for n in names))]
+
+
+class Snapshot:
+    __slots__ = ("vms", "nodes", "saved")
+
+    def __init__(self, vms, nodes, saved):
+        self.vms = vms
+        self.nodes = nodes
+        self.saved = saved
+
+
+def save(name, vms, nodes=None):
+    """Write the inventory of one server atomically (tmp file + rename)."""
+    vms = [vm if not vm.get("cpu") else {**vm, "cpu": round(vm["cpu"], 4)} for vm in vms]
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "saved": time.time(),
+        "count": len(vms),
+        "vms": _columns(vms, VM_FIELDS),
+        "nodes": nodes and _columns(nodes, NODE_FIELDS),
+        "node_count": len(nodes or ()),
+    }
+    path = snapshot_path(name)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load(name):
+    """Last saved inventory or None (missing, unreadable or old format)."""
+    try:
+        with open(snapshot_path(name)) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != SNAPSHOT_VERSION:
+        return None
+    nodes = _rows(data["nodes"], data.get("node_count", 0)) if data.get("nodes") else None
+    return Snapshot(_rows(data["vms"], data["count"]), nodes, data["saved"])
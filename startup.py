@@ -0,0 +1,42 @@
+import atexit
+import builtins
+import sys
+import time
+
+_records = {}
+_stack = []
+_t0 = time.perf_counter()
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0, _orig=builtins.__import__):
+    # nur erstmalige absolute Imports messen
+    if level or name in sys.modules:
+        return _orig(name, globals, locals, fromlist, level)
+
+    start = time.perf_counter()
+    _stack.append(0.0)
+    try:
+        return _orig(name, globals, locals, fromlist, level)
+    finally:
+        children = _stack.pop()
+        total = time.perf_counter() - start
+        if _stack:
+            _stack[-1] += total
+        if name not in _records:
+            _records[name] = (total, total - children)
+
+
+def install():
+    """Time every first-time import and print a report to stderr at exit."""
+    builtins.__import__ = _timed_import
+    atexit.register(report)
+
+
+def report(limit=25, out=None):
+    out = out or sys.stderr
+    top = sorted(_records.items(), key=lambda kv: kv[1][1], reverse=True)[:limit]
+    out.write(f"\nStartup import profile ({len(_records)} modules, "
+              f"{(time.perf_counter() - _t0) * 1000:.1f} ms since start)\n")
+    out.write(f"{'self ms':>9} {'cumul ms':>9}  module\n")
+    for name, (total, own) in top:
+        out.write(f"{own * 1000:9.1f} {total * 1000:9.1f}  {name}\n")
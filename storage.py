@@ -0,0 +1,127 @@
+import codecs
+import json
+import time
+
+DAY = 86400
+_DECODER = json.JSONDecoder()
+
+
+def iter_json_data(chunks, encoding="utf-8"):
+    """Yield the items of the `data` list of an API response one by one
+    while the body is still arriving; only the current item is in memory."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    buf = ""
+    pos = 0
+    started = False
+    for chunk in chunks:
+        # UTF-8-Zeichen können über Chunk-Grenzen gehen
+        buf = buf[pos:] + decoder.decode(chunk)
+        pos = 0
+        if not started:
+            key = buf.find('"data"')
+            start = buf.find("[", key) if key >= 0 else -1
+            if start < 0:
+                continue
+            started = True
+            pos = start + 1
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                return
+            try:
+                item, pos = _DECODER.raw_decode(buf, pos)
+            except ValueError:
+                break  # Objekt noch unvollständig, nächsten Chunk abwarten
+            yield item
+    if started:
+        raise ValueError("response ended inside the data list")
+
+
+class BackupStats:
+    __slots__ = ("count", "size", "last", "first")
+
+    def __init__(self):
+        self.count = 0
+        self.size = 0
+        self.last = 0
+        self.first = 0
+
+    def add(self, ctime, size):
+        self.count += 1
+        self.size += size
+        self.last = max(self.last, ctime)
+        self.first = min(self.first, ctime) if self.first else ctime
+
+    def merge(self, other):
+        self.count += other.count
+        self.size += other.size
+        self.last = max(self.last, other.last)
+        self.first = min(filter(None, (self.first, other.first)), default=0)
+
+    def age(self, now=None):
+        return (now or time.time()) - self.last if self.last else None
+
+
+def summarize_backups(volumes, into=None, key=str):
+    """Fold backup volumes (storage content rows) into {key(vmid): BackupStats}."""
+    summary = {} if into is None else into
+    for vol in volumes:
+        vmid = vol.get("vmid")
+        if vmid is None:
+            continue
+        stats = summary.get(key(vmid))
+        if stats is None:
+            stats = summary[key(vmid)] = BackupStats()
+        stats.add(vol.get("ctime", 0), vol.get("size", 0))
+    return summary
+
+
+def growth_per_day(rows):
+    # Steigung der Ausgleichsgeraden über "used", in Bytes pro Tag
+    points = [(r["time"], r["used"]) for r in rows if r.get("used") is not None]
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_u = sum(u for _, u in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    if not var:
+        return None
+    return sum((t - mean_t) * (u - mean_u) for t, u in points) / var * DAY
+
+
+def pool_row(res, growth=None):
+    """One storage pool from cluster/resources, plus growth and time to full."""
+    used = res.get("disk", 0)
+    total = res.get("maxdisk", 0)
+    free = max(total - used, 0)
+    full_in = free / growth * DAY if growth and growth > 0 else None
+    return {
+        "storage": res["storage"],
+        "node": None if res.get("shared") else res["node"],
+        "type": res.get("plugintype", "-"),
+        "status": res.get("status", "unknown"),
+        "content": res.get("content", ""),
+        "used": used,
+        "total": total,
+        "free": free,
+        "usage": used / total * 100 if total else 0,
+        "growth": growth,
+        "full_in": full_in,
+    }
+
+
+class StorageReport:
+    """Pools and per-guest backup summaries of one :storage fetch; `errors`
+    lists the storages whose content or RRD data could not be read."""
+
+    __slots__ = ("pools", "backups", "errors", "fetched")
+
+    def __init__(self, pools=None, backups=None, errors=None):
+        self.pools = pools or []
+        self.backups = backups or {}
+        self.errors = errors or []
+        self.fetched = time.time()
@@ -0,0 +1,199 @@
+import threading
+import time
+from concurrency import fan_out
+
+
+class TaskFailed(Exception):
+    pass
+
+
+def upid_node(upid):
+    # UPID:<node>:<pid>:<pstart>:<starttime>:<type>:<id>:<user>:
+    return upid.split(":")[1]
+
+
+class _Pending:
+    def __init__(self, upid, delay):
+        self.upid = upid
+        self.node = upid_node(upid)
+        self.delay = delay
+        self.next_poll = time.monotonic() + delay
+        self.errors = 0
+        self.status = None
+        self.error = None
+        self.waiters = 0
+        self.done = threading.Event()
+
+
+class TaskWaiter:
+    """Waits for Proxmox tasks by UPID via nodes/{node}/tasks/{upid}/status.
+
+    All waits share one polling thread; each task is polled with its own
+    adaptive backoff (fast first polls, slower later), and the polls that
+    are due in one tick run concurrently.
+    """
+
+    def __init__(self, proxmox, max_workers=8, first_delay=0.2, max_delay=5.0, factor=1.6, max_errors=5):
+        self.proxmox = proxmox
+        self.max_workers = max_workers
+        self.first_delay = first_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.max_errors = max_errors
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, upid):
+        with self._cond:
+            pending = self._pending.get(upid)
+            if pending is None:
+                pending = self._pending[upid] = _Pending(upid, self.first_delay)
+            pending.waiters += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return pending
+
+    def wait(self, upid, timeout=None):
+        """Block until the task has stopped; returns its exitstatus."""
+        if not upid:
+            return None
+        pending = self.submit(upid)
+        try:
+            return self._collect(pending, timeout)
+        finally:
+            self._release(pending)
+
+    def wait_all(self, upids, timeout=None):
+        """Wait for several tasks at once; returns {upid: exitstatus or exception}."""
+        handles = [self.submit(upid) for upid in upids]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results = {}
+        try:
+            for pending in handles:
+                remaining = None if deadline is None else max(0, deadline - time.monotonic())
+                try:
+                    results[pending.upid] = self._collect(pending, remaining)
+                except Exception as e:
+                    results[pending.upid] = e
+        finally:
+            for pending in handles:
+                self._release(pending)
+        return results
+
+    def _release(self, pending):
+        # Nach einem Timeout nicht weiter pollen, sofern niemand sonst wartet
+        with self._cond:
+            pending.waiters -= 1
+            if pending.waiters <= 0 and self._pending.get(pending.upid) is pending:
+                del self._pending[pending.upid]
+
+    def _collect(self, pending, timeout):
+        if not pending.done.wait(timeout):
+            raise TimeoutError(f"Task {pending.upid} still running after {timeout}s")
+        if pending.error:
+            raise pending.error
+        exitstatus = pending.status.get("exitstatus", "")
+        if exitstatus != "OK" and not exitstatus.startswith("WARNINGS"):
+            raise TaskFailed(f"{pending.status.get('type', 'task')} failed: {exitstatus}")
+        return exitstatus
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._pending:
+                    # Thread endet, submit() startet bei Bedarf einen neuen
+                    self._thread = None
+                    return
+                now = time.monotonic()
+                due = [p for p in self._pending.values() if p.next_poll <= now]
+                if not due:
+                    self._cond.wait(min(p.next_poll for p in self._pending.values()) - now)
+                    continue
+
+            results = fan_out(
+                {p.upid: self.proxmox.nodes(p.node).tasks(p.upid).status.get for p in due},
+                self.max_workers
+            )
+
+            with self._cond:
+                now = time.monotonic()
+                for p in due:
+                    res = results[p.upid]
+                    if isinstance(res, Exception):
+                        p.errors += 1
+                        if p.errors >= self.max_errors:
+                            p.error = res
+                    elif res.get("status") == "stopped":
+                        p.status = res
+                    if p.status is not None or p.error is not None:
+                        del self._pending[p.upid]
+                        p.done.set()
+                    else:
+                        p.delay = min(p.delay * self.factor, self.max_delay)
+                        p.next_poll = now + p.delay
+
+
+class TaskFollower:
+    """Incrementally lists new tasks of one node (nodes/{node}/tasks with
+    `since`) or of the whole cluster (cluster/tasks, one request)."""
+
+    def __init__(self, proxmox, node=None, limit=50):
+        self.proxmox = proxmox
+        self.node = node
+        self.limit = limit
+        self.last_start = 0
+        self.seen = set()
+
+    def poll(self):
+        if self.node:
+            params = {"limit": self.limit, "source": "all"}
+            if self.last_start:
+                params["since"] = self.last_start
+            rows = self.proxmox.nodes(self.node).tasks.get(**params)
+        else:
+            rows = self.proxmox.cluster.tasks.get()
+
+        new = []
+        for task in rows:
+            start = int(task.get("starttime", 0))
+            if start < self.last_start or (start == self.last_start and task["upid"] in self.seen):
+                continue
+            new.append(task)
+        new.sort(key=lambda t: int(t.get("starttime", 0)))
+
+        if new:
+            newest = int(new[-1].get("starttime", 0))
+            if newest > self.last_start:
+                self.last_start = newest
+                self.seen = set()
+            # nur UPIDs mit der jüngsten Startzeit merken
+            self.seen.update(t["upid"] for t in new if int(t.get("starttime", 0)) == self.last_start)
+        return new
+
+
+class LogTail:
+    """Tails nodes/{node}/tasks/{upid}/log using the `start` offset."""
+
+    def __init__(self, proxmox, upid, chunk=500):
+        self.task = proxmox.nodes(upid_node(upid)).tasks(upid)
+        self.upid = upid
+        self.chunk = chunk
+        self.offset = 0
+
+    def poll(self):
+        lines = []
+        while True:
+            rows = self.task.log.get(start=self.offset, limit=self.chunk)
+            rows = [r for r in rows if r.get("n", 0) > self.offset]
+            if not rows:
+                return lines
+            lines.extend(r.get("t", "") for r in rows)
+            self.offset = rows[-1]["n"]
+            if len(rows) < self.chunk:
+                return lines
+
+    def finished(self):
+        return self.task.status.get().get("status") == "stopped"
@@ -0,0 +1,60 @@
+import asyncio
+import time
+import pytest
+from async_model import AsyncProxmoxManager
+from fakeprox import FakeProxmox, FakeCluster
+from session import TicketCache
+
+
+@pytest.fixture
+def fake():
+    with FakeProxmox(FakeCluster(nodes=2, guests=6, tasks_per_node=2, task_duration=0.05)) as server:
+        yield server
+
+
+def manager(fake, tmp_path, password=None):
+    pm = AsyncProxmoxManager({"servers": [fake.server_config(password=password)]})
+    pm.tickets = TicketCache(str(tmp_path / "tickets.json"))
+    return pm
+
+
+def run(pm, coro_fn):
+    async def main():
+        async with pm:
+            return await coro_fn()
+    return asyncio.run(main())
+
+
+def test_fetch_vms(fake, tmp_path):
+    pm = manager(fake, tmp_path)
+    vms = run(pm, pm.fetch_vms)
+    assert sorted(vm["vmid"] for vm in vms) == list(range(100, 106))
+    lxc = run(pm, lambda: pm.fetch_vms(vm_type="lxc"))
+    assert {vm["type"] for vm in lxc} == {"lxc"}
+
+
+def test_fetch_nodes(fake, tmp_path):
+    fake.cluster.offline.add("pve2")
+    pm = manager(fake, tmp_path)
+    rows = {row["node"]: row for row in run(pm, pm.fetch_nodes)}
+    assert set(rows) == {"pve1", "pve2"}
+    assert rows["pve1"]["status"] == "online"
+    assert rows["pve2"]["status"] == "offline"
+
+
+def test_perform_waits_for_task(fake, tmp_path):
+    pm = manager(fake, tmp_path)
+    vm = next(vm for vm in fake.cluster.guests.values() if vm["status"] == "running")
+    assert run(pm, lambda: pm.perform(dict(vm), "stop")) == "OK"
+    assert fake.cluster.guests[vm["vmid"]]["status"] == "stopped"
+
+
+def test_relogin_on_401(fake, tmp_path):
+    pm = manager(fake, tmp_path, password="secret")
+    # Ticket aus dem Cache, das der Server nicht mehr kennt
+    pm.tickets.put(pm.key, {"ticket": "PVE:root@pam:OLD", "csrf": "OLD", "created": time.time()})
+    fake.revoked.add("PVE:root@pam:OLD")
+    vms = run(pm, pm.fetch_vms)
+    assert len(vms) == 6
+    assert fake.logins == 1
+    assert pm.tickets.get(pm.key)["ticket"] == "PVE:root@pam:FAKE1"
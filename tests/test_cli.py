@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import pytest
+from cli import build_parser
+from fakeprox import FakeProxmox, FakeCluster
+
+PROX = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prox.py")
+
+
+@pytest.fixture
+def home(tmp_path):
+    with FakeProxmox(FakeCluster(nodes=2, guests=6, tasks_per_node=2)) as fake:
+        config = tmp_path / ".config" / "proxmon"
+        config.mkdir(parents=True)
+        (config / "config.json").write_text(json.dumps({"servers": [fake.server_config("a")]}))
+        yield tmp_path
+
+
+def prox(home, *args):
+    return subprocess.run([sys.executable, PROX, *args], env={**os.environ, "HOME": str(home)},
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_options_before_and_after_subcommand():
+    parser = build_parser()
+    assert parser.parse_args(["--format", "csv", "vms"]).format == "csv"
+    args = parser.parse_args(["vms", "--server", "a", "--format", "ndjson"])
+    assert (args.server, args.format, args.all) == ("a", "ndjson", False)
+    args = parser.parse_args(["--server", "a", "tasks", "pve1", "--trace", "t.json"])
+    assert (args.server, args.trace, args.format) == ("a", "t.json", "json")
+
+
+def test_vms_with_options_after_subcommand(home):
+    res = prox(home, "vms", "--server", "a", "--format", "csv")
+    assert res.returncode == 0, res.stderr
+    rows = list(csv.DictReader(io.StringIO(res.stdout)))
+    assert sorted(int(row["vmid"]) for row in rows) == list(range(100, 106))
+
+    res = prox(home, "nodes", "--format", "ndjson")
+    assert res.returncode == 0, res.stderr
+    assert sorted(json.loads(line)["node"] for line in res.stdout.splitlines()) == ["pve1", "pve2"]
+
+
+def test_tasks_unknown_node(home):
+    assert prox(home, "tasks", "nosuch", "--format", "json").returncode == 4
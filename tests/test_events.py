@@ -0,0 +1,42 @@
+from events import DiffEngine
+
+GB = 1024 ** 3
+
+
+def vm(vmid, **kw):
+    return {"vmid": vmid, "name": f"vm{vmid}", "status": "running", "node": "pve1", "cpu": 0.1, "disk": GB, **kw}
+
+
+def kinds(events):
+    return sorted((e.kind, e.key[1]) for e in events)
+
+
+def test_first_diff_is_baseline():
+    assert DiffEngine().diff([vm(100)]) == []
+
+
+def test_changes():
+    engine = DiffEngine(cpu_threshold=90)
+    engine.diff([vm(100), vm(101), vm(102), vm(103)])
+    events = engine.diff([
+        vm(100, status="stopped"),
+        vm(101, node="pve2"),
+        vm(102, cpu=0.95, disk=3 * GB),
+        vm(104),
+    ])
+    assert kinds(events) == [("added", 104), ("cpu_high", 102), ("disk_grew", 102), ("migrated", 101),
+                             ("removed", 103), ("stopped", 100)]
+
+
+def test_unchanged_and_cpu_back_to_normal():
+    engine = DiffEngine()
+    engine.diff([vm(100, cpu=0.95)])
+    assert kinds(engine.diff([vm(100, cpu=0.5)])) == [("cpu_normal", 100)]
+    assert engine.diff([vm(100, cpu=0.5)]) == []
+
+
+def test_keys_include_cluster():
+    engine = DiffEngine()
+    engine.diff([vm(100, cluster="a")])
+    events = engine.diff([vm(100, cluster="b")])
+    assert sorted((e.kind, e.key) for e in events) == [("added", ("b", 100)), ("removed", ("a", 100))]
@@ -0,0 +1,60 @@
+import pytest
+from guestconfig import ConfigStore, flatten
+from query import QueryError
+
+
+def test_flatten():
+    pairs = set(flatten({
+        "cores": 4,
+        "net0": "virtio=BC:24:11:AA:BB:CC,bridge=vmbr0,tag=20",
+        "scsi0": "local-lvm:vm-100-disk-0,size=32G",
+        "digest": "abc",
+    }))
+    assert {("cores", "4"), ("net0.bridge", "vmbr0"), ("net.bridge", "vmbr0"), ("net.tag", "20"),
+            ("net.model", "virtio"), ("net.hwaddr", "BC:24:11:AA:BB:CC"),
+            ("scsi.volume", "local-lvm:vm-100-disk-0"), ("scsi0.size", "32G")} <= pairs
+    assert not any(field == "digest" for field, _ in pairs)
+
+
+@pytest.fixture
+def store():
+    store = ConfigStore()
+    configs = {
+        100: {"cores": 4, "memory": 4096, "net0": "virtio=BC:24:11:00:00:01,bridge=vmbr0",
+              "net1": "virtio=BC:24:11:00:00:02,bridge=vmbr2", "scsi0": "local-lvm:vm-100-disk-0,size=32G"},
+        101: {"cores": 16, "memory": 8192, "net0": "virtio=BC:24:11:00:00:03,bridge=vmbr0",
+              "scsi0": "ceph:vm-101-disk-0,size=1T"},
+        102: {"cores": 1, "memory": 512, "rootfs": "local-lvm:subvol-102-disk-0,size=8G"},
+    }
+    for vmid, config in configs.items():
+        store.put({"vmid": vmid, "node": "pve1", "type": "qemu"}, config)
+    return store
+
+
+def test_find(store):
+    assert store.find("bridge=vmbr2") == {"100"}
+    assert store.find("bridge=vmbr0 cores>8") == {"101"}
+    assert store.find("scsi0.size>100") == {"101"}
+    assert store.find("scsi.volume=local-lvm:*") == {"100"}
+    assert store.find("cores>=1 memory<1024") == {"102"}
+
+
+def test_find_not_equal_on_multi_valued_field(store):
+    # 100 hat vmbr0 und vmbr2, 102 gar kein Netz
+    assert store.find("bridge!=vmbr2") == {"101", "102"}
+
+
+def test_find_errors(store):
+    with pytest.raises(QueryError):
+        store.find("cores>many")
+    with pytest.raises(QueryError):
+        store.find("vmbr0")
+
+
+def test_stale_and_prune(store):
+    vms = [{"vmid": 100, "node": "pve1", "type": "qemu"}, {"vmid": 101, "node": "pve2", "type": "qemu"},
+           {"vmid": 103, "node": "pve1", "type": "qemu"}]
+    assert [vm["vmid"] for vm in store.stale(vms)] == [101, 103]
+    store.prune(vms)
+    assert len(store) == 2
+    assert store.find("cores=1") == set()
@@ -0,0 +1,70 @@
+import pytest
+from inventory import VMInventory, split_target, vm_key
+from query import QueryError
+
+VMS = [
+    {"vmid": 100, "name": "web-1", "node": "pve1", "status": "running", "type": "qemu", "tags": "web"},
+    {"vmid": 101, "name": "web-2", "node": "pve2", "status": "stopped", "type": "qemu", "tags": "web"},
+    {"vmid": 102, "name": "db-1", "node": "pve1", "status": "running", "type": "lxc", "tags": "db"},
+    {"vmid": 100, "name": "web-1", "node": "pve1", "status": "running", "type": "qemu", "cluster": "b"},
+]
+
+
+def keys(vms):
+    return sorted((vm.get("cluster") or "", vm["vmid"]) for vm in vms)
+
+
+def test_split_target_and_vm_key():
+    assert split_target("b/100") == ("b", "100")
+    assert split_target(" 100 ") == (None, "100")
+    assert vm_key(VMS[0]) == "100"
+    assert vm_key(VMS[3]) == "b/100"
+
+
+def test_matches_by_id_and_cluster():
+    inv = VMInventory(VMS)
+    assert keys(inv.matches("100")) == [("", 100), ("b", 100)]
+    assert keys(inv.matches("b/100")) == [("b", 100)]
+    assert inv.matches("b/101") == []
+    # mehrdeutig ohne Cluster
+    assert inv.get("100") is None
+    assert inv.get("101")["name"] == "web-2"
+
+
+def test_lookup_names_globs_and_tags():
+    inv = VMInventory(VMS[:3])
+    assert keys(inv.lookup("db-1")) == [("", 102)]
+    assert keys(inv.lookup("web-*")) == [("", 100), ("", 101)]
+    assert keys(inv.lookup("tag:web")) == [("", 100), ("", 101)]
+    assert inv.lookup("nosuch") == []
+
+
+def test_select_ids_ranges_names_and_tags():
+    inv = VMInventory(VMS[:3])
+    assert keys(inv.select("100-101")[0]) == [("", 100), ("", 101)]
+    assert keys(inv.select("db-1 tag:web")[0]) == [("", 100), ("", 101), ("", 102)]
+    assert keys(inv.select("web-*,102")[0]) == [("", 100), ("", 101), ("", 102)]
+
+
+def test_select_misses_and_duplicates():
+    inv = VMInventory(VMS[:3])
+    vms, misses = inv.select("100 100 web-1 nosuch")
+    assert keys(vms) == [("", 100)]
+    assert misses == ["nosuch"]
+
+
+def test_select_clusters():
+    inv = VMInventory(VMS)
+    assert keys(inv.select("100")[0]) == [("", 100), ("b", 100)]
+    assert keys(inv.select("b/100")[0]) == [("b", 100)]
+
+
+def test_select_conditions_narrow():
+    inv = VMInventory(VMS[:3])
+    assert keys(inv.select("100-102 status=running")[0]) == [("", 100), ("", 102)]
+    assert keys(inv.select("node=pve1 type=lxc")[0]) == [("", 102)]
+
+
+def test_select_bad_condition():
+    with pytest.raises(QueryError):
+        VMInventory(VMS).select("cpu>lots")
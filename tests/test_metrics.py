@@ -0,0 +1,30 @@
+from inventory import VMInventory
+from metrics import MetricsStore, metric_key
+
+VMS = [{"vmid": 100, "cpu": 0.5, "mem": 1, "maxmem": 4}, {"vmid": 100, "cluster": "b", "cpu": 0.1, "mem": 2, "maxmem": 4}]
+
+
+def test_rrd_history_survives_refresh():
+    store = MetricsStore(capacity=10)
+    for vm in VMS:
+        store.load_rrd(metric_key(vm), [{"time": t, "cpu": 0.2, "mem": 1, "maxmem": 2} for t in range(1, 6)])
+    store.load_rrd(metric_key({"node": "pve1"}), [{"time": 1, "cpu": 0.3, "memused": 1, "memtotal": 2}])
+
+    # wie ProxmonController._set_inventory
+    inventory = VMInventory(VMS)
+    for vm in inventory:
+        store.add_sample(vm)
+    store.prune(inventory)
+
+    assert store.get(VMS[0]).cpu.count == 6
+    assert store.get(VMS[1]).cpu.count == 6
+    assert store.get({"node": "pve1"}) is not None
+
+
+def test_prune_drops_removed_guests():
+    store = MetricsStore()
+    for vm in VMS:
+        store.add_sample(vm)
+    store.prune(VMInventory(VMS[:1]))
+    assert store.get(VMS[0]) is not None
+    assert store.get(VMS[1]) is None
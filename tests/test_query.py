@@ -0,0 +1,58 @@
+import pytest
+from query import GB, Query, QueryError, compile_filter, parse_sort, top_vms
+
+VMS = [
+    {"vmid": 100, "name": "web-1", "node": "pve1", "status": "running", "type": "qemu", "cpu": 0.8,
+     "mem": 4 * GB, "tags": "web;prod"},
+    {"vmid": 101, "name": "web-2", "node": "pve2", "status": "running", "type": "qemu", "cpu": 0.2,
+     "mem": 2 * GB, "tags": "web"},
+    {"vmid": 102, "name": "db-1", "node": "pve1", "status": "stopped", "type": "lxc", "cpu": 0,
+     "mem": 0, "tags": "db;prod"},
+]
+
+
+def ids(vms):
+    return [vm["vmid"] for vm in vms]
+
+
+def test_filter_combines_conditions():
+    pred = compile_filter("node=pve1 status=running")
+    assert ids(filter(pred, VMS)) == [100]
+
+
+def test_filter_units_and_globs():
+    assert ids(filter(compile_filter("cpu>50"), VMS)) == [100]
+    assert ids(filter(compile_filter("mem>=2"), VMS)) == [100, 101]
+    assert ids(filter(compile_filter("name=web-*"), VMS)) == [100, 101]
+    assert ids(filter(compile_filter("tag=prod"), VMS)) == [100, 102]
+    assert ids(filter(compile_filter("tags!=web"), VMS)) == [102]
+
+
+@pytest.mark.parametrize("text", ["bogus=1", "cpu>high", "tags>1", "nocondition"])
+def test_filter_errors(text):
+    with pytest.raises(QueryError):
+        compile_filter(text)
+
+
+def test_top_with_mixed_directions():
+    keys = parse_sort("node,-cpu")
+    assert ids(top_vms(VMS, 2, keys)) == [100, 102]
+    assert ids(top_vms(VMS, 1, parse_sort("-mem"))) == [100]
+
+
+def test_query_narrow_and_apply():
+    query = Query()
+    query.set_filter("node=pve1 type=qemu cpu>10")
+    assert query.narrow() == {"node": "pve1", "vm_type": "qemu"}
+    query.set_filter("node=pve*")
+    assert query.narrow() == {}
+    query.set_top(1)
+    assert ids(query.apply(VMS)) == [100]
+    assert query.describe() == "filter node=pve*, sort -cpu, top 1"
+
+
+def test_top_after_sort_is_cleared():
+    query = Query()
+    query.set_top(2)
+    query.set_sort("")
+    assert ids(query.apply(VMS)) == [100, 101]
@@ -0,0 +1,41 @@
+from rolling import PHASES, RollingUpdate
+
+
+class StubManager:
+    def __init__(self):
+        self.states = {"pve1": {"status": "online", "uptime": 1000, "mem": 1, "maxmem": 4},
+                       "pve2": {"status": "online", "uptime": 1000, "mem": 2, "maxmem": 4}}
+        self.vms = [{"vmid": 100, "node": "pve1", "status": "running", "type": "qemu"}]
+        self.calls = []
+
+    def node_states(self):
+        return {node: dict(state) for node, state in self.states.items()}
+
+    def fetch_vms(self):
+        return self.vms
+
+    def migrate(self, vm, target):
+        self.calls.append(("migrate", vm["vmid"], target))
+
+    def apt_update(self, node):
+        self.calls.append(("apt_update", node))
+
+    def upgradable(self, node):
+        return [{"Package": "pve-manager"}, {"Package": "proxmox-kernel"}]
+
+    def reboot_node(self, node):
+        self.calls.append(("reboot", node))
+        self.states[node]["uptime"] = 5
+
+
+def test_refresh_reports_packages_that_were_not_installed():
+    pm = StubManager()
+    seen = []
+    [report] = RollingUpdate(pm, ["pve1"], poll_interval=0.01,
+                             on_progress=lambda *args: seen.append(args)).run()
+    assert report.error is None
+    assert set(report.phases) == set(PHASES)
+    assert report.pending == 2
+    assert ("pve1", "refresh", "2 package(s) upgradable, not installed") in seen
+    assert pm.calls == [("migrate", 100, "pve2"), ("apt_update", "pve1"), ("reboot", "pve1"),
+                        ("migrate", 100, "pve1")]
@@ -0,0 +1,43 @@
+import time
+from scheduler import CircuitBreaker
+
+
+def test_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    breaker.failure()
+    breaker.failure()
+    assert breaker.allow()
+    breaker.failure()
+    assert not breaker.allow()
+    assert 29 < breaker.remaining() <= 30
+
+
+def test_success_resets_failures():
+    breaker = CircuitBreaker(threshold=2)
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+    assert breaker.allow()
+
+
+def test_single_probe_after_cooldown():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.05)
+    breaker.failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    # nur ein Probe-Request, bis er antwortet
+    assert not breaker.allow()
+    breaker.success()
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(threshold=3, cooldown=0.05)
+    for _ in range(3):
+        breaker.failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.failure()
+    assert not breaker.allow()
+    assert breaker.remaining() > 0
@@ -0,0 +1,40 @@
+import json
+import pytest
+from storage import BackupStats, growth_per_day, iter_json_data, summarize_backups
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 4096])
+def test_iter_json_data_across_chunks(size):
+    items = [{"volid": f"pbs:backup/vm/{i}", "notes": "grüße [x], {y}", "size": i} for i in range(20)]
+    body = json.dumps({"data": items}, ensure_ascii=False).encode()
+    assert list(iter_json_data(chunked(body, size))) == items
+
+
+def test_iter_json_data_empty_and_truncated():
+    assert list(iter_json_data([b'{"data": []}'])) == []
+    with pytest.raises(ValueError):
+        list(iter_json_data([b'{"data": [{"a": 1}, {"a"']))
+
+
+def test_summarize_backups():
+    volumes = [{"vmid": 100, "ctime": 10, "size": 5}, {"vmid": 100, "ctime": 30, "size": 7},
+               {"vmid": 101, "ctime": 20, "size": 1}, {"volid": "iso"}]
+    summary = summarize_backups(volumes)
+    assert set(summary) == {"100", "101"}
+    assert (summary["100"].count, summary["100"].size, summary["100"].first, summary["100"].last) == (2, 12, 10, 30)
+
+    other = BackupStats()
+    other.add(5, 1)
+    summary["100"].merge(other)
+    assert (summary["100"].count, summary["100"].first, summary["100"].last) == (3, 5, 30)
+    assert summary["100"].age(now=100) == 70
+
+
+def test_growth_per_day():
+    rows = [{"time": t * 3600, "used": 1000 + t * 10} for t in range(24)]
+    assert growth_per_day(rows) == pytest.approx(240)
+    assert growth_per_day(rows[:1]) is None
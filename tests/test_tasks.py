@@ -0,0 +1,57 @@
+import pytest
+
+from tasks import TaskWaiter
+
+UPID = "UPID:pve1:0000ABCD:00000001:00000001:vzdump:100:root@pam:"
+OTHER = "UPID:pve1:0000ABCE:00000001:00000001:qmstart:101:root@pam:"
+
+
+class _Status:
+    def __init__(self, api, upid):
+        self.api = api
+        self.upid = upid
+
+    def get(self):
+        self.api.polls.append(self.upid)
+        if self.upid in self.api.stopped:
+            return {"status": "stopped", "exitstatus": "OK", "type": "qmstart"}
+        return {"status": "running"}
+
+
+class _Task:
+    def __init__(self, api, upid):
+        self.status = _Status(api, upid)
+
+
+class _Node:
+    def __init__(self, api):
+        self.api = api
+
+    def tasks(self, upid):
+        return _Task(self.api, upid)
+
+
+class StubApi:
+    """Tasks laufen ewig, ausser sie stehen in `stopped`."""
+
+    def __init__(self, stopped=()):
+        self.stopped = set(stopped)
+        self.polls = []
+
+    def nodes(self, node):
+        return _Node(self)
+
+
+def test_timed_out_wait_is_no_longer_polled():
+    waiter = TaskWaiter(StubApi(), first_delay=0.01, max_delay=0.01)
+    with pytest.raises(TimeoutError):
+        waiter.wait(UPID, timeout=0.05)
+    assert waiter._pending == {}
+
+
+def test_wait_all_drops_timed_out_tasks():
+    waiter = TaskWaiter(StubApi(stopped=[OTHER]), first_delay=0.01, max_delay=0.01)
+    results = waiter.wait_all([UPID, OTHER], timeout=0.1)
+    assert isinstance(results[UPID], TimeoutError)
+    assert results[OTHER] == "OK"
+    assert waiter._pending == {}
@@ -0,0 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+import view
+
+
+def guests(start, count):
+    return [{"vmid": start + i, "name": f"vm{i}", "type": "qemu", "node": "pve1", "status": "running",
+             "uptime": 60, "cpu": 0.1, "mem": 1, "maxmem": 2, "disk": 1, "maxdisk": 2} for i in range(count)]
+
+
+def test_row_cache_shared_between_threads():
+    # wie :watch (eigener Thread) und Hauptthread: wechselnde Inventare, Cache wird dabei gekürzt
+    def build(i):
+        vms = guests(100 + (i % 5) * 300, 300)
+        return view.build_vm_table(vms, True, {}).row_count
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert set(pool.map(build, range(40))) == {300}
+    assert len(view._row_cache) <= 2 * 300 + 300
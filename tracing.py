@@ -0,0 +1,177 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+# Obergrenzen der Latenz-Buckets in ms, der letzte fängt den Rest
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+_SEGMENTS = [
+    (re.compile(r"^(nodes)/([^/]+)"), r"\1/{node}"),
+    (re.compile(r"/(qemu|lxc)/\d+"), r"/\1/{vmid}"),
+    (re.compile(r"/tasks/UPID:[^/]+"), "/tasks/{upid}"),
+    (re.compile(r"/storage/[^/]+"), "/storage/{storage}"),
+]
+_NODE = re.compile(r"^nodes/([^/]+)")
+
+
+@lru_cache(maxsize=4096)
+def endpoint_template(path):
+    """nodes/pve1/qemu/101/status/start -> (nodes/{node}/qemu/{vmid}/status/start, pve1)."""
+    path = path.split("?", 1)[0].strip("/")
+    if "/api2/json/" in path:
+        path = path.split("/api2/json/", 1)[1]
+    m = _NODE.match(path)
+    for pattern, repl in _SEGMENTS:
+        path = pattern.sub(repl, path)
+    return path, (m.group(1) if m else None)
+
+
+class EndpointStats:
+    __slots__ = ("calls", "errors", "retries", "total_ms", "max_ms", "bytes", "buckets", "last_error")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.bytes = 0
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.last_error = None
+
+    def percentile(self, q):
+        # obere Bucket-Grenze, in der das Quantil liegt
+        if not self.calls:
+            return 0.0
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+class Tracer:
+    """Per (server, method, endpoint template, node) latency histograms,
+    payload sizes, retries and errors, plus the most recent spans for a
+    Chrome trace. Recording is one lock and a few integer updates."""
+
+    def __init__(self, keep_spans=5000):
+        self.enabled = True
+        self.stats = {}
+        self.spans = deque(maxlen=keep_spans)
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, server, method, path, start, status=None, size=0, retries=0, error=None):
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - start
+        ms = elapsed * 1000
+        template, node = endpoint_template(path)
+        key = (server, method, template, node)
+        failed = error is not None or (status is not None and status >= 400)
+        with self._lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = EndpointStats()
+            stats.calls += 1
+            stats.total_ms += ms
+            stats.max_ms = max(stats.max_ms, ms)
+            stats.bytes += size
+            stats.retries += retries
+            if failed:
+                stats.errors += 1
+                stats.last_error = error or f"HTTP {status}"
+            for i, bound in enumerate(BUCKETS_MS):
+                if ms <= bound:
+                    stats.buckets[i] += 1
+                    break
+            self.spans.append((time.time() - elapsed, elapsed, threading.get_ident(), server, method,
+                               template, node, status, error))
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.spans.clear()
+            self.started = time.time()
+
+    def rows(self):
+        """[(server, method, template, node, EndpointStats)], slowest total first."""
+        with self._lock:
+            items = list(self.stats.items())
+        items.sort(key=lambda kv: -kv[1].total_ms)
+        return [(*key, stats) for key, stats in items]
+
+    def to_json(self):
+        return {
+            "since": self.started,
+            "buckets_ms": [b if b != float("inf") else None for b in BUCKETS_MS],
+            "endpoints": [{
+                "server": server, "method": method, "endpoint": template, "node": node,
+                "calls": s.calls, "errors": s.errors, "retries": s.retries, "bytes": s.bytes,
+                "avg_ms": round(s.total_ms / s.calls, 2) if s.calls else 0, "max_ms": round(s.max_ms, 2),
+                "p50_ms": round(s.percentile(0.5), 2), "p95_ms": round(s.percentile(0.95), 2),
+                "p99_ms": round(s.percentile(0.99), 2),
+                "buckets": s.buckets, "last_error": s.last_error,
+            } for server, method, template, node, s in self.rows()],
+        }
+
+    def to_chrome_trace(self):
+        # chrome://tracing bzw. Perfetto: ein "X"-Event pro Request, ein Track pro Thread
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for start, elapsed, tid, server, method, template, node, status, error in spans:
+            events.append({
+                "name": f"{method} {template}", "cat": server or "api", "ph": "X",
+                "ts": int(start * 1e6), "dur": int(elapsed * 1e6), "pid": os.getpid(), "tid": tid,
+                "args": {"node": node, "status": status, "error": error},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path, fmt="json"):
+        data = self.to_chrome_trace() if fmt == "chrome" else self.to_json()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+
+TRACER = Tracer()
+
+
+def traced(request, server, tracer=TRACER):
+    """Wrap a requests-style `request(method, url, ...)` so every call is recorded.
+
+    Retries below it (the RequestScheduler sets `retries` on the response
+    or the exception) count as retries of one call, and its latency is the
+    one the caller sees, backoff included.
+    """
+
+    def call(method, url, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = request(method, url, *args, **kwargs)
+        except Exception as e:
+            tracer.record(server, method, url, start, retries=getattr(e, "retries", 0), error=type(e).__name__)
+            raise
+        # gestreamte Antworten nicht hier schon einlesen
+        size = int(resp.headers.get("Content-Length") or 0) if kwargs.get("stream") else len(resp.content)
+        # der 401-Retry aus TicketAuth markiert den wiederholten Request
+        retries = getattr(resp, "retries", 0) + getattr(resp.request, "_relogged", False)
+        tracer.record(server, method, url, start, resp.status_code, size, retries)
+        return resp
+
+    return call
+
+
+def instrument(session, server, tracer=TRACER):
+    """Wrap a requests session so every API call is recorded."""
+    session.request = traced(session.request, server, tracer)
+    return session
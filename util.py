@@ -6,7 +6,11 @@ def ensure_config_dir():
     os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
 
 def clear_screen():
-    os.system("cls" if os.name == "nt" else "clear")
+    if os.name == "nt":
+        os.system("cls")
+    else:
+        # ANSI-Sequenz statt eines `clear`-Prozesses pro Refresh
+        print("\033[H\033[2J\033[3J", end="", flush=True)
     
 def format_uptime(seconds):
     if seconds == 0:
@@ -1,8 +1,11 @@
+import threading
 from rich.console import Console
 from rich.table import Table
 from rich import box
 from rich.text import Text
+from rich.panel import Panel
 from util import format_uptime, format_unix_timestamp
+from metrics import sparkline
 
 console = Console()
 
@@ -16,86 +19,197 @@ def display_help():
     print("""
 :q                  → quit
 :r                  → refresh VM list
-:restart <ID>       → restart VM/LXC
+:restart <ID>       → restart VM/LXC (all-servers mode: <cluster>/<ID>)
 :start <ID>         → start VM/LXC
 :shutdown <ID>      → shutdown VM/LXC
 :stop <ID>          → stop VM/LXC
 :reset <ID>         → reset VM/LXC
 :hardreset <ID>     → stop + start
+                      <ID> may also be a name, a glob (web-*), tag:<tag>,
+                      a range (100-140), a list (101,102) or filters
+                      (node=pve3 status=running); several targets run in parallel
 :delete <ID>        → permanently delete VM/LXC
 :node-restart <NODE>→ reboot full Proxmox node
 :tasks <NODE>       → show recent tasks (limit from config)
+:tasks --follow [NODE] [UPID]
+                    → stream new tasks (cluster-wide without NODE) or tail a task log
 :settings           → open settings menu
 :nodes              → show node overview
+:watch              → live VM table (refresh every update_interval s)
+:ru <NODE>...|all [-n N]
+                    → rolling reboot: migrate guests away, refresh package lists,
+                      reboot, wait until online, migrate back; N nodes at a time.
+                      Installs no upgrades (the API has no call for it)
+:dns <NODE>         → set node DNS servers
+:info <ID>          → show the configuration of one guest
+:find <COND>...     → search all guest configs, e.g. :find bridge=vmbr2 cores>16
+                      (keys as in the config, sub-options as net0.bridge or net.bridge
+                      for any NIC; sizes like 32G compare in GB)
+:snapshot <SEL>... [--name NAME] [--vmstate]
+                    → snapshot guests (IDs, ranges, names, selectors), limited per
+                      node and per disk storage; default name proxmon_<date>
+:snapshot prune <AGE> <SEL>... [--all]
+                    → delete proxmon_* snapshots older than AGE (30m, 12h, 7d, 2w);
+                      --all: snapshots of any name
+:backup <SEL>... [--storage ID] [--mode snapshot|suspend|stop]
+                    → vzdump guests to a storage (default backup_storage), limited
+                      per node and per target storage
+:storage [all]      → storage usage, growth and time to full; guests whose last
+                      backup is older than backup_max_age_hours (all: every guest)
+:cache              → show API cache hits/misses per endpoint
+:stats              → API latency (p50/p95/max), errors, retries and payload size
+                      per endpoint and node; :stats reset clears the counters
+:stats json|chrome <FILE>
+                    → export the stats as JSON, or the recent calls as a Chrome
+                      trace (chrome://tracing, ui.perfetto.dev)
+:trend [hour|day]   → load RRD history, add CPU trend/peak/avg columns
+:next / :prev       → next/previous page of the VM table (page_size in config)
+:page <N>           → jump to page N
+:events             → show recent state changes (started, stopped, migrated, ...)
+:filter <COND>...    → show only matching guests, e.g. node=pve2 status=running cpu>50
+                      (= != > < >= <=, globs with = and !=; cpu in %, mem/disk in GB);
+                      an exact node= or type= also narrows the API query; :filter clears
+:sort <FIELD>...    → sort the table, e.g. :sort -mem or :sort node,-cpu; :sort clears
+:top <N> [FIELD]    → only the first N guests in sort order (default -cpu); :top clears
+:columns [COL,...]  → choose table columns (id type name status uptime cpu ram disk
+                      node tags), saved in the config; :columns default resets
 :?                  → show this help
 """)
 
-def display_vm_table(vms, use_color=False, config=None):
+def display_vm_table(vms, use_color=False, config=None, page=0, metrics=None, stale=None, caption=None):
+    console.print(build_vm_table(vms, use_color, config, page, config.get("page_size", 0), metrics, stale, caption))
+
+# Spalten der VM-Tabelle in der Reihenfolge von _vm_row; Auswahl per "vm_columns"
+VM_COLUMNS = {"id": "ID", "type": "Type", "name": "Name", "status": "Status", "uptime": "Uptime",
+              "cpu": "CPU%", "ram": "RAM (GB)", "disk": "Disk (GB)", "node": "Node", "tags": "Tags"}
+DEFAULT_VM_COLUMNS = ["id", "type", "name", "status", "uptime", "cpu", "ram", "disk", "node"]
+
+# Zeilen-Cache: (cluster, vmid) -> (Signatur, fertige Zellen); :watch baut aus einem
+# eigenen Thread, daher unter Lock
+_row_cache = {}
+_row_cache_lock = threading.Lock()
+
+def _load_style(value, y_thresh, r_thresh):
+    if value >= r_thresh:
+        return "bold red"
+    elif value >= y_thresh:
+        return "yellow"
+    return "green"
+
+def _trend_cells(series, use_color, y_thresh, r_thresh):
+    if series is None or not series.cpu.count:
+        return ["-", "-"]
+    avg = series.cpu.mean() * 100
+    peak = series.cpu.peak() * 100
+    trend = Text(sparkline(series.cpu.values()))
+    if use_color:
+        trend.stylize(_load_style(avg, y_thresh, r_thresh))
+    return [trend, f"{avg:.1f}/{peak:.1f}"]
+
+def _vm_row(vm, use_color, y_thresh, r_thresh, series=None):
+    vmid = str(vm["vmid"])
+    name = vm.get("name", "-")
+    vm_type = "LXC" if vm["type"] == "lxc" else "VM"
+    node = vm["node"]
+    status = vm["status"]
+
+    # Status mit Farbe
+    status_text = Text(status)
+    if use_color:
+        status_text.stylize("green" if status == "running" else "red")
+
+    # CPU % – mit Historie zählt der Durchschnitt, nicht ein einzelner Wert
+    cpu = round(vm.get("cpu", 0) * 100, 1)
+    cpu_text = Text(str(cpu))
+    if use_color:
+        level = series.cpu.mean() * 100 if series is not None and series.cpu.count else cpu
+        cpu_text.stylize(_load_style(level, y_thresh, r_thresh))
+
+    # RAM
+    mem_used = int(vm.get("mem", 0))
+    mem_total = int(vm.get("maxmem", 0)) or 1
+    mem_used_gb = round(mem_used / 1024 / 1024 / 1024, 1)
+    mem_total_gb = round(mem_total / 1024 / 1024 / 1024, 1)
+    ram_text = f"{mem_used_gb:.1f}/{mem_total_gb:.1f}"
+
+    # Disk
+    disk = round(int(vm.get("disk", 0)) / 1024 / 1024 / 1024, 1)
+
+    #Uptime
+    uptime = int(vm.get("uptime"))
+    uptime_text = format_uptime(uptime)
+
+    return [
+        vmid,
+        vm_type,
+        name,
+        status_text,
+        uptime_text,
+        cpu_text,
+        ram_text,
+        f"{disk:.1f}",
+        node,
+        vm.get("tags", "").replace(";", ", ")
+    ]
+
+def build_vm_table(vms, use_color=False, config=None, page=0, page_size=0, metrics=None, stale=None, caption=None):
     y_thresh = config.get("cpu_load_yellow", 80)
     r_thresh = config.get("cpu_load_red", 90)
 
-    table = Table(title="Proxmon VM Übersicht", box=box.SQUARE_DOUBLE_HEAD, expand=True)
+    title = "Proxmon VM Übersicht"
+    visible = vms
+    if page_size and len(vms) > page_size:
+        # nur die sichtbare Seite rendern
+        pages = -(-len(vms) // page_size)
+        page = max(0, min(page, pages - 1))
+        visible = vms[page * page_size:(page + 1) * page_size]
+        title += f" – Seite {page + 1}/{pages} ({len(vms)} Gäste)"
+    if stale:
+        # Daten aus dem Snapshot, Live-Abfrage läuft noch
+        title += f" – VERALTET (Stand {format_unix_timestamp(stale)}), aktualisiere..."
 
-    table.add_column("ID", style="bold")
-    table.add_column("Type")
-    table.add_column("Name")
-    table.add_column("Status")
-    table.add_column("Uptime")
-    table.add_column("CPU%")
-    table.add_column("RAM (GB)")
-    table.add_column("Disk (GB)")
-    table.add_column("Node")
-
-    for vm in vms:
-        vmid = str(vm["vmid"])
-        name = vm.get("name", "-")
-        vm_type = "LXC" if vm["type"] == "lxc" else "VM"
-        node = vm["node"]
-        status = vm["status"]
+    table = Table(title=title, box=box.SQUARE_DOUBLE_HEAD, expand=True, caption=caption,
+                  title_style="bold yellow" if stale else None)
+    multi = any("cluster" in vm for vm in visible)
+    order = list(VM_COLUMNS)
+    picked = [order.index(c) for c in config.get("vm_columns") or DEFAULT_VM_COLUMNS if c in VM_COLUMNS]
 
-        # Status mit Farbe
-        status_text = Text(status)
-        if use_color:
-            status_text.stylize("green" if status == "running" else "red")
+    if multi:
+        table.add_column("Cluster")
+    for i in picked:
+        table.add_column(VM_COLUMNS[order[i]], style="bold" if order[i] == "id" else None)
+    if metrics is not None:
+        table.add_column("CPU Trend")
+        table.add_column("CPU Ø/Peak")
 
-        # CPU %
-        cpu = round(vm.get("cpu", 0) * 100, 1)
-        cpu_text = Text(str(cpu))
-        if use_color:
-            if cpu >= r_thresh:
-                cpu_text.stylize("bold red")
-            elif cpu >= y_thresh:
-                cpu_text.stylize("yellow")
+    style = (use_color, y_thresh, r_thresh, metrics is not None)
+    with _row_cache_lock:
+        for vm in visible:
+            key = (vm.get("cluster"), vm["vmid"])
+            series = metrics.get(vm) if metrics is not None else None
+            # Uptime nur minutengenau, sonst ändert sich jede laufende Zeile
+            sig = (vm.get("name"), vm["type"], vm["node"], vm["status"], int(vm.get("uptime") or 0) // 60,
+                   vm.get("cpu", 0), vm.get("mem", 0), vm.get("maxmem", 0), vm.get("disk", 0), vm.get("tags"), style,
+                   series.version if series is not None else None)
+            cached = _row_cache.get(key)
+            if cached and cached[0] == sig:
+                row = cached[1]
             else:
-                cpu_text.stylize("green")
-
-        # RAM
-        mem_used = int(vm.get("mem", 0))
-        mem_total = int(vm.get("maxmem", 0)) or 1
-        mem_used_gb = round(mem_used / 1024 / 1024 / 1024, 1)
-        mem_total_gb = round(mem_total / 1024 / 1024 / 1024, 1)
-        ram_text = f"{mem_used_gb:.1f}/{mem_total_gb:.1f}"
-
-        # Disk
-        disk = round(int(vm.get("disk", 0)) / 1024 / 1024 / 1024, 1)
-        
-        #Uptime
-        uptime = int(vm.get("uptime"))
-        uptime_text = format_uptime(uptime)
+                row = _vm_row(vm, use_color, y_thresh, r_thresh, series)
+                if metrics is not None:
+                    row += _trend_cells(series, use_color, y_thresh, r_thresh)
+                _row_cache[key] = (sig, row)
+            cells = [row[i] for i in picked] + row[len(order):]
+            if multi:
+                cells.insert(0, vm.get("cluster", "-"))
+            table.add_row(*cells)
 
-        table.add_row(
-            vmid,
-            vm_type,
-            name,
-            status_text,
-            uptime_text,
-            cpu_text,
-            ram_text,
-            f"{disk:.1f}",
-            node
-        )
+        if len(_row_cache) > 2 * len(vms):
+            live = {(vm.get("cluster"), vm["vmid"]) for vm in vms}
+            for key in [k for k in _row_cache if k not in live]:
+                del _row_cache[key]
 
-    console.print(table)
+    return table
 
 def display_tasks(tasks):
     table = Table(title="Tasks", box=box.SQUARE_DOUBLE_HEAD, expand=True)
@@ -118,14 +232,39 @@ def display_tasks(tasks):
 
     console.print(table)
 
-def display_node_table(nodes, use_color=False):
+def print_task_line(task):
+    # eine Zeile pro neuem Task, fortlaufend angehängt
+    line = Text(format_unix_timestamp(task.get("starttime", 0)) + "  ")
+    if task.get("cluster"):
+        line.append(f"{task['cluster']}/")
+    line.append(f"{task.get('node', '-'):<10} ", style="bold")
+    line.append(f"{task.get('type', ''):<12} {str(task.get('id', '')):<8} {task.get('user', ''):<16} ")
+    status = task.get("status")
+    if status is None and not task.get("endtime"):
+        line.append("running", style="yellow")
+    else:
+        line.append(str(status), style="green" if status == "OK" else "red")
+    line.append(f"  {task.get('upid', '')}", style="dim")
+    console.print(line)
+
+def display_node_table(nodes, use_color=False, metrics=None, config=None):
+    config = config or {}
+    y_thresh = config.get("cpu_load_yellow", 80)
+    r_thresh = config.get("cpu_load_red", 90)
+
     table = Table(title="Proxmon Node Übersicht", box=box.SQUARE_DOUBLE_HEAD, expand=True)
+    multi = any("cluster" in node for node in nodes)
 
+    if multi:
+        table.add_column("Cluster")
     table.add_column("Node", style="bold")
     table.add_column("Status")
     table.add_column("Version")
     table.add_column("DNS (IP)") 
     table.add_column("Updates")
+    if metrics is not None:
+        table.add_column("CPU Trend")
+        table.add_column("CPU Ø/Peak")
 
     for node in nodes:
         name = node["node"]
@@ -138,6 +277,12 @@ def display_node_table(nodes, use_color=False):
         status_text = Text(status)
         if use_color:
             status_text.stylize("green" if status == "online" else "red")
+        if node.get("degraded") is not None:
+            # Circuit Breaker offen: Node wird bis zum nächsten Versuch übersprungen
+            status_text.append(f" (degraded, retry in {node['degraded']:.0f}s)", style="red" if use_color else None)
+        elif node.get("error"):
+            # Node antwortet nur teilweise
+            status_text.append(" (partial)", style="yellow" if use_color else None)
 
         update_text = Text(str(updates))
         if use_color:
@@ -148,12 +293,289 @@ def display_node_table(nodes, use_color=False):
             else:
                 update_text.stylize("green")
 
-        table.add_row(
+        row = [
             name,
             status_text,
             version,
             dns_ips,
             update_text
-        )
+        ]
+        if metrics is not None:
+            row += _trend_cells(metrics.get(node), use_color, y_thresh, r_thresh)
+        if multi:
+            row.insert(0, node.get("cluster", "-"))
+        table.add_row(*row)
+
+    console.print(table)
+def display_bulk_summary(action, results):
+    failed = {k: v for k, v in results.items() if isinstance(v, Exception)}
+    print(f"{action.capitalize()}: {len(results) - len(failed)} ok, {len(failed)} failed")
+    if not failed:
+        return
+
+    table = Table(title="Failed", box=box.SQUARE_DOUBLE_HEAD, expand=True)
+    table.add_column("ID", style="bold")
+    table.add_column("Error")
+    for key, err in failed.items():
+        table.add_row(key, str(err))
+
+    console.print(table)
+
+def display_cache_stats(stats):
+    table = Table(title="API Cache", box=box.SQUARE_DOUBLE_HEAD, expand=True)
+    table.add_column("Endpoint", style="bold")
+    table.add_column("TTL (s)")
+    table.add_column("Hits")
+    table.add_column("Misses")
+    table.add_column("Hit rate")
+
+    for endpoint, hits, misses, ttl in stats:
+        total = hits + misses
+        rate = f"{hits / total * 100:.0f}%" if total else "-"
+        table.add_row(endpoint, str(ttl), str(hits), str(misses), rate)
+
+    console.print(table)
+
+def display_api_stats(rows, since):
+    table = Table(title=f"API calls since {format_unix_timestamp(since)}", box=box.SQUARE_DOUBLE_HEAD, expand=True)
+    table.add_column("Endpoint", style="bold", ratio=3, overflow="fold")
+    table.add_column("Node", ratio=1)
+    table.add_column("Calls", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Retries", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p95 ms", justify="right")
+    table.add_column("max ms", justify="right")
+    table.add_column("avg KB", justify="right")
+
+    for server, method, template, node, s in sorted(rows, key=lambda r: (r[2], r[1], r[3] or "")):
+        errors = Text(str(s.errors), style="red" if s.errors else "")
+        table.add_row(f"{method} {template}", node or "-", str(s.calls), errors, str(s.retries),
+                      f"{s.percentile(0.5):.0f}", f"{s.percentile(0.95):.0f}", f"{s.max_ms:.0f}",
+                      f"{s.bytes / s.calls / 1024:.1f}")
+
+    if not rows:
+        table.add_row("No API calls recorded", *[""] * 8)
+    console.print(table)
+
+EVENT_STYLES = {
+    "started": "green", "stopped": "red", "migrated": "cyan", "cpu_high": "red",
+    "cpu_normal": "green", "disk_grew": "yellow", "added": "cyan", "removed": "magenta",
+}
+
+def build_event_panel(events, limit=8):
+    # neueste unten, wie in einem Log
+    lines = Text()
+    for event in list(events)[-limit:]:
+        cluster, vmid = event.key
+        lines.append(format_unix_timestamp(event.time) + "  ")
+        lines.append(f"{event.kind:<10} ", style=EVENT_STYLES.get(event.kind, "bold"))
+        lines.append(f"{cluster + '/' if cluster else ''}{vmid} {event.name}  ")
+        lines.append(event.detail, style="dim")
+        lines.append("\n")
+    lines.rstrip()
+    return Panel(lines or Text("no changes yet", style="dim"), title="Events", box=box.SQUARE)
+
+def display_events(events, limit=50):
+    console.print(build_event_panel(events, limit))
 
-    console.print(table)
\ No newline at end of file
+def _size(num):
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(num) < 1024 or unit == "TB":
+            return f"{num:.1f} {unit}" if unit != "B" else f"{num:.0f} B"
+        num /= 1024
+
+def display_storage(report, vms, config=None, show_all=False):
+    from inventory import vm_key
+
+    config = config or {}
+    use_color = config.get("use_color", False)
+    max_age = config.get("backup_max_age_hours", 36) * 3600
+
+    table = Table(title="Storage", box=box.SQUARE_DOUBLE_HEAD, expand=True)
+    multi = any("cluster" in pool for pool in report.pools)
+    if multi:
+        table.add_column("Cluster")
+    table.add_column("Storage", style="bold")
+    table.add_column("Node")
+    table.add_column("Type")
+    table.add_column("Status")
+    table.add_column("Used", justify="right")
+    table.add_column("Total", justify="right")
+    table.add_column("Usage", justify="right")
+    table.add_column("Free", justify="right")
+    table.add_column("Growth/day", justify="right")
+    table.add_column("Full in", justify="right")
+
+    for pool in sorted(report.pools, key=lambda p: -p["usage"]):
+        usage = Text(f"{pool['usage']:.1f}%")
+        if use_color:
+            usage.stylize(_load_style(pool["usage"], 80, 90))
+        growth = "-" if pool["growth"] is None else _size(pool["growth"])
+        full_in = pool["full_in"]
+        if full_in is not None:
+            full_in = f"{full_in / 86400:.0f}d" if full_in >= 2 * 86400 else format_uptime(int(full_in))
+        row = [pool["storage"], pool["node"] or "shared", pool["type"], pool["status"],
+               _size(pool["used"]), _size(pool["total"]), usage, _size(pool["free"]), growth, full_in or "-"]
+        if multi:
+            row.insert(0, pool.get("cluster", "-"))
+        table.add_row(*row)
+    console.print(table)
+
+    # Gäste ohne bzw. mit zu altem Backup zuerst
+    now = report.fetched
+    rows = []
+    for vm in vms:
+        stats = report.backups.get(vm_key(vm))
+        age = stats.age(now) if stats else None
+        if show_all or age is None or age > max_age:
+            rows.append((vm, stats, age))
+    rows.sort(key=lambda r: -(r[2] if r[2] is not None else float("inf")))
+
+    title = "Backups" if show_all else f"Guests without a backup in the last {max_age // 3600:.0f}h"
+    guests = {vm_key(vm) for vm in vms}
+    orphans = sum(1 for key in report.backups if key not in guests)
+    caption = f"{orphans} backup group(s) of guests that no longer exist" if orphans else None
+    table = Table(title=title, caption=caption, box=box.SQUARE_DOUBLE_HEAD, expand=True)
+    table.add_column("ID", style="bold")
+    table.add_column("Name")
+    table.add_column("Node")
+    table.add_column("Status")
+    table.add_column("Backups", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("Last backup")
+    table.add_column("Age", justify="right")
+
+    for vm, stats, age in rows:
+        age_text = Text("never" if age is None else format_uptime(int(age)))
+        if use_color:
+            age_text.stylize("red" if age is None or age > max_age else "green")
+        table.add_row(vm_key(vm), vm.get("name", "-"), vm.get("node", "-"), vm.get("status", "-"),
+                      str(stats.count if stats else 0), _size(stats.size) if stats else "-",
+                      format_unix_timestamp(stats.last) if stats else "-", age_text)
+    if not rows:
+        table.add_row("All guests have a recent backup", *[""] * 7)
+    console.print(table)
+
+    for err in report.errors:
+        print(f"Storage: {err}")
+
+def display_guest_info(vm, config):
+    from inventory import vm_key
+
+    kind = "LXC" if vm["type"] == "lxc" else "VM"
+    table = Table(title=f"{kind} {vm_key(vm)} – {vm.get('name', '-')} on {vm['node']} ({vm.get('status', '-')})",
+                  box=box.SQUARE_DOUBLE_HEAD, expand=True)
+    table.add_column("Key", style="bold")
+    table.add_column("Value", overflow="fold")
+    for key in sorted(config):
+        if key != "digest":
+            table.add_row(key, str(config[key]))
+    console.print(table)
+
+def display_find_results(vms, text, configs):
+    from guestconfig import parse_find
+    from inventory import vm_key
+
+    fields = list(dict.fromkeys(field for field, _, _ in parse_find(text)))
+    table = Table(title=f"{len(vms)} guest(s) with {text}", box=box.SQUARE_DOUBLE_HEAD, expand=True)
+    table.add_column("ID", style="bold")
+    table.add_column("Type")
+    table.add_column("Name")
+    table.add_column("Status")
+    table.add_column("Node")
+    for field in fields:
+        table.add_column(field, overflow="fold")
+
+    for vm in sorted(vms, key=lambda vm: (vm.get("cluster") or "", int(vm["vmid"]))):
+        # gefundene Werte je Feld, z.B. alle Bridges eines Gasts
+        values = configs.values(vm_key(vm))
+        cells = [", ".join(dict.fromkeys(values.get(field, ["-"]))) for field in fields]
+        table.add_row(vm_key(vm), "LXC" if vm["type"] == "lxc" else "VM", vm.get("name", "-"),
+                      vm.get("status", "-"), vm["node"], *cells)
+    if not vms:
+        table.add_row("No match", *[""] * (4 + len(fields)))
+    console.print(table)
+
+JOB_STYLES = {"queued": "dim", "running": "yellow", "done": "green", "failed": "red"}
+
+def build_job_table(jobs, title, limit=20):
+    # laufende zuerst, dann Fehler, dann die zuletzt fertigen; Zähler im Titel
+    counts = {state: 0 for state in JOB_STYLES}
+    for job in jobs:
+        counts[job.state] += 1
+    order = {"running": 0, "failed": 1, "done": 2, "queued": 3}
+    shown = sorted(jobs, key=lambda j: (order[j.state], -(j.finished or 0)))[:limit]
+
+    summary = ", ".join(f"{n} {state}" for state, n in counts.items() if n)
+    table = Table(title=f"{title} – {summary}", box=box.SQUARE_DOUBLE_HEAD, expand=True)
+    table.add_column("ID", style="bold")
+    table.add_column("Name")
+    table.add_column("Node")
+    table.add_column("State")
+    table.add_column("Time", justify="right")
+    table.add_column("Detail", overflow="fold")
+    for job in shown:
+        detail = job.error or job.params.get("snapname") or job.params.get("storage", "")
+        table.add_row(job.key, job.vm.get("name", "-"), job.vm["node"], Text(job.state, style=JOB_STYLES[job.state]),
+                      f"{job.duration:.0f}s" if job.started else "-", detail)
+    if len(jobs) > limit:
+        table.caption = f"{len(jobs) - limit} more"
+    return table
+
+def display_job_report(title, jobs, elapsed, size=None):
+    failed = [job for job in jobs if job.state == "failed"]
+    done = len(jobs) - len(failed)
+    rate = done / elapsed * 60 if elapsed else 0
+    took = format_uptime(int(elapsed)) if elapsed >= 60 else f"{elapsed:.0f}s"
+    line = f"{title}: {done} ok, {len(failed)} failed in {took}, {rate:.1f} jobs/min"
+    if size is not None:
+        line += f", {_size(size)} written ({_size(size / elapsed if elapsed else 0)}/s)"
+    print(line)
+
+    table = Table(title="Per node", box=box.SQUARE_DOUBLE_HEAD, expand=True)
+    table.add_column("Node", style="bold")
+    table.add_column("Jobs", justify="right")
+    table.add_column("Failed", justify="right")
+    table.add_column("Avg", justify="right")
+    table.add_column("Max", justify="right")
+    per_node = {}
+    for job in jobs:
+        cluster, node = job.vm.get("cluster"), job.vm["node"]
+        per_node.setdefault(f"{cluster}/{node}" if cluster else node, []).append(job)
+    for node, own in sorted(per_node.items()):
+        durations = [job.duration for job in own]
+        table.add_row(node, str(len(own)), str(sum(job.state == "failed" for job in own)),
+                      f"{sum(durations) / len(durations):.1f}s", f"{max(durations):.1f}s")
+    console.print(table)
+
+    if failed:
+        table = Table(title="Failed", box=box.SQUARE_DOUBLE_HEAD, expand=True)
+        table.add_column("ID", style="bold")
+        table.add_column("Error")
+        for job in failed:
+            table.add_row(job.key, job.error)
+        console.print(table)
+
+def display_rolling_report(reports):
+    from rolling import PHASES
+
+    table = Table(title="Rolling Reboot", box=box.SQUARE_DOUBLE_HEAD, expand=True)
+    table.add_column("Node", style="bold")
+    for phase in PHASES:
+        table.add_column(phase.capitalize())
+    table.add_column("Total")
+    table.add_column("Migrations")
+    table.add_column("Not upgraded")
+    table.add_column("Result")
+
+    for r in reports:
+        phases = [f"{r.phases[p]:.0f}s" if p in r.phases else "-" for p in PHASES]
+        result = Text(r.error, style="red") if r.error else Text("OK", style="green")
+        pending = Text(str(r.pending), style="yellow" if r.pending else "") if r.pending is not None else "-"
+        table.add_row(r.node, *phases, f"{r.total:.0f}s", str(r.migrated), pending, result)
+
+    console.print(table)
+    for r in reports:
+        for failure in r.failed:
+            print(f"{r.node}: migration failed: {failure}")